@@ -0,0 +1,36 @@
+from airflow import DAG
+from airflow.providers.apache.spark.operators.spark_submit import SparkSubmitOperator
+from datetime import datetime, timedelta
+import os
+
+default_args = {"owner": "you", "retries": 1, "retry_delay": timedelta(minutes=10)}
+
+# logs_etl 의 MERGE 가 남기는 작은 파일을 하루 한 번 병합(OPTIMIZE + Z-ORDER)하고 오래된 파일을 VACUUM 합니다.
+with DAG(
+    dag_id="delta_maintenance",
+    start_date=datetime(2025, 10, 11),
+    schedule=os.getenv("DELTA_MAINTENANCE_SCHEDULE", "30 3 * * *"),
+    catchup=False,
+    default_args=default_args,
+    max_active_runs=1,
+) as dag:
+
+    SparkSubmitOperator(
+        task_id="optimize_vacuum",
+        application="/opt/spark/app/job_delta_maintenance.py",
+        py_files="/opt/spark/app/spark_profile.py",
+        packages="io.delta:delta-spark_2.12:3.2.0,org.apache.hadoop:hadoop-aws:3.3.4,com.amazonaws:aws-java-sdk-bundle:1.12.772",
+        conf={
+            "spark.master": "spark://spark-master:7077",
+            "spark.jars.ivy": "/tmp/.ivy2",
+
+            "spark.hadoop.fs.s3a.endpoint": "http://minio:9000",
+            "spark.hadoop.fs.s3a.access.key": "admin",
+            "spark.hadoop.fs.s3a.secret.key": "admin12345",
+            "spark.hadoop.fs.s3a.path.style.access": "true",
+            "spark.hadoop.fs.s3a.connection.ssl.enabled": "false",
+            "spark.sql.extensions": "io.delta.sql.DeltaSparkSessionExtension",
+            "spark.sql.catalog.spark_catalog": "org.apache.spark.sql.delta.catalog.DeltaCatalog",
+        },
+        conn_id="spark_default",
+    )
@@ -1,28 +1,127 @@
 from airflow import DAG
+from airflow.datasets import Dataset
 from airflow.operators.bash import BashOperator
+from airflow.exceptions import AirflowFailException
+from airflow.operators.python import BranchPythonOperator, PythonOperator, ShortCircuitOperator
 from airflow.providers.apache.spark.operators.spark_submit import SparkSubmitOperator
+from airflow.timetables.datasets import DatasetOrTimeSchedule
+from airflow.timetables.trigger import CronTriggerTimetable
 from datetime import datetime, timedelta
 import os
+import sys
 
 default_args = {"owner": "you", "retries": 1, "retry_delay": timedelta(minutes=2)}
 
+BRONZE_BASE = os.getenv("BRONZE_BASE", "/data/bronze/app/")
+CHECKPOINT_PATH = os.getenv("ETL_CHECKPOINT_PATH", "/data/state/etl_checkpoint.json")
+OPEN_GRACE_SEC = int(os.getenv("ETL_OPEN_GRACE_SEC", "300"))
+CRON = os.getenv("AIRFLOW_SCHEDULE", "*/30 * * * *")
+# web 이 새 브론즈 데이터를 기록하면 AIRFLOW_API_URL 로 이 Dataset 이벤트를 보냅니다 (web/dataset_notifier.py).
+BRONZE_DATASET = Dataset(os.getenv("AIRFLOW_BRONZE_DATASET", "file:///data/bronze/app"))
+# cron | dataset | both — both 면 Dataset 이벤트로 바로 돌고, cron 은 알림이 빠졌을 때의 안전망입니다.
+TRIGGER = os.getenv("LOGS_ETL_TRIGGER", "cron").lower()
+# auto | spark | light — auto 면 새 브론즈가 ETL_LIGHT_MAX_MB 이하일 때 Spark 대신 경량 엔진(job_etl_light.py)을 씁니다.
+ENGINE = os.getenv("ETL_ENGINE", "auto").lower()
+LIGHT_MAX_BYTES = float(os.getenv("ETL_LIGHT_MAX_MB", "64")) * 1024 * 1024
+
+if TRIGGER == "dataset":
+    schedule = [BRONZE_DATASET]
+elif TRIGGER == "both":
+    schedule = DatasetOrTimeSchedule(timetable=CronTriggerTimetable(CRON, timezone="UTC"), datasets=[BRONZE_DATASET])
+else:
+    schedule = CRON  # schedule_interval 대신 schedule 권장
+
+
+def _new_bronze_partitions():
+    """마지막 성공 실행의 체크포인트와 비교해 새 데이터가 있는 날짜 파티션 목록을 돌려줍니다.
+    빈 목록이면 ShortCircuitOperator 가 뒤 작업(Spark 제출 포함)을 모두 건너뜁니다."""
+    sys.path.insert(0, "/opt/spark/app")
+    from bronze_checkpoint import Checkpoint, pending_partitions
+
+    if BRONZE_BASE.startswith("s3a://"):
+        return ["*"]  # 로컬에서 확인할 수 없으면 항상 실행하고 Spark 잡이 전체를 계획합니다.
+    partitions = pending_partitions(BRONZE_BASE, Checkpoint(CHECKPOINT_PATH), grace_sec=OPEN_GRACE_SEC)
+    print(f"new bronze partitions: {partitions}")
+    return partitions
+
+
+def _choose_engine(ti):
+    """센서가 찾은 파티션에서 이번 실행이 읽을 바이트를 체크포인트 계획으로 세어 엔진 작업을 고릅니다."""
+    partitions = ti.xcom_pull(task_ids="check_new")
+    if ENGINE in ("spark", "light"):
+        return "run_logs_etl" if ENGINE == "spark" else "run_logs_etl_light"
+    if "*" in partitions or BRONZE_BASE.startswith("s3a://"):
+        return "run_logs_etl"
+    sys.path.insert(0, "/opt/spark/app")
+    from bronze_checkpoint import Checkpoint, list_local
+
+    work = Checkpoint(CHECKPOINT_PATH).plan(list_local(BRONZE_BASE, partitions), grace_sec=OPEN_GRACE_SEC)
+    pending = sum(item["end"] - item["start"] for item in work)
+    print(f"pending bronze bytes: {pending} (light engine up to {int(LIGHT_MAX_BYTES)})")
+    return "run_logs_etl_light" if pending <= LIGHT_MAX_BYTES else "run_logs_etl"
+
+
+def _compact_bronze():
+    """며칠 지난 날짜 파티션의 시간 파일을 하루 파일로 합칩니다 (체크포인트를 고치므로 ETL 과 같은 DAG 실행 안에서)."""
+    sys.path.insert(0, "/opt/spark/app")
+    from bronze_compaction import compact
+
+    for result in compact(BRONZE_BASE, CHECKPOINT_PATH, int(os.getenv("BRONZE_COMPACT_AFTER_DAYS", "2"))):
+        print(result)
+
+
+def _validate_run(run_id):
+    sys.path.insert(0, "/opt/spark/app")
+    import psycopg2
+    from etl_audit import validate_run
+
+    conn = psycopg2.connect(
+        host=os.getenv("POSTGRES_HOST", "postgres"),
+        port=os.getenv("POSTGRES_PORT", "5432"),
+        dbname=os.getenv("POSTGRES_DB", "dwh"),
+        user=os.getenv("POSTGRES_USER", "analytics"),
+        password=os.getenv("POSTGRES_PASSWORD", "secret"),
+    )
+    try:
+        ok, problems = validate_run(conn, run_id, os.getenv("PG_EVENTS_TABLE", "mart.events"))
+    finally:
+        conn.close()
+    if not ok:
+        # 재시도해도 결과가 같으므로 바로 실패 처리합니다.
+        raise AirflowFailException("data quality check failed:\n" + "\n".join(problems))
+    print(f"validation passed for {run_id}")
+
+
 with DAG(
     dag_id="logs_etl",
     start_date=datetime(2025, 10, 11),
-    schedule=os.getenv("AIRFLOW_SCHEDULE", "*/30 * * * *"),  # schedule_interval 대신 schedule 권장
+    schedule=schedule,
     catchup=False,
     default_args=default_args,
     max_active_runs=1,
 ) as dag:
 
-    check_new = BashOperator(
+    check_new = ShortCircuitOperator(
         task_id="check_new",
-        bash_command="find /data/bronze/app -type f -mmin -180 | head -n 1 | wc -l"
+        python_callable=_new_bronze_partitions,
+    )
+
+    choose_engine = BranchPythonOperator(
+        task_id="choose_engine",
+        python_callable=_choose_engine,
     )
 
     run_spark = SparkSubmitOperator(
         task_id="run_logs_etl",
         application="/opt/spark/app/job_etl.py",
+        # 센서가 찾은 파티션만 나열/계획합니다.
+        application_args=[
+            "--partitions",
+            "{{ '' if '*' in ti.xcom_pull(task_ids='check_new') else ti.xcom_pull(task_ids='check_new') | join(',') }}",
+            "--run-id",
+            "{{ run_id }}",
+        ],
+        py_files="/opt/spark/app/bronze_checkpoint.py,/opt/spark/app/pg_loader.py,/opt/spark/app/pg_rollups.py,/opt/spark/app/spark_profile.py,/opt/spark/app/event_transform.py,/opt/spark/app/spark_transform.py,/opt/spark/app/etl_audit.py,/opt/spark/shared/bronze_schema.py",
         # master 파라미터 제거 → conf로 전달(또는 conn_id 사용)
         packages="io.delta:delta-spark_2.12:3.2.0,org.postgresql:postgresql:42.7.4,org.apache.hadoop:hadoop-aws:3.3.4,com.amazonaws:aws-java-sdk-bundle:1.12.772",
         # jars_ivy 제거하고 conf에 spark.jars.ivy로
@@ -45,9 +144,35 @@ with DAG(
         conn_id="spark_default",
     )
 
-    check_pg = BashOperator(
-        task_id="check_pg",
-        bash_command="echo 'validate counts here (psql or python)'"
+    # 작은 배치는 Spark 제출 없이 같은 변환 규칙(event_transform)으로 Airflow 컨테이너에서 처리합니다.
+    run_light = BashOperator(
+        task_id="run_logs_etl_light",
+        bash_command=(
+            "cd /opt/spark/app && PYTHONPATH=/opt/spark/app:/opt/spark/shared python job_etl_light.py "
+            "--partitions \"{{ ti.xcom_pull(task_ids='check_new') | join(',') }}\" --run-id \"{{ run_id }}\""
+        ),
+    )
+
+    # ETL 잡이 mart.etl_runs 에 남긴 브론즈/Delta 집계를 mart.events 집계와 비교합니다. 어긋나면 DAG 실행이 실패합니다.
+    validate = PythonOperator(
+        task_id="validate",
+        python_callable=_validate_run,
+        # 두 엔진 중 선택되지 않은 쪽은 skipped 입니다.
+        trigger_rule="none_failed_min_one_success",
+    )
+
+    # mart 적재가 끝나면 web 의 추천 랭킹을 갱신합니다 (실패해도 web 이 주기적으로 다시 읽으므로 ETL 은 성공 처리).
+    refresh_ranking = BashOperator(
+        task_id="refresh_ranking",
+        bash_command=(
+            "curl -fsS -X POST -H \"X-Admin-Token: ${ADMIN_TOKEN}\" "
+            "${WEB_ADMIN_URL:-http://web:3000}/api/admin/ranking/refresh || true"
+        ),
+    )
+
+    compact_bronze = PythonOperator(
+        task_id="compact_bronze",
+        python_callable=_compact_bronze,
     )
 
-    check_new >> run_spark >> check_pg
+    check_new >> choose_engine >> [run_spark, run_light] >> validate >> [refresh_ranking, compact_bronze]
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""브론즈 형식 비교: JSONL vs zstd Parquet 세그먼트 (하루치 합성 이벤트).
+
+트래픽 생성기와 같은 모양의 이벤트(로그인/검색/상품 조회 등, 사용자 풀, UA, 추천 props)를
+24개 시간 파티션에 나눠
+  - jsonl  : BronzeWriter 로 시간 파일에 기록
+  - parquet: ParquetBronzeWriter 로 세그먼트 기록
+한 뒤 파일 크기와, 읽는 쪽이 하루치를 열 단위로 복원하는 시간
+(JSONL 은 json.loads / pyarrow.json, Parquet 은 pyarrow.parquet)을 비교합니다.
+
+    python bench/bench_bronze_format.py --events 500000
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parents[1] / 'web'
+sys.path.insert(0, str(WEB_DIR))
+
+import pyarrow.json as pa_json  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from bronze_schema import build_record  # noqa: E402
+from bronze_writer import BronzeWriter, ParquetBronzeWriter  # noqa: E402
+from load_generator import TRAFFIC_ACTIONS, TRAFFIC_PATHS, TRAFFIC_UA  # noqa: E402
+
+DAY = datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+
+def _events(count: int, seed: int = 7):
+    """(시각, JSON 줄) 을 시간 순서대로 만듭니다."""
+    rng = random.Random(seed)
+    for idx in range(count):
+        now = DAY + timedelta(seconds=idx * 86400 / count)
+        action = rng.choice(TRAFFIC_ACTIONS)
+        props = {'path': rng.choice(TRAFFIC_PATHS), 'ts': now.isoformat()}
+        if action == 'search':
+            props['query'] = rng.choice(['파이썬', 'spark', '데이터 엔지니어링', 'react', 'sql 튜닝'])
+        elif action == 'view_product':
+            props.update({'category_id': f'cat-{rng.randrange(12)}', 'course_id': f'course-{rng.randrange(1200)}', 'rank': rng.randrange(20)})
+        server = {'received_ts': now.isoformat(), 'ip': f'10.0.{rng.randrange(256)}.{rng.randrange(256)}', 'ua': rng.choice(TRAFFIC_UA)}
+        rec = build_record(action, f'user-{rng.randrange(20000):05d}', props, now.isoformat(), server)
+        yield now, json.dumps(rec, ensure_ascii=False)
+
+
+def _write(writer: BronzeWriter, count: int) -> float:
+    writer.start()
+    started = time.perf_counter()
+    batch: list[str] = []
+    batch_ts = None
+    for now, line in _events(count):
+        if batch and now.hour != batch_ts.hour:
+            writer.submit_many(batch_ts, batch, timeout=30)
+            batch = []
+        batch_ts = batch_ts if batch else now
+        batch.append(line)
+        if len(batch) >= 500:
+            writer.submit_many(batch_ts, batch, timeout=30)
+            batch = []
+    if batch:
+        writer.submit_many(batch_ts, batch, timeout=30)
+    writer.stop(timeout=600)
+    return time.perf_counter() - started
+
+
+def _files(root: Path, suffix: str) -> list[Path]:
+    return sorted(root.rglob(f'part-*{suffix}'))
+
+
+def _timed(fn) -> tuple[float, int]:
+    started = time.perf_counter()
+    rows = fn()
+    return round(time.perf_counter() - started, 3), rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_root, parquet_root = Path(tmp) / 'jsonl', Path(tmp) / 'parquet'
+        jsonl_write = _write(BronzeWriter(jsonl_root, max_queue=1000), args.events)
+        parquet_write = _write(ParquetBronzeWriter(parquet_root, segment_rows=50000, segment_age=3600, max_queue=1000), args.events)
+        jsonl_files, parquet_files = _files(jsonl_root, '.jsonl'), _files(parquet_root, '.parquet')
+
+        def _read_json_loads() -> int:
+            rows = 0
+            for path in jsonl_files:
+                with path.open(encoding='utf-8') as f:
+                    rows += sum(1 for line in f if json.loads(line))
+            return rows
+
+        def _read_arrow_json() -> int:
+            return sum(pa_json.read_json(path).num_rows for path in jsonl_files)
+
+        def _read_parquet() -> int:
+            return sum(pq.read_table(path).num_rows for path in parquet_files)
+
+        def _read_parquet_two_columns() -> int:
+            return sum(pq.read_table(path, columns=['type', 'user_id']).num_rows for path in parquet_files)
+
+        reads = {
+            'jsonl_json_loads': _timed(_read_json_loads),
+            'jsonl_pyarrow_json': _timed(_read_arrow_json),
+            'parquet_all_columns': _timed(_read_parquet),
+            'parquet_type_user_id': _timed(_read_parquet_two_columns),
+        }
+        jsonl_bytes = sum(p.stat().st_size for p in jsonl_files)
+        parquet_bytes = sum(p.stat().st_size for p in parquet_files)
+        result = {
+            'events': args.events,
+            'jsonl': {'files': len(jsonl_files), 'mb': round(jsonl_bytes / 1e6, 2), 'write_sec': round(jsonl_write, 2)},
+            'parquet': {'files': len(parquet_files), 'mb': round(parquet_bytes / 1e6, 2), 'write_sec': round(parquet_write, 2)},
+            'size_ratio': round(parquet_bytes / jsonl_bytes, 3) if jsonl_bytes else None,
+            'read_sec': {name: sec for name, (sec, _rows) in reads.items()},
+            'read_rows': {name: rows for name, (_sec, rows) in reads.items()},
+        }
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
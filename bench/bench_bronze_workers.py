@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""web 워커 수(프로세스)에 따른 브론즈 기록 처리량: 공유 시간 파일 + FileLock vs 프로세스별 JSONL 세그먼트.
+
+워커 수 1/2/4/8 마다 프로세스를 띄워 각자 ``--events`` 건을 최대 속도로 기록하고, 전체 events/sec 와
+1 워커 대비 배율(speedup)·효율(speedup / 워커 수)을 비교합니다.
+
+  - hourly   direct   : 이벤트마다 FileLock + open/append/close (`_append_jsonl_line`, BRONZE_JSONL_LAYOUT=hourly)
+  - segments direct   : 이벤트마다 SegmentFiles.append (프로세스 간 잠금 없음)
+  - hourly   buffered : BronzeWriter 배치 기록, flush 마다 FileLock
+  - segments buffered : BronzeWriter + SegmentFiles
+
+실행마다 모든 줄이 JSON 으로 읽히는지(줄 섞임 없음), 줄 수가 맞는지, 봉인되지 않은 ``.open`` 파일이 남지 않았는지 확인합니다.
+코어 수보다 많은 워커는 CPU 경합으로 배율이 꺾이므로 ``cpu_count`` 를 함께 출력합니다.
+
+    python bench/bench_bronze_workers.py --events 20000 --workers 1,2,4,8
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from filelock import FileLock  # noqa: E402
+
+from bronze_writer import BronzeWriter, SegmentFiles, bronze_partition_path  # noqa: E402
+
+SCENARIOS = (('hourly', 'direct'), ('segments', 'direct'), ('hourly', 'buffered'), ('segments', 'buffered'))
+
+
+def _lines(worker: int, count: int) -> list[str]:
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        json.dumps(
+            {
+                'schema_version': 1,
+                'type': 'page_view',
+                'ts': now,
+                'user_id': f'user-{worker}-{idx % 2000:05d}',
+                'props': {'path': f'/courses/{idx % 40}'},
+                '_server': {'received_ts': now, 'ip': '127.0.0.1', 'ua': 'bench'},
+            }
+        )
+        + '\n'
+        for idx in range(count)
+    ]
+
+
+def _append_locked(root: Path, line: str):
+    dest = bronze_partition_path(root, datetime.now(timezone.utc))
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(str(dest) + '.lock'):
+        with dest.open('ab') as f:
+            f.write(line.encode('utf-8'))
+
+
+def _worker(root: str, layout: str, mode: str, worker: int, count: int, barrier, results):
+    root_path = Path(root)
+    lines = _lines(worker, count)
+    segments = SegmentFiles(root_path, max_age=3600) if layout == 'segments' else None
+    writer = BronzeWriter(root_path, max_queue=count + 1, segments=segments) if mode == 'buffered' else None
+    barrier.wait()
+    started = time.perf_counter()
+    if writer:
+        writer.start()
+        for line in lines:
+            writer.submit(datetime.now(timezone.utc), line)
+        writer.stop()
+    elif segments:
+        for line in lines:
+            now = datetime.now(timezone.utc)
+            segments.append(bronze_partition_path(root_path, now), now, line.encode('utf-8'), 1, 'direct')
+        segments.seal_all()
+    else:
+        for line in lines:
+            _append_locked(root_path, line)
+    # 프로세스마다 perf_counter 기준점이 달라 벽시계 시각으로 돌려줍니다.
+    results.put((time.time() - (time.perf_counter() - started), time.time()))
+
+
+def _verify(root: Path, expected: int) -> dict:
+    lines = bad = 0
+    files = [p for p in root.rglob('part-*.jsonl')]
+    for path in files:
+        with path.open('rb') as f:
+            for raw in f:
+                lines += 1
+                try:
+                    json.loads(raw)
+                except ValueError:
+                    bad += 1
+    return {
+        'files': len(files),
+        'lines_ok': lines == expected and bad == 0,
+        'unsealed': len(list(root.rglob('.part-*.open'))),
+    }
+
+
+def _run(layout: str, mode: str, workers: int, count: int) -> dict:
+    ctx = mp.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(tmp, layout, mode, idx, count, barrier, results)) for idx in range(workers)]
+        for proc in procs:
+            proc.start()
+        spans = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        wall = max(end for _start, end in spans) - min(start for start, _end in spans)
+        return {'workers': workers, 'events_per_sec': round(workers * count / wall), **_verify(Path(tmp), workers * count)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000, help='워커당 이벤트 수')
+    parser.add_argument('--workers', default='1,2,4,8')
+    args = parser.parse_args()
+    workers = [int(w) for w in args.workers.split(',') if w]
+
+    results = {'cpu_count': os.cpu_count(), 'events_per_worker': args.events, 'runs': {}}
+    for layout, mode in SCENARIOS:
+        runs = [_run(layout, mode, n, args.events) for n in workers]
+        base = runs[0]['events_per_sec'] / runs[0]['workers']
+        for run in runs:
+            run['speedup'] = round(run['events_per_sec'] / base, 2)
+            run['efficiency'] = round(run['speedup'] / run['workers'], 2)
+        results['runs'][f'{layout}_{mode}'] = runs
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""브론즈 기록 경로 마이크로 벤치마크.
+
+건별 FileLock + open/append/close(기존 `_append_jsonl_line`)와 BronzeWriter 배치 기록의 events/sec 를 비교합니다.
+
+    python bench/bench_bronze_writer.py --events 50000 --threads 8
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from filelock import FileLock  # noqa: E402
+
+from bronze_writer import BronzeWriter, bronze_partition_path  # noqa: E402
+
+
+def _sample_line(idx: int) -> str:
+    now = datetime.now(timezone.utc)
+    rec = {
+        'type': 'view_product',
+        'ts': now.isoformat(),
+        'user_id': f'user-{idx % 2000:05d}',
+        'props': {'path': '/product/1'},
+        '_server': {'received_ts': now.isoformat(), 'ip': '127.0.0.1', 'ua': 'bench'},
+    }
+    return json.dumps(rec, ensure_ascii=False)
+
+
+def _per_line(root: Path, lines: list[str], threads: int) -> float:
+    def _append(line: str):
+        dest = bronze_partition_path(root, datetime.now(timezone.utc))
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(str(dest) + '.lock'):
+            with dest.open('a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    return _drive(lines, threads, _append)
+
+
+def _buffered(root: Path, lines: list[str], threads: int, flush_every_n: int, flush_interval: float) -> float:
+    writer = BronzeWriter(root, max_queue=len(lines) + 1, flush_every_n=flush_every_n, flush_interval=flush_interval)
+    writer.start()
+    start = time.perf_counter()
+    _drive(lines, threads, lambda line: writer.submit(datetime.now(timezone.utc), line))
+    writer.stop()
+    return time.perf_counter() - start
+
+
+def _drive(lines: list[str], threads: int, fn) -> float:
+    chunks = [lines[i::threads] for i in range(threads)]
+
+    def _worker(chunk: list[str]):
+        for line in chunk:
+            fn(line)
+
+    workers = [threading.Thread(target=_worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start
+
+
+def _count_lines(root: Path) -> int:
+    return sum(sum(1 for _ in p.open(encoding='utf-8')) for p in root.rglob('*.jsonl'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--flush-every-n', type=int, default=500)
+    parser.add_argument('--flush-interval', type=float, default=0.2)
+    args = parser.parse_args()
+
+    lines = [_sample_line(i) for i in range(args.events)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'per_line'
+        elapsed = _per_line(root, lines, args.threads)
+        results['per_line'] = {'sec': round(elapsed, 3), 'events_per_sec': round(args.events / elapsed), 'written': _count_lines(root)}
+
+        root = Path(tmp) / 'buffered'
+        elapsed = _buffered(root, lines, args.threads, args.flush_every_n, args.flush_interval)
+        results['buffered'] = {'sec': round(elapsed, 3), 'events_per_sec': round(args.events / elapsed), 'written': _count_lines(root)}
+
+    results['speedup'] = round(results['per_line']['sec'] / results['buffered']['sec'], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""증분 ETL 체크포인트 검증/벤치마크 (합성 다개월 브론즈 트리).
+
+``--months`` 개월치 시간 파티션 파일을 만들고, job_etl.py 와 같은 규칙
+(닫힌 새 파일은 통째로, 커진 파일/기록 중인 파일은 새 구간을 마지막 개행까지만)으로
+여러 번의 ETL 실행을 흉내 내어
+
+  - 모든 이벤트가 정확히 한 번씩 처리되는지 (중복/누락 없음, 잘린 마지막 줄은 다음 실행에서 처리)
+  - 실행마다 읽는 바이트가 전체 트리 크기가 아니라 새 데이터 크기에 비례하는지
+  - Airflow 센서(pending_partitions)가 새 데이터가 없으면 빈 목록을, 있으면 그 날짜 파티션만 돌려주는지
+    (이미 봉인된 과거 날짜에 늦게 복구된 세그먼트 포함)
+
+를 확인합니다. 조건이 깨지면 0이 아닌 코드로 끝납니다. Spark/Postgres 적재까지 포함한
+전체 잡은 docker compose 환경에서 Airflow DAG 로 실행합니다.
+
+    python bench/bench_etl_incremental.py --months 3 --lines-per-file 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'spark' / 'app'))
+
+from bronze_checkpoint import Checkpoint, complete_lines, list_local, pending_partitions  # noqa: E402
+
+GRACE_SEC = 300
+
+
+class Tree:
+    def __init__(self, root: Path):
+        self.root = root
+        self.seq = 0
+        self.expected: set[int] = set()
+
+    def path(self, hour: datetime) -> Path:
+        y, m, d, hh = hour.strftime('%Y'), hour.strftime('%m'), hour.strftime('%d'), hour.strftime('%H')
+        return self.root / y / m / d / f'part-{y}{m}{d}-{hh}.jsonl'
+
+    def _line(self, hour: datetime) -> bytes:
+        self.seq += 1
+        self.expected.add(self.seq)
+        rec = {'type': 'page_view', 'ts': hour.isoformat(), 'user_id': f'user-{self.seq % 97}', 'props': {'seq': self.seq}}
+        return (json.dumps(rec) + '\n').encode()
+
+    def append(self, hour: datetime, lines: int, partial: bytes = b''):
+        dest = self.path(hour)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with dest.open('ab') as f:
+            f.write(b''.join(self._line(hour) for _ in range(lines)))
+            f.write(partial)
+
+    def start_partial(self, hour: datetime) -> tuple[bytes, bytes]:
+        """기록 중에 잘린 줄을 흉내 냅니다: 앞부분만 쓰고, 나머지는 나중에 이어 씁니다."""
+        line = self._line(hour)
+        return line[: len(line) // 2], line[len(line) // 2 :]
+
+    def total_bytes(self) -> int:
+        return sum(info['size'] for info in list_local(str(self.root)))
+
+
+def run_etl(tree: Tree, checkpoint: Checkpoint, now: datetime, seen: list[int], partitions: list[str] | None = None) -> dict:
+    """job_etl.py 의 0~4 단계 중 브론즈 읽기와 체크포인트 전진만 수행합니다.
+    ``partitions`` 는 센서가 --partitions 로 넘기는 날짜 파티션 목록입니다 (None 이면 전체)."""
+    started = time.perf_counter()
+    listing = list_local(str(tree.root), partitions)
+    work = checkpoint.plan(listing, now=now, grace_sec=GRACE_SEC)
+    plan_sec = time.perf_counter() - started
+    read_bytes = 0
+    for item in work:
+        with open(item['path'], 'rb') as f:
+            f.seek(item['start'])
+            data = f.read(item['end'] - item['start'])
+        read_bytes += len(data)
+        if item['whole']:
+            chunk, consumed = data, len(data)
+        else:
+            chunk, consumed = complete_lines(data)
+        seen.extend(json.loads(line)['props']['seq'] for line in chunk.splitlines() if line)
+        checkpoint.commit(item, item['start'] + consumed)
+    checkpoint.prune(listing, [str(tree.root / p) for p in partitions] if partitions else None)
+    checkpoint.save()
+    return {
+        'listed': len(listing),
+        'files_read': len(work),
+        'bytes_read': read_bytes,
+        'tree_bytes': tree.total_bytes(),
+        'plan_ms': round(plan_sec * 1000, 1),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=int, default=3)
+    parser.add_argument('--lines-per-file', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = Tree(Path(tmp) / 'bronze')
+        now = datetime(2025, 12, 1, 10, 20, tzinfo=timezone.utc)
+        current = now.replace(minute=0)
+        hour = current - timedelta(days=30 * args.months)
+        while hour < current:
+            tree.append(hour, args.lines_per_file)
+            hour += timedelta(hours=1)
+        head, tail = tree.start_partial(current)
+        tree.append(current, args.lines_per_file, partial=head)
+        # ETL 잡처럼 파일을 나열하기 직전에 체크포인트를 엽니다.
+        checkpoint = Checkpoint(os.path.join(tmp, 'state', 'etl_checkpoint.json'))
+
+        def sensor(at: datetime) -> tuple[list[str], float]:
+            started = time.perf_counter()
+            found = pending_partitions(str(tree.root), Checkpoint(checkpoint.path), now=at, grace_sec=GRACE_SEC)
+            return found, round((time.perf_counter() - started) * 1000, 1)
+
+        seen: list[int] = []
+        results['1_initial'] = run_etl(tree, checkpoint, now, seen)
+        before = len(seen)
+        found, sensor_ms = sensor(now)
+        results['2_no_new_data'] = {'sensor_partitions': found, 'sensor_ms': sensor_ms}
+        # 새 데이터가 없으면(잘린 마지막 줄 조각만 있으면) 센서가 DAG 를 건너뛰게 해야 합니다.
+        if found:
+            failures.append(f'sensor reported new data without any: {found}')
+        results['2_no_new_data'].update(run_etl(tree, Checkpoint(checkpoint.path), now, seen))
+        if len(seen) != before:
+            failures.append(f'no-new-data run processed {len(seen) - before} events')
+
+        # 현재 시간 파일에 잘린 줄의 나머지와 새 이벤트가 이어서 기록됨
+        with tree.path(current).open('ab') as f:
+            f.write(tail)
+        tree.append(current, 20)
+        checkpoint = Checkpoint(checkpoint.path)
+        found, sensor_ms = sensor(now + timedelta(minutes=10))
+        if found != [current.strftime('%Y/%m/%d')]:
+            failures.append(f'sensor should report only the current day, got {found}')
+        results['3_current_hour_grew'] = {'sensor_partitions': found, 'sensor_ms': sensor_ms}
+        results['3_current_hour_grew'].update(run_etl(tree, checkpoint, now + timedelta(minutes=10), seen, found))
+
+        # 시간이 넘어가 새 파티션이 생기고 이전 파일은 닫힘
+        nxt = current + timedelta(hours=1)
+        tree.append(nxt, args.lines_per_file)
+        found, sensor_ms = sensor(nxt + timedelta(minutes=20))
+        if not found:
+            failures.append('sensor missed the next-hour file')
+        results['4_next_hour'] = {'sensor_partitions': found, 'sensor_ms': sensor_ms}
+        results['4_next_hour'].update(run_etl(tree, checkpoint, nxt + timedelta(minutes=20), seen, found))
+
+        # 예전 파일 하나가 다시 쓰임(잘림) → 그 파일만 처음부터 다시 읽음
+        # (같은 크기로 다시 쓰일 수도 있어 ETL_FULL_REFRESH 와 같은 전체 나열로 실행)
+        victim = tree.path(current - timedelta(days=3))
+        tree.expected -= {json.loads(line)['props']['seq'] for line in victim.read_bytes().splitlines()}
+        victim.write_bytes(b'')
+        tree.append(current - timedelta(days=3), 5)
+        results['5_rewritten_file'] = run_etl(tree, checkpoint, nxt + timedelta(minutes=30), seen)
+
+        # 다른 워커가 종료된 워커의 세그먼트를 늦게 복구해 이미 봉인된 과거 날짜에 rename 으로 나타남
+        late = current - timedelta(days=2)
+        segment = tree.path(late).with_name(f'{tree.path(late).stem}-bench-1-000001.jsonl')
+        opened = segment.with_name(f'.{segment.name}.open')
+        opened.write_bytes(b''.join(tree._line(late) for _ in range(5)))
+        os.replace(opened, segment)
+        found, sensor_ms = sensor(nxt + timedelta(minutes=40))
+        if late.strftime('%Y/%m/%d') not in found:
+            failures.append(f'sensor missed the day of the recovered segment, got {found}')
+        results['6_recovered_segment'] = {'sensor_partitions': found, 'sensor_ms': sensor_ms}
+        results['6_recovered_segment'].update(run_etl(tree, Checkpoint(checkpoint.path), nxt + timedelta(minutes=40), seen, found))
+
+        dupes = len(seen) - len(set(seen))
+        missing = tree.expected - set(seen)
+        if dupes:
+            failures.append(f'{dupes} events processed more than once')
+        if missing:
+            failures.append(f'{len(missing)} events never processed')
+        if results['4_next_hour']['files_read'] != 1:
+            failures.append('next-hour run should read only the new hour file')
+        if results['5_rewritten_file']['files_read'] != 1:
+            failures.append('rewritten-file run should re-read only that file')
+
+    print(json.dumps({'months': args.months, 'runs': results, 'failures': failures}, indent=2, ensure_ascii=False))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
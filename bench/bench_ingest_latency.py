@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""`/api/events` 지연 시간 백분위 벤치마크.
+
+web 앱을 uvicorn 으로 띄운 뒤, 트래픽 생성기(`_run_traffic_spike`)와 같은 형태의 요청을
+동시에 보내 p50/p90/p99 지연을 측정합니다. 기본으로 direct(요청마다 동기 기록)와
+buffered(큐 적재 후 즉시 응답) 두 모드를 차례로 측정합니다. ``--target`` 을 주면
+이미 떠 있는 서버(예: 이전 버전)를 대상으로 측정합니다.
+
+    python bench/bench_ingest_latency.py --requests 5000 --concurrency 50
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+WEB_DIR = Path(__file__).resolve().parents[1] / 'web'
+TRAFFIC_ACTIONS = ['login', 'view_home', 'search', 'view_product', 'cart', 'checkout', 'logout']
+TRAFFIC_PATHS = ['/', '/feed', '/product/1', '/product/2', '/cart', '/checkout']
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(env_overrides: dict[str, str]) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, **env_overrides}
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=WEB_DIR,
+        env=env,
+    )
+    base = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            requests.get(f'{base}/api/categories', timeout=0.5)
+            return proc, f'{base}/api/events'
+        except requests.RequestException:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError('web 서버가 기동되지 않았습니다.')
+
+
+def drive(target: str, total: int, concurrency: int, user_pool: int = 2000) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def _worker():
+        session = requests.Session()
+        local_lat = []
+        local_status: dict[int, int] = {}
+        while True:
+            with lock:
+                idx = next(counter, None)
+            if idx is None:
+                break
+            user_id = f'user-{idx % user_pool:05d}'
+            payload = {
+                'event_type': random.choice(TRAFFIC_ACTIONS),
+                'metadata': {'path': random.choice(TRAFFIC_PATHS)},
+                'username': user_id,
+            }
+            start = time.perf_counter()
+            try:
+                code = session.post(target, json=payload, headers={'X-Load-Test': 'bench'}, timeout=10).status_code
+            except requests.RequestException:
+                code = 0
+            local_lat.append((time.perf_counter() - start) * 1000)
+            local_status[code] = local_status.get(code, 0) + 1
+        with lock:
+            latencies.extend(local_lat)
+            for code, cnt in local_status.items():
+                statuses[code] = statuses.get(code, 0) + cnt
+
+    threads = [threading.Thread(target=_worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': total,
+        'statuses': statuses,
+        'duration_sec': round(elapsed, 2),
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p90_ms': round(percentile(latencies, 90), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--target', help='이미 실행 중인 /api/events 주소')
+    parser.add_argument('--modes', default='direct,buffered')
+    args = parser.parse_args()
+
+    if args.target:
+        print(json.dumps(drive(args.target, args.requests, args.concurrency), indent=2))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes.split(','):
+            proc, target = _start_server(
+                {
+                    'BRONZE_WRITE_MODE': mode,
+                    'BRONZE_ROOT': str(Path(tmp) / mode / 'bronze'),
+                    'USE_MINIO': 'false',
+                }
+            )
+            try:
+                drive(target, min(200, args.requests), args.concurrency)  # 워밍업
+                results[mode] = drive(target, args.requests, args.concurrency)
+            finally:
+                proc.terminate()
+                proc.wait(10)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
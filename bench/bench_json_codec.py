@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""JSON 직렬화 CPU 벤치마크: 이벤트 1건당 CPU 시간(µs) — 표준 json vs fast_json 백엔드(msgspec / orjson).
+
+설치된 백엔드마다 ``fast_json.Codec`` 을 만들어 같은 입력으로 ``time.process_time`` 을 재고, 기존 경로
+(build_record + ``now.isoformat()`` 두 번 + ``json.dumps(ensure_ascii=False)``, json.loads + pydantic)를
+기준(baseline)으로 배율을 출력합니다.
+
+  - event_line     : 브론즈 레코드 한 줄 직렬화 (fast_json 은 요청당 isoformat 한 번 + msgspec Struct)
+  - batch_decode   : NDJSON 배치 한 줄 디코딩 + CustomEventRequest 규칙 검증
+  - response_dumps : /api/events/stats 모양의 응답 dict 직렬화 (FastJSONResponse / PrecomputedResponse)
+
+모든 백엔드의 결과를 JSON 으로 다시 읽어 기준과 같은지도 확인합니다.
+
+    python bench/bench_json_codec.py --events 200000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from pydantic import BaseModel  # noqa: E402
+
+import fast_json  # noqa: E402
+from bronze_schema import build_record  # noqa: E402
+
+
+class CustomEventRequest(BaseModel):
+    # web/app.py 의 요청 모델과 같은 정의 (app 을 import 하면 boto3/MinIO 설정까지 읽으므로 복제)
+    event_type: str
+    metadata: dict[str, Any] | None = None
+    username: str | None = None
+
+
+def _events(count: int) -> list[tuple[str, str, dict[str, Any]]]:
+    rng = random.Random(5)
+    types = ('page_view', 'search_query', 'category_select', 'video_open')
+    return [
+        (
+            rng.choice(types),
+            f'user-{rng.randrange(2000):05d}',
+            {'path': f'/courses/{rng.randrange(40)}', 'query': '데이터 엔지니어링', 'rank': rng.random(), 'tags': ['a', 'b']},
+        )
+        for _ in range(count)
+    ]
+
+
+def _stats_payload() -> dict[str, Any]:
+    days = [f'2025-12-{d:02d}' for d in range(1, 31)]
+    types = ('login', 'page_view', 'search_query', 'category_select', 'category_recommendation', 'video_open')
+    return {
+        'since': days[0],
+        'until': days[-1],
+        'type': None,
+        'total': 123456,
+        'by_day': [{'event_date': d, 'events': 4000 + i} for i, d in enumerate(days)],
+        'by_type': {t: 20000 + i for i, t in enumerate(types)},
+        'daily': [{'event_date': d, 'type': t, 'events': 700, 'users': 90} for d in days for t in types],
+        'top_categories': [{'category': f'cat-{i}', 'events': 1000 - i} for i in range(10)],
+    }
+
+
+def _cpu_us(fn, items) -> float:
+    started = time.process_time()
+    for item in items:
+        fn(item)
+    return (time.process_time() - started) * 1e6 / len(items)
+
+
+def _baseline_line(event) -> str:
+    event_type, username, props = event
+    now = datetime.now(timezone.utc)
+    rec = build_record(event_type, username, props, now.isoformat(), {'received_ts': now.isoformat(), 'ip': '127.0.0.1', 'ua': 'bench'})
+    return json.dumps(rec, ensure_ascii=False)
+
+
+def _codec_line(codec: fast_json.Codec):
+    def line(event) -> str:
+        event_type, username, props = event
+        ts = datetime.now(timezone.utc).isoformat()
+        return codec.event_line(event_type, username, props, ts, {'received_ts': ts, 'ip': '127.0.0.1', 'ua': 'bench'})
+
+    return line
+
+
+def _baseline_decode(raw: bytes):
+    event = CustomEventRequest(**json.loads(raw))
+    return event.event_type, event.username or 'anonymous', event.metadata or {}
+
+
+def _codec_decode(codec: fast_json.Codec):
+    def decode(raw: bytes):
+        item = codec.loads(raw)
+        event = codec.convert_event(item) if codec.typed_events else CustomEventRequest(**item)
+        return event.event_type, event.username or 'anonymous', event.metadata or {}
+
+    return decode
+
+
+def _same_lines(a: str, b: str) -> bool:
+    # ts 는 호출 시각이라 다를 수 있으므로 빼고 비교합니다.
+    left, right = json.loads(a), json.loads(b)
+    for rec in (left, right):
+        rec.pop('ts')
+        rec['_server'].pop('received_ts')
+    return left == right
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--responses', type=int, default=5000)
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    raws = [json.dumps({'event_type': t, 'username': u, 'metadata': p}, ensure_ascii=False).encode('utf-8') for t, u, p in events]
+    payloads = [_stats_payload()] * args.responses
+    baseline = {
+        'event_line': _cpu_us(_baseline_line, events),
+        'batch_decode': _cpu_us(_baseline_decode, raws),
+        'response_dumps': _cpu_us(lambda p: json.dumps(p, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), payloads),
+    }
+    results: dict[str, Any] = {
+        'events': args.events,
+        'backends_available': list(fast_json.BACKENDS),
+        'baseline_us_per_event': {k: round(v, 2) for k, v in baseline.items()},
+        'backends': {},
+    }
+    for backend in fast_json.BACKENDS:
+        codec = fast_json.Codec(backend)
+        line, decode = _codec_line(codec), _codec_decode(codec)
+        measured = {
+            'event_line': _cpu_us(line, events),
+            'batch_decode': _cpu_us(decode, raws),
+            'response_dumps': _cpu_us(codec.dumps, payloads),
+        }
+        sample = events[:1000]
+        identical = (
+            all(_same_lines(line(e), _baseline_line(e)) for e in sample)
+            and all(decode(r) == _baseline_decode(r) for r in raws[:1000])
+            and json.loads(codec.dumps(payloads[0])) == payloads[0]
+        )
+        results['backends'][backend] = {
+            **codec.status(),
+            'us_per_event': {k: round(v, 2) for k, v in measured.items()},
+            'speedup': {k: round(baseline[k] / v, 2) for k, v in measured.items()},
+            'identical_to_baseline': identical,
+        }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""MinIO 업로드량 비교 벤치마크.
+
+이벤트마다 시간 파일 전체를 다시 올리던 기존 방식과 MinioShipper 세그먼트 전송의
+이벤트당 업로드 바이트/요청 수를 비교합니다. 기본은 메모리 S3 대역(stand-in)을 쓰고,
+moto 가 설치되어 있으면 ``--moto`` 로 실제 boto3 클라이언트 경로를 태울 수 있습니다.
+
+    python bench/bench_minio_shipper.py --events 5000
+"""
+import argparse
+import json
+import sys
+import tempfile
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'web'))
+
+from bronze_writer import bronze_partition_path  # noqa: E402
+from minio_shipper import MinioShipper  # noqa: E402
+
+
+class MemoryS3:
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.requests = 0
+        self.bytes = 0
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **_):
+        self.requests += 1
+        self.bytes += len(Body)
+        self.objects[(Bucket, Key)] = Body
+
+    def upload_file(self, filename: str, bucket: str, key: str):
+        self.put_object(Bucket=bucket, Key=key, Body=Path(filename).read_bytes())
+
+
+def _line(idx: int) -> str:
+    now = datetime.now(timezone.utc).isoformat()
+    rec = {
+        'type': 'view_product',
+        'ts': now,
+        'user_id': f'user-{idx % 2000:05d}',
+        'props': {'path': '/product/1'},
+        '_server': {'received_ts': now, 'ip': '127.0.0.1', 'ua': 'bench'},
+    }
+    return json.dumps(rec, ensure_ascii=False) + '\n'
+
+
+def _client_factory(use_moto: bool):
+    if not use_moto:
+        s3 = MemoryS3()
+        return (lambda: s3), s3, nullcontext()
+    import boto3
+    from moto import mock_aws
+
+    counter = MemoryS3()
+
+    def _factory():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='logs')
+        original = client.put_object
+
+        def _put_object(**kwargs):
+            counter.requests += 1
+            counter.bytes += len(kwargs['Body'])
+            return original(**kwargs)
+
+        client.put_object = _put_object
+        return client
+
+    return _factory, counter, mock_aws()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--segment-bytes', type=int, default=256 * 1024)
+    parser.add_argument('--moto', action='store_true')
+    args = parser.parse_args()
+
+    lines = [_line(i) for i in range(args.events)]
+    now = datetime.now(timezone.utc)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'whole'
+        dest = bronze_partition_path(root, now)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        s3 = MemoryS3()
+        with dest.open('a', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line)
+                f.flush()
+                s3.upload_file(str(dest), 'logs', f"bronze/app/{now.strftime('%Y/%m/%d')}/{dest.name}")
+        results['whole_file_per_event'] = {
+            'requests': s3.requests,
+            'bytes_uploaded': s3.bytes,
+            'bytes_per_event': round(s3.bytes / args.events, 1),
+        }
+
+        root = Path(tmp) / 'segments'
+        dest = bronze_partition_path(root, now)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        factory, counter, ctx = _client_factory(args.moto)
+        with ctx:
+            shipper = MinioShipper(
+                root,
+                'logs',
+                factory,
+                manifest_path=Path(tmp) / 'state' / 'manifest.json',
+                max_segment_bytes=args.segment_bytes,
+                max_segment_age=3600,
+            )
+            # 500건마다 writer flush 가 일어난다고 가정합니다.
+            with dest.open('a', encoding='utf-8') as f:
+                for idx, line in enumerate(lines, 1):
+                    f.write(line)
+                    if idx % 500 == 0:
+                        f.flush()
+                        shipper.notify(dest, now)
+                        shipper.ship_once()
+            shipper.ship_once(force=True)
+        results['segments'] = {
+            'requests': counter.requests,
+            'bytes_uploaded': counter.bytes,
+            'bytes_per_event': round(counter.bytes / args.events, 1),
+            'file_bytes': dest.stat().st_size,
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
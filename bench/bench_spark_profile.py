@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Spark 튜닝 프로필 벤치마크: 시간별 작은 브론즈 파일 → event_date 파티션 쓰기.
+
+``--days`` 일 x 24 시간 파일의 합성 브론즈(web 과 같은 레코드)를 만들고, job_etl.py 의 읽기/파싱/쓰기 경로
+(text → from_json(bronze_schema) → to_date → partitionBy("event_date"))를
+  - default     : Spark 기본 설정, 시간 파일 그대로
+  - small_files : spark_profile 의 AQE/분할 설정 + 쓰기 전 event_date rebalance, 시간 파일 그대로
+  - compacted   : small_files + bronze_compaction 으로 하루 파일로 합친 입력
+으로 실행해 읽기 분할 수, 전체 task 수, 벽시계 시간, 만들어진 출력 파일 수를 비교합니다.
+Delta 패키지 없이 돌도록 출력은 Parquet 으로 씁니다 (파일 배치는 Delta 쓰기와 같습니다).
+
+pyspark 가 있는 곳(spark-master 컨테이너 등)에서 실행합니다.
+
+    python bench/bench_spark_profile.py --days 14 --events-per-hour 3000
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'spark' / 'app'))
+sys.path.insert(0, str(ROOT / 'web'))
+
+import spark_profile  # noqa: E402
+from bronze_checkpoint import Checkpoint, list_local  # noqa: E402
+from bronze_compaction import compact  # noqa: E402
+from bronze_schema import build_record, spark_schema  # noqa: E402
+
+START = datetime(2025, 11, 1, tzinfo=timezone.utc)
+TYPES = ('login', 'page_view', 'search_query', 'category_select', 'video_open')
+
+
+def _write_bronze(root: Path, days: int, per_hour: int) -> int:
+    rng = random.Random(7)
+    files = 0
+    for hour_idx in range(days * 24):
+        hour = START + timedelta(hours=hour_idx)
+        dest = root / hour.strftime('%Y/%m/%d') / f'part-{hour:%Y%m%d-%H}.jsonl'
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with dest.open('w', encoding='utf-8') as f:
+            for idx in range(per_hour):
+                ts = (hour + timedelta(seconds=idx * 3600 / per_hour)).isoformat()
+                props = {'path': f'/courses/{rng.randrange(40)}', 'categoryId': f'cat-{rng.randrange(12)}'}
+                rec = build_record(rng.choice(TYPES), f'user-{rng.randrange(5000):04d}', props, ts, {'ip': '10.0.0.1'})
+                f.write(json.dumps(rec) + '\n')
+        files += 1
+    return files
+
+
+def _compacted_copy(src: Path, dest: Path, state: Path) -> None:
+    """원본을 복사해 모두 처리된 것으로 체크포인트에 기록한 뒤 bronze_compaction 으로 합칩니다."""
+    shutil.copytree(src, dest)
+    checkpoint = Checkpoint(str(state))
+    now = START + timedelta(days=365)
+    for item in checkpoint.plan(list_local(str(dest)), now=now, grace_sec=0):
+        checkpoint.commit(item, item['size'])
+    checkpoint.save()
+    compact(str(dest), str(state), after_days=1, now=now)
+
+
+def _run(spark, name: str, profile: str, bronze: Path, out: Path) -> dict:
+    from pyspark.sql.functions import col, from_json, to_date, to_timestamp
+
+    all_keys = {key for conf in spark_profile.PROFILES.values() for key in conf}
+    for key in all_keys:
+        spark.conf.unset(key)
+    for key, value in spark_profile.resolve(profile, overrides='').items():
+        spark.conf.set(key, value)
+
+    sc = spark.sparkContext
+    sc.setJobGroup(name, name)
+    started = time.perf_counter()
+    raw = spark.read.text(str(bronze / '*' / '*' / '*' / 'part-*.jsonl'))
+    read_partitions = raw.rdd.getNumPartitions()
+    events = (
+        raw.select(from_json(col('value'), spark_schema(with_corrupt=False)).alias('e'))
+        .select('e.*')
+        .withColumn('ts', to_timestamp(col('ts')))
+        .withColumn('event_date', to_date(col('ts')))
+    )
+    spark_profile.rebalance_for_write(events, name=profile).write.mode('overwrite').partitionBy('event_date').parquet(str(out))
+    wall = time.perf_counter() - started
+
+    tracker = sc.statusTracker()
+    tasks = 0
+    for job_id in tracker.getJobIdsForGroup(name):
+        job = tracker.getJobInfo(job_id)
+        for stage_id in job.stageIds if job else []:
+            stage = tracker.getStageInfo(stage_id)
+            tasks += stage.numTasks if stage else 0
+    files = list(out.rglob('part-*.parquet'))
+    return {
+        'profile': profile,
+        'read_partitions': read_partitions,
+        'tasks': tasks,
+        'wall_sec': round(wall, 2),
+        'output_files': len(files),
+        'output_files_per_day': round(len(files) / max(len({p.parent for p in files}), 1), 1),
+        'avg_output_file_kb': round(sum(p.stat().st_size for p in files) / max(len(files), 1) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--events-per-hour', type=int, default=3000)
+    parser.add_argument('--master', default='local[4]')
+    args = parser.parse_args()
+
+    from pyspark.sql import SparkSession
+
+    spark = SparkSession.builder.master(args.master).appName('bench_spark_profile').getOrCreate()
+    spark.sparkContext.setLogLevel('WARN')
+    results = {'days': args.days, 'events_per_hour': args.events_per_hour, 'master': args.master}
+    with tempfile.TemporaryDirectory() as tmp:
+        hourly, daily = Path(tmp) / 'hourly', Path(tmp) / 'daily'
+        results['input_files'] = {'hourly': _write_bronze(hourly, args.days, args.events_per_hour)}
+        _compacted_copy(hourly, daily, Path(tmp) / 'checkpoint.json')
+        results['input_files']['compacted'] = len(list(daily.rglob('part-*.jsonl')))
+        # 첫 실행의 JVM/코드 생성 비용이 비교에 섞이지 않도록 한 번 데웁니다.
+        _run(spark, 'warmup', 'default', hourly, Path(tmp) / 'out-warmup')
+        scenarios = (('default', 'default', hourly), ('small_files', 'small_files', hourly), ('compacted', 'small_files', daily))
+        results['runs'] = {name: _run(spark, name, profile, bronze, Path(tmp) / f'out-{name}') for name, profile, bronze in scenarios}
+    spark.stop()
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""`/api/login` 처리량 벤치마크 (사용자 수별).
+
+N명짜리 users.json 을 만들어 두고
+  - legacy: 요청마다 users.json 을 json.load 후 선형 탐색하던 기존 방식
+  - store : FileUserStore (한 번 적재 후 dict 조회)
+의 사용자 조회 처리량과, 앱을 in-process 로 띄웠을 때의 `/api/login` 처리량을 측정합니다.
+
+    python bench/bench_user_store.py --users 10000,1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parents[1] / 'web'
+sys.path.insert(0, str(WEB_DIR))
+
+from user_store import FileUserStore  # noqa: E402
+
+
+def _write_users(path: Path, count: int):
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(
+            [
+                {
+                    'username': f'user-{idx:07d}',
+                    'password': f'pw-{idx}',
+                    'full_name': f'사용자 {idx}',
+                    'interests': ['data-engineering', 'backend'],
+                }
+                for idx in range(count)
+            ],
+            f,
+            ensure_ascii=False,
+        )
+
+
+def _legacy_get(path: Path, username: str):
+    with path.open(encoding='utf-8') as f:
+        users = json.load(f)
+    for user in users:
+        if user['username'] == username:
+            return user
+    return None
+
+
+def _rate(fn, names: list[str], budget_sec: float) -> dict:
+    done = 0
+    start = time.perf_counter()
+    for name in names:
+        fn(name)
+        done += 1
+        if time.perf_counter() - start > budget_sec:
+            break
+    elapsed = time.perf_counter() - start
+    return {'lookups': done, 'per_sec': round(done / elapsed, 1)}
+
+
+def _login_rps(users_path: Path, names: list[str], budget_sec: float) -> dict:
+    os.environ['USERS_PATH'] = str(users_path)
+    os.environ.setdefault('BRONZE_ROOT', str(users_path.parent / 'bronze'))
+    os.environ['USER_STORE'] = 'file'
+    sys.modules.pop('app', None)
+    import app  # noqa: WPS433
+    from fastapi.testclient import TestClient
+
+    done = 0
+    with TestClient(app.app) as client:
+        start = time.perf_counter()
+        for name in names:
+            idx = name.rsplit('-', 1)[1]
+            client.post('/api/login', json={'username': name, 'password': f'pw-{int(idx)}'})
+            done += 1
+            if time.perf_counter() - start > budget_sec:
+                break
+        elapsed = time.perf_counter() - start
+    return {'requests': done, 'rps': round(done / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', default='10000,1000000')
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--budget-sec', type=float, default=10.0)
+    parser.add_argument('--skip-http', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(c) for c in args.users.split(',')):
+            path = Path(tmp) / f'users-{count}.json'
+            _write_users(path, count)
+            names = [f'user-{random.randrange(count):07d}' for _ in range(args.lookups)]
+
+            store = FileUserStore(path)
+            load_start = time.perf_counter()
+            asyncio.run(store.start())
+            load_sec = time.perf_counter() - load_start
+            row = {
+                'file_mb': round(path.stat().st_size / 1e6, 1),
+                'store_load_sec': round(load_sec, 3),
+                'legacy_lookup': _rate(lambda n: _legacy_get(path, n), names, args.budget_sec),
+                'store_lookup': _rate(lambda n: store._users.get(n), names, args.budget_sec),
+            }
+            if not args.skip_http:
+                row['login_http'] = _login_rps(path, names, args.budget_sec)
+            results[str(count)] = row
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""ETL 엔진 동등성 검사: Spark(spark_transform) vs 경량 엔진(job_etl_light + event_transform).
+
+정상 레코드와 일부러 깨뜨린 레코드(중복 id, JSON 아님, 필수 필드 없음, 잘못된 ts, 높은 schema_version,
+오프셋 없는 ts, 유니코드/중첩 props, 정수 필드에 문자열 등)를 섞은 합성 브론즈 트리(JSONL 시간 파일 +
+Parquet 세그먼트)를 두 엔진으로 변환해
+
+  - 이벤트: id 집합과 id 별 type / ts / event_date / username / props / server / source_file
+    (props/server 는 JSON 으로 읽어 비교, source_file 은 ``file:`` 접두어를 뗀 경로로 비교)
+  - 격리: 파일별 사유 개수
+
+가 같은지 확인합니다. 다르면 차이를 출력하고 0이 아닌 코드로 끝납니다.
+pyspark 가 있는 airflow 컨테이너에서 실행합니다.
+
+    PYTHONPATH=/opt/spark/app:/opt/spark/shared python bench/parity_etl_engines.py --events 20000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / 'spark' / 'app'))
+sys.path.insert(0, str(ROOT / 'web'))
+
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from bronze_checkpoint import Checkpoint, list_local, normalize  # noqa: E402
+from bronze_schema import arrow_schema, build_record  # noqa: E402
+from event_transform import TIMEZONE, transform  # noqa: E402
+
+START = datetime(2025, 12, 1, 13, tzinfo=timezone.utc)  # 서울 기준 자정을 넘는 시간대가 섞이도록
+ODD_LINES = (
+    'not json at all',
+    '[1, 2, 3]',
+    '{"type": "login", "user_id": "u-missing-ts"}',
+    '{"type": "login", "ts": "yesterday", "user_id": "u-bad-ts"}',
+    '{"schema_version": 99, "type": "login", "ts": "2025-12-01T13:00:00+00:00", "user_id": "u-future"}',
+    '{"schema_version": "1", "type": "login", "ts": "2025-12-01T13:00:00+00:00", "user_id": "u-str-version"}',
+    '{"type": "login", "ts": "2025-12-01T23:59:59", "user_id": "u-naive-ts"}',
+    '{"type": "search", "ts": "2025-12-01T14:00:00.123456Z", "user_id": "u-z", "props": {"q": "데이터 \\u2028 엔지니어링", "tags": ["a", {"b": null}], "n": 3}}',
+    '{"type": "page_view", "ts": "2025-12-01T14:00:00+09:00", "user_id": "u-kst", "props": "plain string props"}',
+    '{"type": 42, "ts": "2025-12-01T15:00:00+00:00", "user_id": "u-num-type", "props": true}',
+)
+
+
+def _fixture(root: Path, events: int) -> None:
+    rng = random.Random(11)
+    lines_by_hour: dict[datetime, list[str]] = {}
+    for idx in range(events):
+        ts = START + timedelta(seconds=idx * 43200 / events)
+        props = {'path': f'/courses/{rng.randrange(40)}', 'categoryId': f'cat-{rng.randrange(12)}', 'rank': rng.random()}
+        rec = build_record(rng.choice(['login', 'page_view', 'search']), f'user-{rng.randrange(300)}', props, ts.isoformat(), {'ip': '10.0.0.1'})
+        line = json.dumps(rec, ensure_ascii=False)
+        hour = ts.replace(minute=0, second=0, microsecond=0)
+        lines_by_hour.setdefault(hour, []).append(line)
+        if idx % 500 == 0:
+            lines_by_hour[hour].append(line)  # 같은 파일 안의 중복 id
+    first_hour = min(lines_by_hour)
+    lines_by_hour[first_hour].extend(ODD_LINES)
+    for hour, lines in lines_by_hour.items():
+        dest = root / hour.strftime('%Y/%m/%d') / f'part-{hour:%Y%m%d-%H}.jsonl'
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text('\r\n'.join(lines[:3]) + '\r\n' + '\n'.join(lines[3:]) + '\n', encoding='utf-8')
+
+    # Parquet 세그먼트: 정상 행 + 필수 필드 없는 행 + 높은 schema_version
+    hour = START + timedelta(hours=2)
+    rows = [
+        {'schema_version': 1, 'type': 'login', 'ts': (hour + timedelta(seconds=i)).isoformat(), 'user_id': f'seg-{i}', 'props': json.dumps({'i': i}), '_server': '{}'}
+        for i in range(200)
+    ]
+    rows.append({'schema_version': 1, 'type': 'login', 'ts': None, 'user_id': 'seg-no-ts', 'props': None, '_server': None})
+    rows.append({'schema_version': 7, 'type': 'login', 'ts': hour.isoformat(), 'user_id': 'seg-future', 'props': None, '_server': None})
+    dest = root / hour.strftime('%Y/%m/%d') / f'part-{hour:%Y%m%d-%H}-1-1.parquet'
+    pq.write_table(pa.Table.from_pylist(rows, schema=arrow_schema()), dest)
+
+
+def _light(root: Path):
+    import job_etl_light
+
+    work = Checkpoint(None).plan(list_local(str(root)), grace_sec=0)
+    items, _committed = job_etl_light.read_work(work)
+    events, quarantined = transform(items)
+    return (
+        {e[0]: e for e in events},
+        Counter((normalize(source), reason) for _raw, source, reason in quarantined),
+    )
+
+
+def _spark(root: Path):
+    from pyspark.sql import SparkSession
+    from pyspark.sql.functions import col, input_file_name
+
+    from bronze_schema import spark_schema
+    from event_transform import EVENT_COLUMNS
+    from spark_transform import parse_lines, segment_columns, to_events, with_quarantine_reason
+
+    spark = (
+        SparkSession.builder.master('local[2]')
+        .appName('parity_etl_engines')
+        .config('spark.sql.session.timeZone', TIMEZONE)
+        .getOrCreate()
+    )
+    spark.sparkContext.setLogLevel('WARN')
+    jsonl = [str(p) for p in root.rglob('part-*.jsonl')]
+    segments = [str(p) for p in root.rglob('part-*.parquet')]
+    parsed = parse_lines(spark.read.text(jsonl).withColumn('source_file', input_file_name()))
+    parsed = parsed.unionByName(segment_columns(spark.read.schema(spark_schema(with_corrupt=False)).parquet(*segments)))
+    parsed = with_quarantine_reason(parsed).cache()
+    events = {r['id']: tuple(r[name] for name in EVENT_COLUMNS) for r in to_events(parsed).collect()}
+    quarantined = Counter(
+        (normalize(r['source_file']), r['quarantine_reason'])
+        for r in parsed.where(col('quarantine_reason').isNotNull()).select('source_file', 'quarantine_reason').collect()
+    )
+    spark.stop()
+    return events, quarantined
+
+
+def _same(name: str, light, spark) -> bool:
+    if name in ('props', 'server'):
+        # 객체/배열 값은 두 엔진의 JSON 직렬화 공백이 다를 수 있어 내용으로 비교합니다.
+        return light == spark or (light is not None and spark is not None and json.loads(light) == json.loads(spark))
+    if name == 'ts':
+        # Spark 는 드라이버 프로세스 시간대의 naive datetime 으로 돌려줍니다 (TZ=TIMEZONE 로 맞춰 둠).
+        return light.replace(tzinfo=None) == spark
+    if name == 'source_file':
+        return normalize(light) == normalize(spark)
+    return light == spark
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+    os.environ['TZ'] = TIMEZONE
+    time.tzset()
+
+    from event_transform import EVENT_COLUMNS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'bronze'
+        _fixture(root, args.events)
+        started = time.perf_counter()
+        light_events, light_quarantine = _light(root)
+        light_sec = time.perf_counter() - started
+        started = time.perf_counter()
+        spark_events, spark_quarantine = _spark(root)
+        spark_sec = time.perf_counter() - started
+
+    only_light = sorted(set(light_events) - set(spark_events))
+    only_spark = sorted(set(spark_events) - set(light_events))
+    diffs = Counter()
+    examples = []
+    for event_id in set(light_events) & set(spark_events):
+        for idx, name in enumerate(EVENT_COLUMNS):
+            if not _same(name, light_events[event_id][idx], spark_events[event_id][idx]):
+                diffs[name] += 1
+                if len(examples) < 5:
+                    examples.append({'id': event_id, 'column': name, 'light': str(light_events[event_id][idx]), 'spark': str(spark_events[event_id][idx])})
+    quarantine_diff = {f'{k[0]}:{k[1]}': (light_quarantine.get(k, 0), spark_quarantine.get(k, 0)) for k in set(light_quarantine) | set(spark_quarantine) if light_quarantine.get(k, 0) != spark_quarantine.get(k, 0)}
+    result = {
+        'timezone': TIMEZONE,
+        'events': {'light': len(light_events), 'spark': len(spark_events)},
+        'quarantined': {'light': sum(light_quarantine.values()), 'spark': sum(spark_quarantine.values())},
+        'only_light': only_light[:5],
+        'only_spark': only_spark[:5],
+        'column_diffs': dict(diffs),
+        'examples': examples,
+        'quarantine_diffs': quarantine_diff,
+        'transform_sec': {'light': round(light_sec, 2), 'spark_including_startup': round(spark_sec, 2)},
+    }
+    result['identical'] = not (only_light or only_spark or diffs or quarantine_diff)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.exit(0 if result['identical'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -32,4 +32,9 @@ export interface RecommendationResponse {
     accent?: string;
   };
   courses: CourseInfo[];
+  pagination?: {
+    offset: number;
+    limit: number;
+    total: number;
+  };
 }
@@ -6,3 +6,62 @@ CREATE TABLE IF NOT EXISTS mart.daily_events (
   cnt        bigint NOT NULL,
   PRIMARY KEY (event_date, user_id)
 );
+CREATE INDEX IF NOT EXISTS daily_events_user_id_event_date_idx ON mart.daily_events (user_id, event_date);
+
+-- 대시보드용 rollup (logs_etl 이 적재한 날짜만 mart.events 에서 다시 집계해 upsert, spark/app/pg_rollups.py)
+-- users 는 그 날/그 시간의 고유 사용자 수라 기간 합산 대상이 아닙니다.
+CREATE TABLE IF NOT EXISTS mart.daily_event_types (
+  event_date date NOT NULL,
+  type       text NOT NULL,
+  events     bigint NOT NULL,
+  users      bigint NOT NULL,
+  PRIMARY KEY (event_date, type)
+);
+CREATE INDEX IF NOT EXISTS daily_event_types_type_event_date_idx ON mart.daily_event_types (type, event_date);
+
+CREATE TABLE IF NOT EXISTS mart.hourly_event_types (
+  event_hour timestamp NOT NULL,
+  type       text NOT NULL,
+  event_date date NOT NULL,
+  events     bigint NOT NULL,
+  users      bigint NOT NULL,
+  PRIMARY KEY (event_hour, type)
+);
+CREATE INDEX IF NOT EXISTS hourly_event_types_event_date_idx ON mart.hourly_event_types (event_date);
+CREATE INDEX IF NOT EXISTS hourly_event_types_type_event_hour_idx ON mart.hourly_event_types (type, event_hour);
+
+-- 카테고리: props 의 category / categoryId / category_id
+CREATE TABLE IF NOT EXISTS mart.daily_category_events (
+  event_date date NOT NULL,
+  category   text NOT NULL,
+  type       text NOT NULL,
+  events     bigint NOT NULL,
+  users      bigint NOT NULL,
+  PRIMARY KEY (event_date, category, type)
+);
+CREATE INDEX IF NOT EXISTS daily_category_events_category_event_date_idx ON mart.daily_category_events (category, event_date);
+
+-- logs_etl 실행 기록: 단계별 소요 시간(stage_sec)과 날짜별 브론즈/Delta/mart 행 수·id 체크섬(checks)
+CREATE TABLE IF NOT EXISTS mart.etl_runs (
+  run_id       text PRIMARY KEY,
+  started_at   timestamptz NOT NULL,
+  finished_at  timestamptz,
+  status       text NOT NULL,
+  partitions   text,
+  files_read   integer,
+  events_in    bigint,
+  quarantined  bigint,
+  stage_sec    jsonb NOT NULL DEFAULT '{}',
+  checks       jsonb NOT NULL DEFAULT '{}',
+  error        text
+);
+
+-- USER_STORE=postgres 일 때 web 이 조회하는 사용자 테이블
+CREATE SCHEMA IF NOT EXISTS app;
+
+CREATE TABLE IF NOT EXISTS app.users (
+  username   text PRIMARY KEY,
+  password   text NOT NULL,
+  full_name  text NOT NULL,
+  interests  text[] NOT NULL DEFAULT '{}'
+);
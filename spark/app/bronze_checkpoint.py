@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""브론즈 증분 처리를 위한 처리 파일 체크포인트.
+
+파일마다 마지막으로 처리한 바이트 오프셋과 (크기, mtime, S3 ETag)를 기록해 두고,
+다음 실행에서는 새 파일과 커진 파일의 새 구간만 읽도록 계획을 세웁니다.
+Spark 에 의존하지 않으므로 Airflow 센서나 벤치마크에서도 그대로 가져다 씁니다.
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+BRONZE_SUFFIXES = (".jsonl", ".json", ".parquet")
+# 완성된 뒤에만 나타나는 불변 세그먼트 (web 의 BRONZE_FORMAT=parquet)
+COLUMNAR_SUFFIXES = (".parquet",)
+_HOUR_RE = re.compile(r"part-(\d{8})-(\d{2})")
+# web 워커 프로세스가 봉인할 때 rename 으로 나타나는 JSONL 세그먼트 part-YYYYMMDD-HH-<host>-<pid>-<seq>.jsonl
+_SEGMENT_RE = re.compile(r"^part-\d{8}-\d{2}-[A-Za-z0-9]+-\d+-\d+\.jsonl$")
+
+
+def is_bronze_file(path):
+    name = path.rsplit("/", 1)[-1]
+    return name.startswith("part-") and name.endswith(BRONZE_SUFFIXES)
+
+
+def is_columnar(path):
+    return path.endswith(COLUMNAR_SUFFIXES)
+
+
+def is_segment(path):
+    """다 쓴 뒤에 나타나 다시 바뀌지 않는 파일인지 (Parquet 세그먼트, 봉인된 JSONL 세그먼트)."""
+    return is_columnar(path) or bool(_SEGMENT_RE.match(path.rsplit("/", 1)[-1]))
+
+
+def partition_hour(path):
+    """part-YYYYMMDD-HH*.jsonl 의 시간 파티션 시작 시각(UTC). 이름에서 알 수 없으면 None."""
+    match = _HOUR_RE.search(path.rsplit("/", 1)[-1])
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1) + match.group(2), "%Y%m%d%H").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def is_closed(path, mtime_ms, now, grace_sec):
+    """더 이상 기록되지 않는 파일인지. 시간 파티션이 끝나고 ``grace_sec`` 가 지났거나,
+    파티션을 알 수 없으면 마지막 수정 후 ``grace_sec`` 가 지난 경우로 봅니다."""
+    hour = partition_hour(path)
+    if hour is not None:
+        return now >= hour + timedelta(hours=1, seconds=grace_sec)
+    return now.timestamp() * 1000 - mtime_ms >= grace_sec * 1000
+
+
+def normalize(path):
+    """Hadoop 의 ``file:/data/...`` 와 로컬 ``/data/...`` 가 같은 체크포인트 키가 되도록 맞춥니다."""
+    return re.sub(r"^file:/+", "/", path)
+
+
+def partition_of(path):
+    """브론즈 파일이 속한 날짜 파티션 ``YYYY/MM/DD``. 이름에서 알 수 없으면 None."""
+    hour = partition_hour(path)
+    return hour.strftime("%Y/%m/%d") if hour else None
+
+
+def list_partitions(base):
+    """``base`` 아래의 ``YYYY/MM/DD`` 날짜 디렉터리 (파일은 열지 않고 디렉터리만 훑습니다)."""
+    out = []
+    for level1 in _subdirs(base):
+        for level2 in _subdirs(os.path.join(base, level1)):
+            for level3 in _subdirs(os.path.join(base, level1, level2)):
+                out.append(f"{level1}/{level2}/{level3}")
+    return sorted(out)
+
+
+def _subdirs(path):
+    try:
+        return sorted(entry.name for entry in os.scandir(path) if entry.is_dir() and entry.name.isdigit())
+    except FileNotFoundError:
+        return []
+
+
+def list_local(base, partitions=None):
+    """로컬 브론즈 트리를 Hadoop listFiles 와 같은 형태({path, size, mtime, etag})로 나열합니다.
+    ``partitions`` 를 주면 그 날짜 디렉터리만 훑습니다."""
+    roots = [base] if partitions is None else [os.path.join(base, p) for p in partitions]
+    out = []
+    for root in roots:
+        out.extend(_walk(root))
+    return out
+
+
+def _walk(root):
+    out = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if not is_bronze_file(path):
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            out.append({"path": path, "size": st.st_size, "mtime": st.st_mtime_ns // 1_000_000, "etag": None})
+    return out
+
+
+class Checkpoint:
+    """``{path: {size, mtime, etag, offset, sealed}}`` 를 JSON 파일 하나에 보관합니다 (tmp 기록 후 원자적 교체).
+
+    ``scanned_at`` 은 마지막으로 ``plan`` 한 실행이 체크포인트를 연 시각(epoch 초)입니다. 파일 나열은 그 뒤에 하므로,
+    날짜 디렉터리의 mtime 이 이보다 늦으면 그 실행이 보지 못한 파일이 생겼을 수 있습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.scanned_at = None
+        self._opened_at = time.time()
+        self._planned = False
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = {normalize(k): v for k, v in data.get("files", {}).items()}
+            self.scanned_at = data.get("scanned_at")
+            if self.scanned_at is None and data.get("updated_at"):
+                # scanned_at 이 없던 체크포인트는 저장 시각으로 대신합니다.
+                self.scanned_at = datetime.fromisoformat(data["updated_at"]).timestamp()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        # 계획 없이 체크포인트만 고치는 쪽(압축)은 이전 실행의 scanned_at 을 그대로 둡니다.
+        scanned_at = self._opened_at if self._planned else self.scanned_at
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"updated_at": datetime.now(timezone.utc).isoformat(), "scanned_at": scanned_at, "files": self.files}, f
+            )
+        os.replace(tmp, self.path)
+
+    def plan(self, listing, now=None, grace_sec=300):
+        """읽어야 할 구간 목록을 돌려줍니다.
+
+        각 항목은 ``{path, start, end, whole, closed, size, mtime, etag}`` 이며, ``whole`` 이면 파일 전체를
+        Spark 로 바로 읽고(세그먼트는 항상 whole), 아니면 드라이버가 ``start`` 부터 ``end`` 까지 읽어 마지막 개행까지만 처리합니다
+        (아직 기록 중인 현재 시간 파일의 잘린 마지막 줄은 다음 실행으로 넘깁니다).
+        """
+        now = now or datetime.now(timezone.utc)
+        self._planned = True
+        work = []
+        for info in listing:
+            prev = self.files.get(normalize(info["path"]))
+            # 세그먼트는 나타난 순간 이미 봉인된 파일이라 시간 파티션이 끝나기를 기다리지 않습니다.
+            closed = is_segment(info["path"]) or is_closed(info["path"], info["mtime"], now, grace_sec)
+            start = 0
+            if prev is not None:
+                unchanged = (
+                    info["size"] == prev["size"]
+                    and info["mtime"] == prev["mtime"]
+                    and info.get("etag") == prev.get("etag")
+                )
+                rewritten = info["size"] < prev["offset"] or (
+                    prev.get("etag") and info.get("etag") and info["etag"] != prev["etag"]
+                )
+                if rewritten:
+                    # 잘리거나 다시 쓰인 파일은 처음부터 다시 읽습니다 (적재 쪽에서 id 로 중복을 걸러냅니다).
+                    start = 0
+                elif info["size"] == prev["offset"] and unchanged:
+                    if closed:
+                        prev["sealed"] = True
+                    continue
+                elif info["size"] == prev["offset"]:
+                    # 크기는 같은데 mtime 만 바뀐 경우: 같은 크기로 다시 쓰였을 수 있으니 처음부터 읽습니다.
+                    start = 0
+                else:
+                    start = prev["offset"]
+            work.append(
+                {
+                    **info,
+                    "start": start,
+                    "end": info["size"],
+                    "closed": closed,
+                    # Parquet 세그먼트는 구간으로 나눠 읽을 수 없고, 세그먼트는 나타난 시점에 이미 완성된 파일입니다.
+                    "whole": start == 0 and closed,
+                }
+            )
+        return work
+
+    def commit(self, item, end):
+        """``item`` 을 ``end`` 바이트까지 처리했다고 기록합니다."""
+        self.files[normalize(item["path"])] = {
+            "size": item["size"],
+            "mtime": item["mtime"],
+            "etag": item.get("etag"),
+            "offset": end,
+            "sealed": bool(item["closed"] and end >= item["size"]),
+        }
+
+    def prune(self, listing, roots=None):
+        """보존 기간이 지나 사라진 파일은 체크포인트에서도 지웁니다.
+        ``roots`` 를 주면 그 아래(이번에 나열한 범위)의 항목만 정리합니다."""
+        present = {normalize(info["path"]) for info in listing}
+        roots = tuple(normalize(r).rstrip("/") + "/" for r in roots) if roots else None
+        for path in [p for p in self.files if p not in present]:
+            if roots is None or path.startswith(roots):
+                del self.files[path]
+
+    def high_water(self):
+        """다음 실행이 훑어야 할 가장 이른 날짜 파티션.
+
+        아직 봉인되지 않은(기록 중이었거나 닫힌 뒤 다시 확인하지 않은) 파일 중 가장 이른 날짜이고,
+        모두 봉인되었으면 처리한 가장 늦은 날짜입니다. 체크포인트가 비어 있으면 None(전체)입니다.
+        이보다 이른 날짜에 나중에 생긴 파일(다른 워커가 늦게 복구한 세그먼트)은 ``pending_partitions`` 가
+        디렉터리 mtime 으로 찾습니다.
+        """
+        unsealed = [partition_of(p) for p, e in self.files.items() if not e.get("sealed")]
+        unsealed = [d for d in unsealed if d]
+        if unsealed:
+            return min(unsealed)
+        days = [d for d in (partition_of(p) for p in self.files) if d]
+        return max(days) if days else None
+
+
+def pending_partitions(base, checkpoint, now=None, grace_sec=300):
+    """체크포인트(마지막 성공 실행) 이후 새 데이터가 있는 날짜 파티션 목록. 없으면 빈 리스트.
+
+    ``high_water()`` 이후 날짜 디렉터리와, 그보다 이르더라도 마지막 실행이 파일을 나열한 뒤에 바뀐 날짜 디렉터리
+    (파일이 rename 으로 나타나면 디렉터리 mtime 이 바뀝니다)만 훑습니다. 기록 중인 파일은 완결된 새 줄이 있을 때만
+    새 데이터로 봅니다. 새 데이터가 있으면 같은 범위에서 봉인을 기다리는 파티션도 함께 돌려줘 ETL 이 체크포인트를 정리하게 합니다.
+    """
+    since = checkpoint.high_water()
+    scope = [
+        p
+        for p in list_partitions(base)
+        if since is None or p >= since or _changed_since(os.path.join(base, p), checkpoint.scanned_at)
+    ]
+    work = checkpoint.plan(list_local(base, scope), now=now, grace_sec=grace_sec)
+    fresh = set()
+    for item in work:
+        if not item["whole"]:
+            with open(normalize(item["path"]), "rb") as f:
+                f.seek(item["start"])
+                if not complete_lines(f.read(item["end"] - item["start"]))[1]:
+                    continue
+        fresh.add(os.path.relpath(os.path.dirname(normalize(item["path"])), base))
+    if not fresh:
+        return []
+    unsealed = {partition_of(p) for p, e in checkpoint.files.items() if not e.get("sealed")}
+    return sorted(fresh | (unsealed & set(scope)))
+
+
+def _changed_since(path, ts):
+    if ts is None:
+        return False
+    try:
+        return os.stat(path).st_mtime >= ts
+    except FileNotFoundError:
+        return False
+
+
+def complete_lines(data):
+    """``data`` 에서 마지막 개행까지의 완결된 줄만 잘라 (bytes, 소비한 바이트 수) 로 돌려줍니다."""
+    cut = data.rfind(b"\n")
+    if cut < 0:
+        return b"", 0
+    return data[: cut + 1], cut + 1
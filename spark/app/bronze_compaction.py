@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""오래된 브론즈 날짜 파티션의 시간별 JSONL 파일을 하루 파일 하나로 합칩니다.
+
+web 은 시간마다 작은 ``part-YYYYMMDD-HH.jsonl`` 을 쓰므로, 전체 재처리나 Zeppelin 조회처럼 과거 날짜를 다시
+읽을 때 파일 수만큼 분할과 파일 열기 비용이 듭니다. ``after_days`` 일이 지난 날짜 중, 모든 JSONL 파일을
+ETL 이 끝까지 처리한(체크포인트 오프셋 == 크기, 봉인) 날짜만 ``part-YYYYMMDD-00-compacted.jsonl`` 로 합칩니다.
+
+- 숨김 임시 파일에 이어 붙이고 fsync 후 rename 하므로, 도중에 멈춰도 반쯤 쓴 파일이 브론즈로 보이지 않습니다.
+- 합친 파일은 처리 완료로 체크포인트에 기록하고 원본 항목은 지운 뒤 원본을 삭제합니다. 그 사이에 멈추면 원본이
+  다시 새 파일로 읽히지만 적재는 id 기준이라 중복되지 않습니다.
+- Parquet 세그먼트와 아직 처리되지 않은 파일이 있는 날짜는 건드리지 않습니다. MinIO 로는 이미 시간 파일이
+  올라갔으므로 합친 파일은 로컬 브론즈에만 있습니다.
+
+체크포인트를 다시 쓰므로 ETL 과 동시에 돌지 않도록 logs_etl DAG 안에서(max_active_runs=1) 실행합니다.
+
+    python spark/app/bronze_compaction.py --base /data/bronze/app --after-days 2
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+
+from bronze_checkpoint import Checkpoint, is_closed, list_partitions, normalize
+
+COMPACTED_SUFFIX = "-00-compacted.jsonl"
+
+
+def compacted_name(partition):
+    return "part-" + partition.replace("/", "") + COMPACTED_SUFFIX
+
+
+def _jsonl_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("part-") and name.endswith(".jsonl"))
+
+
+def _processed(checkpoint, path, now):
+    st = os.stat(path)
+    entry = checkpoint.files.get(normalize(path))
+    return (
+        entry is not None
+        and entry["offset"] == st.st_size == entry["size"]
+        and entry["mtime"] == st.st_mtime_ns // 1_000_000
+        and is_closed(path, entry["mtime"], now, 0)
+    )
+
+
+def compact_partition(base, partition, checkpoint, now=None):
+    """날짜 파티션 하나를 합치고 결과(dict)를 돌려줍니다. 합칠 수 없거나 필요 없으면 ``skipped`` 사유를 담습니다."""
+    now = now or datetime.now(timezone.utc)
+    directory = os.path.join(base, partition)
+    target = os.path.join(directory, compacted_name(partition))
+    inputs = [os.path.join(directory, name) for name in _jsonl_files(directory)]
+    if not inputs or inputs == [target]:
+        return {"partition": partition, "skipped": "already_compacted"}
+    if any(name.startswith("part-") and name.endswith(".parquet") for name in os.listdir(directory)):
+        # Parquet 세그먼트가 섞인 날짜(BRONZE_FORMAT 을 바꾼 날 등)는 형식별로 나뉜 채 그대로 둡니다.
+        return {"partition": partition, "skipped": "parquet_segments"}
+    if not all(_processed(checkpoint, path, now) for path in inputs):
+        return {"partition": partition, "skipped": "unprocessed"}
+
+    tmp = os.path.join(directory, "." + compacted_name(partition) + ".tmp")
+    in_bytes = 0
+    with open(tmp, "wb") as out:
+        for path in inputs:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, out, 1 << 20)
+                size = f.tell()
+                f.seek(max(size - 1, 0))
+                if size and f.read(1) != b"\n":
+                    out.write(b"\n")
+            in_bytes += size
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, target)
+
+    st = os.stat(target)
+    for path in inputs:
+        checkpoint.files.pop(normalize(path), None)
+    checkpoint.commit(
+        {"path": target, "size": st.st_size, "mtime": st.st_mtime_ns // 1_000_000, "etag": None, "closed": True},
+        st.st_size,
+    )
+    checkpoint.save()
+    for path in inputs:
+        if path != target:
+            os.remove(path)
+    return {"partition": partition, "files_in": len(inputs), "bytes_in": in_bytes, "bytes_out": st.st_size}
+
+
+def compact(base, checkpoint_path, after_days=2, now=None):
+    """``after_days`` 일보다 오래된 날짜 파티션을 모두 합쳐 보고 결과 목록을 돌려줍니다 (0 이면 아무것도 하지 않음)."""
+    if after_days <= 0 or base.startswith("s3a://"):
+        return []
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=after_days)).strftime("%Y/%m/%d")
+    checkpoint = Checkpoint(checkpoint_path)
+    results = []
+    for partition in list_partitions(base):
+        if partition >= cutoff:
+            break
+        if len(_jsonl_files(os.path.join(base, partition))) <= 1:
+            continue
+        results.append(compact_partition(base, partition, checkpoint, now))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default=os.getenv("BRONZE_BASE", "/data/bronze/app/"))
+    parser.add_argument("--checkpoint", default=os.getenv("ETL_CHECKPOINT_PATH", "/data/state/etl_checkpoint.json"))
+    parser.add_argument("--after-days", type=int, default=int(os.getenv("BRONZE_COMPACT_AFTER_DAYS", "2")))
+    args = parser.parse_args()
+    print(json.dumps(compact(args.base, args.checkpoint, args.after_days), indent=2))
+
+
+if __name__ == "__main__":
+    main()
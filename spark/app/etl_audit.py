@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""ETL 실행 기록(mart.etl_runs)과 적재 결과 검증.
+
+job_etl.py 는 실행이 끝나면 단계별 소요 시간과, 이번 배치가 건드린 event_date 마다
+  - bronze: 이번에 읽은(검증 통과, id 중복 제거) 이벤트 수와 id 체크섬
+  - delta : 그 날짜 Delta 파티션 전체의 행 수와 id 체크섬, 배치 id 중 Delta 에 없는 수
+를 ``record_run`` 으로 남깁니다. Airflow 의 validate 작업은 ``validate_run`` 으로 mart.events 의 같은 날짜를
+Postgres 안에서 집계(파티션 프루닝 + GROUP BY, 행을 가져오지 않음)해 Delta 와 비교하고, 어긋나면 실패합니다.
+
+id 체크섬은 id(sha256 hex) 앞 15자리를 60비트 정수로 본 값들의 XOR 입니다. 순서와 무관하고 Spark(bit_xor + conv)와
+Postgres(bit_xor + bit(60)) 양쪽에서 같은 값이 나옵니다. Spark/Airflow 어디서든 쓰도록 psycopg2 커넥션만 받습니다.
+"""
+import json
+import time
+from datetime import datetime, timezone
+
+AUDIT_TABLE = "mart.etl_runs"
+PG_ID_CHECKSUM = "bit_xor(('x' || substr(id, 1, 15))::bit(60)::bigint)"
+SPARK_ID_CHECKSUM = "bit_xor(cast(conv(substr(id, 1, 15), 16, 10) as bigint))"
+
+
+def id_checksum(ids):
+    """SPARK_ID_CHECKSUM / PG_ID_CHECKSUM 과 같은 값을 Python 에서 계산합니다 (경량 엔진용)."""
+    checksum = 0
+    for event_id in ids:
+        checksum ^= int(event_id[:15], 16)
+    return checksum
+
+
+AUDIT_DDL = f"""
+CREATE TABLE IF NOT EXISTS {AUDIT_TABLE} (
+    run_id       TEXT PRIMARY KEY,
+    started_at   TIMESTAMPTZ NOT NULL,
+    finished_at  TIMESTAMPTZ,
+    status       TEXT NOT NULL,
+    partitions   TEXT,
+    files_read   INTEGER,
+    events_in    BIGINT,
+    quarantined  BIGINT,
+    stage_sec    JSONB NOT NULL DEFAULT '{{}}',
+    checks       JSONB NOT NULL DEFAULT '{{}}',
+    error        TEXT
+)
+"""
+
+
+class StageTimer:
+    """위에서 아래로 흐르는 잡 스크립트에서 단계가 끝날 때마다 ``lap("이름")`` 을 불러
+    직전 lap 이후 걸린 시간(초)을 단계별로 모읍니다."""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.seconds = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.seconds[name] = round(self.seconds.get(name, 0.0) + now - self._last, 3)
+        self._last = now
+
+
+def record_run(conn, run_id, timer, status, checks=None, partitions=None, files_read=0, events_in=0, quarantined=0):
+    """실행 결과를 기록합니다. 같은 run_id(Airflow 재시도)는 덮어씁니다."""
+    with conn.cursor() as cur:
+        cur.execute(AUDIT_DDL)
+        cur.execute(
+            f"""
+            INSERT INTO {AUDIT_TABLE}
+                (run_id, started_at, finished_at, status, partitions, files_read, events_in, quarantined, stage_sec, checks)
+            VALUES (%s, %s, now(), %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (run_id) DO UPDATE SET
+                started_at = EXCLUDED.started_at, finished_at = EXCLUDED.finished_at, status = EXCLUDED.status,
+                partitions = EXCLUDED.partitions, files_read = EXCLUDED.files_read, events_in = EXCLUDED.events_in,
+                quarantined = EXCLUDED.quarantined, stage_sec = EXCLUDED.stage_sec, checks = EXCLUDED.checks,
+                error = NULL
+            """,
+            (
+                run_id,
+                timer.started_at,
+                status,
+                partitions,
+                files_read,
+                events_in,
+                quarantined,
+                json.dumps(timer.seconds),
+                json.dumps(checks or {}),
+            ),
+        )
+    conn.commit()
+
+
+def mart_day_checksums(conn, table, days):
+    """``{YYYY-MM-DD: (행 수, id 체크섬)}`` — 날짜 조건으로 해당 파티션만 읽고 Postgres 안에서 집계합니다."""
+    if not days:
+        return {}
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT event_date, count(*), {PG_ID_CHECKSUM} FROM {table} "
+            "WHERE event_date = ANY(%s::date[]) GROUP BY event_date",
+            (list(days),),
+        )
+        rows = cur.fetchall()
+    conn.commit()
+    return {str(day): (count, checksum or 0) for day, count, checksum in rows}
+
+
+def compare(checks, mart):
+    """검증 실패 사유 목록 (비어 있으면 통과)."""
+    problems = []
+    for day, check in sorted(checks.items()):
+        if check.get("missing_in_delta"):
+            problems.append(f"{day}: {check['missing_in_delta']} bronze events missing from Delta")
+        mart_rows, mart_checksum = mart.get(day, (0, 0))
+        if (check["delta_rows"], check["delta_checksum"]) != (mart_rows, mart_checksum):
+            problems.append(
+                f"{day}: Delta {check['delta_rows']} rows / {check['delta_checksum']} != "
+                f"mart {mart_rows} rows / {mart_checksum}"
+            )
+    return problems
+
+
+def validate_run(conn, run_id, table="mart.events"):
+    """``run_id`` 의 기록을 mart 집계와 비교해 결과를 etl_runs 에 남기고, (통과 여부, 사유 목록) 을 돌려줍니다."""
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(AUDIT_DDL)
+        cur.execute(f"SELECT checks, stage_sec FROM {AUDIT_TABLE} WHERE run_id = %s", (run_id,))
+        row = cur.fetchone()
+    conn.commit()
+    if row is None:
+        return False, [f"no {AUDIT_TABLE} row for run {run_id}"]
+    checks, stage_sec = row
+    mart = mart_day_checksums(conn, table, list(checks))
+    problems = compare(checks, mart)
+    for day, check in checks.items():
+        check["mart_rows"], check["mart_checksum"] = mart.get(day, (0, 0))
+    stage_sec["validate"] = round(time.perf_counter() - started, 3)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"UPDATE {AUDIT_TABLE} SET status = %s, checks = %s, stage_sec = %s, error = %s WHERE run_id = %s",
+            (
+                "failed" if problems else ("ok" if checks else "empty"),
+                json.dumps(checks),
+                json.dumps(stage_sec),
+                "\n".join(problems) or None,
+                run_id,
+            ),
+        )
+    conn.commit()
+    return not problems, problems
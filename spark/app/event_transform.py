@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""브론즈 레코드 → mart 이벤트 변환 규칙. 엔진(Spark / 경량 PyArrow)이 함께 쓰는 정의입니다.
+
+한 레코드는 다음 순서로 처리됩니다.
+  1. JSON 한 줄을 bronze_schema.FIELDS 로 읽습니다. JSON 이 아니거나 객체가 아니거나 정수 필드 타입이 맞지 않으면
+     ``malformed_json``. 문자열/'json' 필드에 객체·배열·숫자가 오면 그 JSON 텍스트를 값으로 씁니다.
+  2. ``ts`` 를 ISO-8601 로 읽고(오프셋이 없으면 ``TIMEZONE`` 의 벽시계 시각), 격리 사유를 정합니다:
+     ``unsupported_schema_version`` → ``missing_required`` → ``bad_ts`` (QUARANTINE_REASONS 순서).
+  3. 통과한 레코드는 ``EVENT_COLUMNS`` 로 바꿉니다. id 는 ``user_id||ts||type[||seq]`` 의 sha256 hex,
+     event_date 는 ``TIMEZONE`` 기준 날짜, 같은 id 는 배치 안에서 하나만 남깁니다.
+
+Spark 구현은 spark_transform.py, 순수 Python 구현은 아래 ``transform`` 입니다 (job_etl_light.py 가 사용).
+두 구현의 결과가 같은지는 bench/parity_etl_engines.py 로 확인합니다.
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from bronze_schema import FIELDS, REQUIRED, SCHEMA_VERSION
+
+# ts 의 오프셋이 없을 때 쓰는 시간대이자 event_date 를 자르는 기준.
+# Spark 세션(spark.sql.session.timeZone)과 드라이버 프로세스의 TZ 를 같은 값으로 맞춥니다.
+TIMEZONE = os.getenv("ETL_TIMEZONE") or os.getenv("TZ") or "UTC"
+EVENT_COLUMNS = ("id", "type", "ts", "event_date", "username", "props", "server", "source_file")
+# 값이 없는 필드는 빼고 잇습니다 (seq 는 배치 항목에만 있으므로 단건 이벤트의 id 는 그대로입니다).
+ID_FIELDS = ("user_id", "ts", "type", "seq")
+ID_SEPARATOR = "||"
+# (출력 열, 브론즈 필드) — id/ts/event_date/source_file 외의 열
+RENAMES = (("type", "type"), ("username", "user_id"), ("props", "props"), ("server", "_server"))
+QUARANTINE_REASONS = ("malformed_json", "unsupported_schema_version", "missing_required", "bad_ts")
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+# Spark 텍스트 리더(Hadoop LineReader)와 같은 줄 구분. str.splitlines 는 JSON 문자열 안의 U+2028 등에서도 자릅니다.
+_LINE_BREAK = re.compile(r"\r\n|\n|\r")
+
+
+class MalformedRecord(ValueError):
+    pass
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _int(value):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or not INT32_MIN <= value <= INT32_MAX:
+        raise MalformedRecord(f"not an int: {value!r}")
+    return value
+
+
+def coerce(obj):
+    """JSON 객체(dict)를 FIELDS 의 타입으로 맞춘 레코드. Parquet 세그먼트 행도 이미 같은 모양이라 그대로 통과합니다."""
+    if not isinstance(obj, dict):
+        raise MalformedRecord("not a JSON object")
+    return {name: _int(obj.get(name)) if kind == "int" else _text(obj.get(name)) for name, kind in FIELDS}
+
+
+def split_lines(data):
+    """bytes 를 빈 줄을 뺀 텍스트 줄 목록으로 나눕니다."""
+    return [line for line in _LINE_BREAK.split(data.decode("utf-8", errors="replace")) if line]
+
+
+def parse_line(line):
+    """(레코드, None) 또는 (None, "malformed_json")."""
+    if not line.strip():
+        return {name: None for name, _kind in FIELDS}, None
+    try:
+        return coerce(json.loads(line)), None
+    except (ValueError, MalformedRecord):
+        return None, "malformed_json"
+
+
+def parse_ts(text, tz=None):
+    """ISO-8601 문자열 → ``tz`` 기준 시각(aware datetime). 읽을 수 없으면 None."""
+    tz = tz or ZoneInfo(TIMEZONE)
+    try:
+        parsed = datetime.fromisoformat(text.strip())
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=tz)
+    return parsed.astimezone(tz)
+
+
+def quarantine_reason(record, ts):
+    if record.get("schema_version") is not None and record["schema_version"] > SCHEMA_VERSION:
+        return "unsupported_schema_version"
+    if any(record.get(name) is None for name in REQUIRED):
+        return "missing_required"
+    if ts is None:
+        return "bad_ts"
+    return None
+
+
+def event_id(record):
+    parts = [str(record[name]) for name in ID_FIELDS if record.get(name) is not None]
+    return hashlib.sha256(ID_SEPARATOR.join(parts).encode("utf-8")).hexdigest()
+
+
+def to_event(record, ts, source_file):
+    """EVENT_COLUMNS 순서의 튜플. ts 는 ``TIMEZONE`` 의 aware datetime 입니다."""
+    values = {
+        "id": event_id(record),
+        "ts": ts,
+        "event_date": ts.date(),
+        "source_file": source_file,
+        **{out: record.get(field) for out, field in RENAMES},
+    }
+    return tuple(values[name] for name in EVENT_COLUMNS)
+
+
+def transform(items, tz=None):
+    """``(JSON 줄 또는 dict, source_file)`` 들을 변환해 (이벤트 리스트, 격리 리스트) 를 돌려줍니다.
+
+    격리 항목은 ``(원문, source_file, 사유)`` 이며, dict 로 들어온 행(Parquet 세그먼트)은 원문 대신 JSON 으로 묶습니다.
+    """
+    tz = tz or ZoneInfo(TIMEZONE)
+    events = {}
+    quarantined = []
+    for item, source_file in items:
+        if isinstance(item, dict):
+            try:
+                record, reason = coerce(item), None
+            except MalformedRecord:
+                record, reason = None, "malformed_json"
+            raw = json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+        else:
+            record, reason = parse_line(item)
+            raw = item
+        ts = parse_ts(record["ts"], tz) if record is not None and record.get("ts") is not None else None
+        reason = reason or quarantine_reason(record, ts)
+        if reason:
+            quarantined.append((raw, source_file, reason))
+            continue
+        event = to_event(record, ts, source_file)
+        events.setdefault(event[0], event)
+    return list(events.values()), quarantined
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Delta 이벤트 테이블 정기 유지보수: 작은 파일 병합(OPTIMIZE + Z-ORDER by username)과 오래된 파일 정리(VACUUM).
+
+logs_etl 이 30분마다 MERGE 하면서 event_date 파티션마다 작은 parquet 파일이 쌓이므로,
+하루 한 번 최근 파티션을 username 기준으로 Z-ORDER 해 사용자별 조회가 읽는 파일 수를 줄이고
+보존 기간이 지난 이전 버전 파일을 VACUUM 으로 지웁니다.
+"""
+from delta.tables import DeltaTable
+from pyspark.sql import SparkSession
+from datetime import date, timedelta
+import os
+
+import spark_profile
+
+MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT", "http://minio:9000")
+MINIO_ACCESS = os.getenv("MINIO_ACCESS_KEY", "admin")
+MINIO_SECRET = os.getenv("MINIO_SECRET_KEY", "admin12345")
+
+DELTA_OUT = os.getenv("DELTA_EVENTS_PATH", "/data/delta/events")
+# 최근 N일 파티션만 OPTIMIZE (0 이면 전체)
+OPTIMIZE_DAYS = int(os.getenv("DELTA_OPTIMIZE_DAYS", "7"))
+ZORDER_BY = os.getenv("DELTA_ZORDER_BY", "username")
+# VACUUM 보존 시간 (Delta 기본 안전장치와 같은 7일)
+VACUUM_RETAIN_HOURS = int(os.getenv("DELTA_VACUUM_RETAIN_HOURS", "168"))
+# true 면 MERGE 도입 전 append 로 쌓인 중복 id 를 한 번 정리합니다.
+DEDUPE = os.getenv("DELTA_DEDUPE", "false").lower() == "true"
+
+builder = (
+    SparkSession.builder.appName("delta_maintenance")
+    .config("spark.jars.packages", "io.delta:delta-spark_2.12:3.2.0,org.apache.hadoop:hadoop-aws:3.3.4,com.amazonaws:aws-java-sdk-bundle:1.12.772")
+    .config("spark.sql.extensions", "io.delta.sql.DeltaSparkSessionExtension")
+    .config("spark.sql.catalog.spark_catalog", "org.apache.spark.sql.delta.catalog.DeltaCatalog")
+    .config("spark.hadoop.fs.s3a.endpoint", MINIO_ENDPOINT)
+    .config("spark.hadoop.fs.s3a.access.key", MINIO_ACCESS)
+    .config("spark.hadoop.fs.s3a.secret.key", MINIO_SECRET)
+    .config("spark.hadoop.fs.s3a.path.style.access", "true")
+    .config("spark.hadoop.fs.s3a.connection.ssl.enabled", "false")
+    .config("spark.hadoop.fs.s3a.impl", "org.apache.hadoop.fs.s3a.S3AFileSystem")
+    .config("spark.delta.logStore.s3a.impl", "org.apache.spark.sql.delta.storage.S3SingleDriverLogStore")
+)
+# AQE / 작은 파일 분할 설정 (ETL_SPARK_PROFILE, spark_profile.py)
+spark = spark_profile.apply(builder).getOrCreate()
+
+if not DeltaTable.isDeltaTable(spark, DELTA_OUT):
+    print(f"[delta_maintenance] {DELTA_OUT} is not a Delta table yet, skipping")
+    spark.stop()
+    raise SystemExit(0)
+
+table = DeltaTable.forPath(spark, DELTA_OUT)
+
+# =========================
+# 1) (선택) 예전 append 로 생긴 중복 id 정리 - 중복이 있는 파티션만 덮어씁니다
+# =========================
+if DEDUPE:
+    events = spark.read.format("delta").load(DELTA_OUT)
+    dup_dates = [
+        r[0] for r in events.groupBy("event_date", "id").count().where("count > 1").select("event_date").distinct().collect()
+    ]
+    for d in dup_dates:
+        (
+            events.where(f"event_date = DATE'{d}'")
+            .dropDuplicates(["id"])
+            .write.format("delta")
+            .mode("overwrite")
+            .option("replaceWhere", f"event_date = DATE'{d}'")
+            .save(DELTA_OUT)
+        )
+    print(f"[delta_maintenance] deduplicated partitions: {[str(d) for d in dup_dates]}")
+
+# =========================
+# 2) OPTIMIZE + Z-ORDER (최근 파티션만)
+# =========================
+optimizer = table.optimize()
+if OPTIMIZE_DAYS > 0:
+    since = date.today() - timedelta(days=OPTIMIZE_DAYS)
+    optimizer = optimizer.where(f"event_date >= '{since}'")
+metrics = optimizer.executeZOrderBy(ZORDER_BY)
+metrics.select("metrics.numFilesAdded", "metrics.numFilesRemoved").show(truncate=False)
+
+# =========================
+# 3) VACUUM
+# =========================
+table.vacuum(VACUUM_RETAIN_HOURS)
+
+spark.stop()
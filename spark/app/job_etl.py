@@ -1,15 +1,25 @@
 # -*- coding: utf-8 -*-
+from delta.tables import DeltaTable
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import (
-    col,
-    concat_ws,
-    input_file_name,
-    sha2,
-    to_date,
-    to_json,
-    to_timestamp,
-)
+from pyspark.sql.functions import col, count, current_timestamp, expr, input_file_name
+from pyspark.sql.types import StringType, StructField, StructType
+import argparse
 import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+
+import pg_loader
+import pg_rollups
+import spark_profile
+from etl_audit import SPARK_ID_CHECKSUM, StageTimer, record_run
+from bronze_checkpoint import Checkpoint, complete_lines, is_bronze_file, is_columnar
+from bronze_schema import spark_schema
+from event_transform import TIMEZONE, split_lines
+from spark_transform import parse_lines, quarantine_raw, segment_columns, to_events, with_quarantine_reason
 
 # =========================
 # ENV
@@ -30,10 +40,40 @@ BRONZE_BASE = os.getenv("BRONZE_BASE", "/data/bronze/app/")
 DELTA_OUT = os.getenv("DELTA_EVENTS_PATH", "/data/delta/events")
 PG_TABLE = os.getenv("PG_EVENTS_TABLE", "mart.events")
 
+# 증분 처리: 처리한 파일/오프셋 체크포인트와, 기록 중인 시간 파일을 닫힌 것으로 보기까지의 여유(초)
+CHECKPOINT_PATH = os.getenv("ETL_CHECKPOINT_PATH", "/data/state/etl_checkpoint.json")
+OPEN_GRACE_SEC = int(os.getenv("ETL_OPEN_GRACE_SEC", "300"))
+# true 면 체크포인트를 무시하고 브론즈 전체를 다시 읽습니다 (적재는 id 기준이라 중복되지 않음).
+FULL_REFRESH = os.getenv("ETL_FULL_REFRESH", "false").lower() == "true"
+# 파싱/검증에 실패한 브론즈 줄을 원문과 사유로 남기는 곳
+QUARANTINE_PATH = os.getenv("ETL_QUARANTINE_PATH", "/data/quarantine/events")
+
+# --mode streaming: 브론즈 세그먼트를 Structured Streaming 으로 계속 따라가며 적재합니다.
+# parquet(BRONZE_FORMAT=parquet) | jsonl(프로세스별 JSONL 세그먼트, BRONZE_JSONL_LAYOUT=segments) — 소스가 바뀌면 체크포인트도 새로 씁니다.
+STREAM_FORMAT = os.getenv("ETL_STREAM_FORMAT", "parquet").lower()
+STREAM_CHECKPOINT = os.getenv("ETL_STREAM_CHECKPOINT", "/data/state/stream_checkpoint")
+STREAM_MAX_FILES = int(os.getenv("ETL_STREAM_MAX_FILES", "100"))
+STREAM_TRIGGER_SEC = int(os.getenv("ETL_STREAM_TRIGGER_SEC", "5"))
+# rollup 은 하루 파티션 전체를 다시 집계하므로 마이크로배치마다가 아니라 이 간격으로 모아서 갱신합니다.
+STREAM_ROLLUP_SEC = int(os.getenv("ETL_STREAM_ROLLUP_SEC", "300"))
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--mode",
+    choices=("batch", "streaming"),
+    default=os.getenv("ETL_MODE", "batch"),
+    help="batch: 체크포인트 기준 한 번 실행 (Airflow) / streaming: 계속 실행",
+)
+parser.add_argument("--partitions", default="", help="쉼표로 구분한 YYYY/MM/DD 날짜 파티션 (logs_etl 센서가 전달)")
+parser.add_argument("--run-id", default="", help="mart.etl_runs 에 기록할 실행 id (Airflow run_id)")
+ARGS = parser.parse_args()
+RUN_ID = ARGS.run_id or f"manual__{datetime.now(timezone.utc).isoformat()}"
+timer = StageTimer()
+
 # =========================
 # Spark Session
 # =========================
-spark = (
+builder = (
     SparkSession.builder.appName("logs_etl")
     .config(
         "spark.jars.packages",
@@ -60,110 +100,324 @@ spark = (
     .config("spark.delta.logStore.s3a.impl", "org.apache.spark.sql.delta.storage.S3SingleDriverLogStore")
     # Delta 스키마 자동 병합 (기존 집계 스키마에서 이벤트 스키마로 전환 시 필요)
     .config("spark.databricks.delta.schema.autoMerge.enabled", "true")
-    .getOrCreate()
+    # ts 해석/event_date 기준 시간대를 경량 엔진(job_etl_light.py)과 맞춥니다 (event_transform.TIMEZONE)
+    .config("spark.sql.session.timeZone", TIMEZONE)
 )
+# AQE / 작은 파일 분할 설정 (ETL_SPARK_PROFILE, spark_profile.py)
+spark = spark_profile.apply(builder).getOrCreate()
 
-# =========================
-# 1) Read Bronze(JSONL) & Transform (event-level, ERD 맞춤)
-# =========================
-df = spark.read.option("recursiveFileLookup", "true").json(BRONZE_BASE)
-
-df2 = (
-    df
-    .withColumn("source_file", input_file_name())
-    .withColumn("ts_parsed", to_timestamp(col("ts")))
-    .withColumn("event_date", to_date(col("ts_parsed")))
-    .withColumn("event_id", sha2(concat_ws("||", col("user_id"), col("ts"), col("type")), 256))
-    .withColumn("props_json", to_json(col("props")))  # 그대로 JSON 직렬화(별도 CAST 불필요)
-    .withColumn("server_json", to_json(col("_server")))  # JDBC에서 stringtype=unspecified로 jsonb 매핑
-    .select(
-        col("event_id").alias("id"),
-        col("type"),
-        col("ts_parsed").alias("ts"),
-        col("event_date"),
-        col("user_id").alias("username"),
-        col("props_json").alias("props"),
-        col("server_json").alias("server"),
-        col("source_file"),
+jvm = spark._jvm
+hadoop_conf = spark._jsc.hadoopConfiguration()
+bronze_root = jvm.org.apache.hadoop.fs.Path(BRONZE_BASE)
+fs = bronze_root.getFileSystem(hadoop_conf)
+
+
+def list_bronze(roots):
+    """브론즈 파일의 (경로, 크기, mtime, ETag). 로컬이든 s3a:// 든 Hadoop FileSystem 으로 나열합니다."""
+    out = []
+    for root in roots:
+        root_path = jvm.org.apache.hadoop.fs.Path(root)
+        if not fs.exists(root_path):
+            continue
+        it = fs.listFiles(root_path, True)
+        while it.hasNext():
+            st = it.next()
+            path = st.getPath().toString()
+            if not is_bronze_file(path):
+                continue
+            try:
+                etag = st.getEtag()  # S3A 만 제공
+            except Exception:  # noqa: BLE001
+                etag = None
+            out.append({"path": path, "size": st.getLen(), "mtime": st.getModificationTime(), "etag": etag})
+    return out
+
+
+def pg_connect():
+    return psycopg2.connect(
+        host=POSTGRES_HOST, port=POSTGRES_PORT, dbname=POSTGRES_DB, user=POSTGRES_USER, password=POSTGRES_PW
     )
-    .dropna(subset=["id", "ts", "event_date", "username", "type"])
-    .dropDuplicates(["id"])
-)
+
+
+def read_range(path, start, end):
+    if path.startswith("file:"):
+        with open(re.sub(r"^file:/+", "/", path), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+    stream = fs.open(jvm.org.apache.hadoop.fs.Path(path))
+    try:
+        stream.seek(start)
+        return bytes(jvm.org.apache.commons.io.IOUtils.toByteArray(stream, end - start))
+    finally:
+        stream.close()
+
+
+def write_quarantine(parsed):
+    """검증에 실패한 행을 원문과 사유로 남기고 그 수를 돌려줍니다."""
+    quarantined = parsed.where(col("quarantine_reason").isNotNull())
+    quarantine_count = quarantined.count()
+    if quarantine_count:
+        (
+            quarantined.select(
+                quarantine_raw().alias("raw"),
+                col("source_file"),
+                col("quarantine_reason").alias("reason"),
+                current_timestamp().alias("quarantined_at"),
+            )
+            .write.mode("append")
+            .json(QUARANTINE_PATH)
+        )
+    return quarantine_count
+
+
+def merge_delta(events, dates, txn=None):
+    """id 기준 MERGE 로 재실행해도 중복되지 않게 적재합니다.
+
+    ``txn=(app_id, version)`` 을 주면 Delta 의 멱등 쓰기(txnAppId/txnVersion)로 같은 마이크로배치를
+    다시 실행했을 때 커밋 자체를 건너뜁니다.
+    """
+    if txn:
+        spark.conf.set("spark.databricks.delta.write.txnAppId", txn[0])
+        spark.conf.set("spark.databricks.delta.write.txnVersion", str(txn[1]))
+    try:
+        if not DeltaTable.isDeltaTable(spark, DELTA_OUT):
+            (
+                spark_profile.rebalance_for_write(events)
+                .write.format("delta")
+                .mode("append")
+                .option("mergeSchema", "true")
+                .partitionBy("event_date")
+                .save(DELTA_OUT)
+            )
+        elif dates:
+            # 이번 배치에 등장한 event_date 파티션만 읽고 다시 쓰도록 조건에 날짜 목록을 리터럴로 넣습니다.
+            date_list = ", ".join(f"DATE'{d}'" for d in sorted(dates))
+            (
+                DeltaTable.forPath(spark, DELTA_OUT)
+                .alias("t")
+                .merge(events.alias("s"), f"t.event_date IN ({date_list}) AND t.event_date = s.event_date AND t.id = s.id")
+                .whenNotMatchedInsertAll()
+                .execute()
+            )
+    finally:
+        if txn:
+            spark.conf.unset("spark.databricks.delta.write.txnAppId")
+            spark.conf.unset("spark.databricks.delta.write.txnVersion")
+
+
+def load_postgres(pg, events, dates, replace=False):
+    """event_date 파티션 단위 COPY 적재 (새 날짜는 교체, 있는 날짜는 id 기준 추가)."""
+    day_rows = (
+        (d, events.where(col("event_date") == d).select(*pg_loader.COLUMNS).toLocalIterator())
+        for d in sorted(dates)
+    )
+    for stats in pg_loader.load_days(pg, PG_TABLE, day_rows, replace=replace):
+        print(f"[logs_etl] postgres {stats}")
+
+
+def refresh_rollups(pg, dates):
+    for stats in pg_rollups.refresh_days(pg, dates, source=PG_TABLE):
+        print(f"[logs_etl] rollups {stats}")
+
+
+def run_streaming():
+    """브론즈 세그먼트(``STREAM_FORMAT``)를 file source 로 따라가며 마이크로배치마다 배치 모드와 같은 변환/적재를 합니다.
+
+    - Parquet 세그먼트와 프로세스별 JSONL 세그먼트는 완성된 뒤 rename 으로 나타나는 불변 파일이라 file source 가
+      한 번씩만 읽습니다 (공유 JSONL 시간 파일과 하루로 합친 compacted 파일은 이름 패턴에서 빠집니다).
+    - 처리한 파일 목록/오프셋은 ``STREAM_CHECKPOINT`` 에 남고, 재시작 후 같은 마이크로배치를 다시 실행하면
+      Delta 는 txnVersion 으로 커밋을 건너뛰고 Postgres 는 id 기준 추가(ON CONFLICT DO NOTHING)라
+      결과가 한 번만 반영됩니다.
+    """
+    pending_rollups = set()
+    last_rollup = [time.monotonic()]
+
+    def process(batch, batch_id):
+        started = time.perf_counter()
+        parsed = with_quarantine_reason(batch).cache()
+        quarantine_count = write_quarantine(parsed)
+        events = to_events(parsed).cache()
+        dates = [r[0] for r in events.select("event_date").distinct().collect()]
+        if dates:
+            merge_delta(events, dates, txn=("logs_etl_stream", batch_id))
+            pg = pg_connect()
+            try:
+                load_postgres(pg, events, dates)
+                pending_rollups.update(dates)
+                if time.monotonic() - last_rollup[0] >= STREAM_ROLLUP_SEC:
+                    refresh_rollups(pg, pending_rollups)
+                    pending_rollups.clear()
+                    last_rollup[0] = time.monotonic()
+            finally:
+                pg.close()
+        print(
+            f"[logs_etl] stream batch={batch_id} dates={[str(d) for d in sorted(dates)]} "
+            f"quarantined={quarantine_count} sec={time.perf_counter() - started:.2f}"
+        )
+        events.unpersist()
+        parsed.unpersist()
+
+    source = spark.readStream.option("maxFilesPerTrigger", STREAM_MAX_FILES)
+    if STREAM_FORMAT == "jsonl":
+        # part-YYYYMMDD-HH-<host>-<pid>-<seq>.jsonl 만 (시간 파일은 '-' 가 2개, compacted 는 3개)
+        segments = parse_lines(
+            source.text(BRONZE_BASE.rstrip("/") + "/*/*/*/part-*-*-*-*-*.jsonl").withColumn("source_file", input_file_name())
+        )
+    else:
+        segments = segment_columns(
+            source.schema(spark_schema(with_corrupt=False)).parquet(BRONZE_BASE.rstrip("/") + "/*/*/*/part-*.parquet")
+        )
+    query = (
+        segments.writeStream.foreachBatch(process)
+        .option("checkpointLocation", STREAM_CHECKPOINT)
+        .trigger(processingTime=f"{STREAM_TRIGGER_SEC} seconds")
+        .start()
+    )
+    print(f"[logs_etl] streaming {STREAM_FORMAT} {BRONZE_BASE} -> {DELTA_OUT}, {PG_TABLE} (checkpoint {STREAM_CHECKPOINT})")
+    query.awaitTermination()
+
+
+if ARGS.mode == "streaming":
+    run_streaming()
+    spark.stop()
+    sys.exit(0)
 
 # =========================
-# 2) Write to Delta (권장) - 이벤트 상세 적재
+# 0) 체크포인트로 새로 읽을 파일/구간 결정
 # =========================
-(
-    df2.write.format("delta")
-    .mode("append")
-    .option("mergeSchema", "true")
-    .partitionBy("event_date")
-    .save(DELTA_OUT)
+checkpoint = Checkpoint(CHECKPOINT_PATH)
+if FULL_REFRESH:
+    checkpoint.files = {}
+# Airflow 센서가 넘겨 준 날짜 파티션만 훑습니다 (인자가 없거나 전체 재처리면 브론즈 전체).
+scan_roots = None
+if ARGS.partitions and not FULL_REFRESH:
+    scan_roots = [BRONZE_BASE.rstrip("/") + "/" + p for p in ARGS.partitions.split(",") if p]
+listing = list_bronze(scan_roots or [BRONZE_BASE])
+work = checkpoint.plan(listing, grace_sec=OPEN_GRACE_SEC)
+timer.lap("plan")
+
+RAW_SCHEMA = StructType([StructField("value", StringType()), StructField("source_file", StringType())])
+raw = None
+whole = [item["path"] for item in work if item["whole"] and not is_columnar(item["path"])]
+columnar = [item["path"] for item in work if item["whole"] and is_columnar(item["path"])]
+if whole:
+    # 닫힌 새 파일은 Spark 가 바로 나눠 읽습니다.
+    raw = spark.read.text(whole).withColumn("source_file", input_file_name())
+committed = []
+ranged_rows = []
+for item in work:
+    if item["whole"]:
+        committed.append((item, item["size"]))
+        continue
+    # 커진 파일/기록 중인 파일은 새 구간만 읽고, 마지막 개행 뒤의 잘린 줄은 다음 실행으로 넘깁니다.
+    data, consumed = complete_lines(read_range(item["path"], item["start"], item["end"]))
+    committed.append((item, item["start"] + consumed))
+    ranged_rows.extend((line, item["path"]) for line in split_lines(data))
+if ranged_rows:
+    ranged = spark.createDataFrame(ranged_rows, RAW_SCHEMA)
+    raw = ranged if raw is None else raw.unionByName(ranged)
+
+print(
+    f"[logs_etl] partitions={ARGS.partitions or 'all'} files listed={len(listing)} to_read={len(work)} "
+    f"whole={len(whole)} parquet={len(columnar)} ranged_lines={len(ranged_rows)} full_refresh={FULL_REFRESH} "
+    f"profile={spark_profile.profile_name()}"
 )
+if raw is None and not columnar:
+    for item, end in committed:
+        checkpoint.commit(item, end)
+    checkpoint.prune(listing, scan_roots)
+    checkpoint.save()
+    timer.lap("checkpoint")
+    pg = pg_connect()
+    try:
+        record_run(pg, RUN_ID, timer, "empty", partitions=ARGS.partitions or None, files_read=len(work))
+    finally:
+        pg.close()
+    spark.stop()
+    sys.exit(0)
+
+# =========================
+# 1) Read Bronze(JSONL) with the declared schema & Transform (event-level, ERD 맞춤)
+#    스키마를 추론하지 않으므로 브론즈를 한 번만 읽고, 파싱/검증에 실패한 줄은 격리합니다.
+# =========================
+parsed = parse_lines(raw) if raw is not None else None
+if columnar:
+    segments = segment_columns(spark.read.schema(spark_schema(with_corrupt=False)).parquet(*columnar))
+    parsed = segments if parsed is None else parsed.unionByName(segments)
+parsed = with_quarantine_reason(parsed).cache()
+quarantine_count = write_quarantine(parsed)
+print(f"[logs_etl] quarantined={quarantine_count} -> {QUARANTINE_PATH}")
+df2 = to_events(parsed)
 
 # =========================
-# 3) 대상 일자 선삭제 & 테이블 생성 보장 (JDBC via JVM)
+# 2) Write to Delta (권장) - id 기준 MERGE 로 재실행해도 중복되지 않게 적재
 # =========================
+df2 = df2.cache()
 dates = [r[0] for r in df2.select("event_date").distinct().collect()]  # list[datetime.date]
+timer.lap("read_parse")
+merge_delta(df2, dates)
+timer.lap("delta")
 
+# =========================
+# 3) Postgres: event_date 파티션 단위로 COPY 적재
+#    - 새 날짜(또는 전체 재처리)는 새 테이블에 COPY 후 ATTACH 로 교체
+#    - 이미 있는 날짜는 임시 테이블에 COPY 후 id 기준으로 추가
+# =========================
+pg = pg_connect()
+try:
+    load_postgres(pg, df2, dates, replace=FULL_REFRESH)
+    timer.lap("postgres")
+    # 대시보드 rollup: 이번에 건드린 날짜만 mart.events 파티션에서 다시 집계해 upsert 합니다.
+    refresh_rollups(pg, dates)
+finally:
+    pg.close()
+timer.lap("rollups")
+
+# =========================
+# 4) 검증용 집계: 이번 배치(브론즈 입력)와 그 날짜 Delta 파티션의 행 수 / id 체크섬.
+#    mart.events 쪽 집계와 비교는 Airflow 의 validate 작업이 Postgres 안에서 합니다.
+# =========================
+checks = {}
 if dates:
-    jvm = spark._jvm
-    # 드라이버 로드
-    jvm.java.lang.Class.forName("org.postgresql.Driver")
-    # 접속 프로퍼티
-    props = jvm.java.util.Properties()
-    props.setProperty("user", POSTGRES_USER)
-    props.setProperty("password", POSTGRES_PW)
-
-    url = f"jdbc:postgresql://{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-    conn = jvm.java.sql.DriverManager.getConnection(url, props)
-    try:
-        # 테이블 생성(없을 경우)
-        create_sql = f"""
-        CREATE TABLE IF NOT EXISTS {PG_TABLE} (
-            id TEXT PRIMARY KEY,
-            type TEXT,
-            ts TIMESTAMP,
-            event_date DATE,
-            username TEXT,
-            props JSONB,
-            server JSONB,
-            source_file TEXT
-        );
-        """
-        conn.createStatement().execute(create_sql)
-
-        # PreparedStatement로 안전하게 반복 삭제
-        sql = f"DELETE FROM {PG_TABLE} WHERE event_date = ?"
-        ps = conn.prepareStatement(sql)
-        for d in dates:
-            # java.sql.Date.valueOf("YYYY-MM-DD")
-            ps.setDate(1, jvm.java.sql.Date.valueOf(str(d)))  # d는 datetime.date
-            ps.addBatch()
-        ps.executeBatch()
-        ps.close()
-    finally:
-        conn.close()
-
-# =========================
-# 4) Append to Postgres (이벤트 상세 적재)
-# =========================
-(
-    df2.write.format("jdbc")
-    .option(
-        "url",
-        f"jdbc:postgresql://{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}?stringtype=unspecified",
-    )  # to_json 문자열을 jsonb로 전달
-    .option("dbtable", PG_TABLE)
-    .option("user", POSTGRES_USER)
-    .option("password", POSTGRES_PW)
-    .option("driver", "org.postgresql.Driver")
-    .option(
-        "createTableColumnTypes",
-        "id TEXT, type TEXT, ts TIMESTAMP, event_date DATE, username TEXT, props JSONB, server JSONB, source_file TEXT",
+    delta_days = spark.read.format("delta").load(DELTA_OUT).where(col("event_date").isin(dates)).select("event_date", "id")
+    for r in df2.groupBy("event_date").agg(count("*").alias("n"), expr(SPARK_ID_CHECKSUM).alias("x")).collect():
+        checks[str(r["event_date"])] = {"bronze_rows": r["n"], "bronze_checksum": r["x"] or 0, "missing_in_delta": 0}
+    for r in delta_days.groupBy("event_date").agg(count("*").alias("n"), expr(SPARK_ID_CHECKSUM).alias("x")).collect():
+        checks[str(r["event_date"])].update({"delta_rows": r["n"], "delta_checksum": r["x"] or 0})
+    missing = df2.select("event_date", "id").join(delta_days, ["event_date", "id"], "left_anti")
+    for r in missing.groupBy("event_date").count().collect():
+        checks[str(r["event_date"])]["missing_in_delta"] = r["count"]
+    for check in checks.values():
+        check.setdefault("delta_rows", 0)
+        check.setdefault("delta_checksum", 0)
+events_in = sum(check["bronze_rows"] for check in checks.values())
+timer.lap("checks")
+
+# =========================
+# 5) 적재가 모두 끝난 뒤에만 체크포인트를 전진시킵니다 (실패하면 다음 실행에서 같은 구간을 다시 읽음)
+# =========================
+for item, end in committed:
+    checkpoint.commit(item, end)
+checkpoint.prune(listing, scan_roots)
+checkpoint.save()
+timer.lap("checkpoint")
+
+pg = pg_connect()
+try:
+    record_run(
+        pg,
+        RUN_ID,
+        timer,
+        "loaded",
+        checks=checks,
+        partitions=ARGS.partitions or None,
+        files_read=len(work),
+        events_in=events_in,
+        quarantined=quarantine_count,
     )
-    .mode("append")
-    .save()
-)
+finally:
+    pg.close()
+df2.unpersist()
+parsed.unpersist()
 
 spark.stop()
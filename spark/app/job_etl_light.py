@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Spark 없이 도는 경량 logs_etl 엔진 (PyArrow + delta-rs).
+
+브론즈가 몇 MB 뿐인 실행에서 Spark 클러스터 제출과 Maven 패키지 해석 비용을 피하려고, job_etl.py 와 같은
+체크포인트 계획 → 파싱/격리 → Delta MERGE → Postgres COPY → rollup → 검증 기록 순서를 Airflow 컨테이너 안의
+Python 프로세스 하나로 실행합니다. 변환 규칙은 event_transform 을 그대로 쓰므로 결과가 Spark 엔진과 같고
+(bench/parity_etl_engines.py), Delta 테이블은 같은 event_date 파티션 레이아웃과 스키마로 delta-rs 가 씁니다.
+
+모든 행을 메모리에서 처리하므로 logs_etl DAG 가 새 데이터 크기가 ETL_LIGHT_MAX_MB 이하일 때만 고릅니다.
+로컬 브론즈(BRONZE_BASE 가 s3a:// 가 아닌 경우)만 지원합니다.
+
+    python job_etl_light.py --partitions 2025/12/01 --run-id manual__light
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import psycopg2
+import pyarrow as pa
+import pyarrow.parquet as pq
+from deltalake import DeltaTable, write_deltalake
+
+import pg_loader
+import pg_rollups
+from bronze_checkpoint import Checkpoint, complete_lines, is_columnar, list_local, normalize
+from bronze_schema import FIELDS
+from etl_audit import StageTimer, id_checksum, record_run
+from event_transform import EVENT_COLUMNS, split_lines, transform
+
+POSTGRES_HOST = os.getenv("POSTGRES_HOST", "postgres")
+POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
+POSTGRES_DB = os.getenv("POSTGRES_DB", "dwh")
+POSTGRES_USER = os.getenv("POSTGRES_USER", "analytics")
+POSTGRES_PW = os.getenv("POSTGRES_PASSWORD", "secret")
+
+BRONZE_BASE = os.getenv("BRONZE_BASE", "/data/bronze/app/")
+DELTA_OUT = os.getenv("DELTA_EVENTS_PATH", "/data/delta/events")
+PG_TABLE = os.getenv("PG_EVENTS_TABLE", "mart.events")
+CHECKPOINT_PATH = os.getenv("ETL_CHECKPOINT_PATH", "/data/state/etl_checkpoint.json")
+OPEN_GRACE_SEC = int(os.getenv("ETL_OPEN_GRACE_SEC", "300"))
+FULL_REFRESH = os.getenv("ETL_FULL_REFRESH", "false").lower() == "true"
+QUARANTINE_PATH = os.getenv("ETL_QUARANTINE_PATH", "/data/quarantine/events")
+
+# Spark 가 쓴 Delta 테이블과 같은 스키마 (ts 는 UTC 기준 instant 로 저장되는 Delta timestamp)
+EVENT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("type", pa.string()),
+        ("ts", pa.timestamp("us", tz="UTC")),
+        ("event_date", pa.date32()),
+        ("username", pa.string()),
+        ("props", pa.string()),
+        ("server", pa.string()),
+        ("source_file", pa.string()),
+    ]
+)
+
+
+def pg_connect():
+    return psycopg2.connect(
+        host=POSTGRES_HOST, port=POSTGRES_PORT, dbname=POSTGRES_DB, user=POSTGRES_USER, password=POSTGRES_PW
+    )
+
+
+def read_work(work):
+    """계획한 구간을 읽어 ``((줄 또는 dict, source_file) 목록, [(item, 커밋할 오프셋)])`` 을 돌려줍니다."""
+    items = []
+    committed = []
+    columns = [name for name, _kind in FIELDS]
+    for item in work:
+        path = normalize(item["path"])
+        if is_columnar(path):
+            table = pq.read_table(path)
+            table = table.select([name for name in columns if name in table.column_names])
+            items.extend((row, path) for row in table.to_pylist())
+            committed.append((item, item["size"]))
+            continue
+        with open(path, "rb") as f:
+            f.seek(item["start"])
+            data = f.read(item["end"] - item["start"])
+        if item["whole"]:
+            consumed = len(data)
+        else:
+            # 기록 중인 파일은 마지막 개행 뒤의 잘린 줄을 다음 실행으로 넘깁니다.
+            data, consumed = complete_lines(data)
+        committed.append((item, item["start"] + consumed))
+        items.extend((line, path) for line in split_lines(data))
+    return items, committed
+
+
+def write_quarantine(quarantined, run_id):
+    """Spark 엔진과 같은 필드(raw, source_file, reason, quarantined_at)의 JSON 줄 파일 하나로 남깁니다."""
+    if not quarantined:
+        return
+    os.makedirs(QUARANTINE_PATH, exist_ok=True)
+    now = datetime.now(timezone.utc).isoformat()
+    safe_run = "".join(c if c.isalnum() or c in "-_" else "_" for c in run_id)
+    with open(os.path.join(QUARANTINE_PATH, f"part-light-{safe_run}.json"), "a", encoding="utf-8") as f:
+        for raw, source_file, reason in quarantined:
+            f.write(
+                json.dumps({"raw": raw, "source_file": source_file, "reason": reason, "quarantined_at": now}, ensure_ascii=False)
+                + "\n"
+            )
+
+
+def events_table(events):
+    columns = list(zip(*events)) if events else [[] for _ in EVENT_COLUMNS]
+    return pa.Table.from_arrays(
+        [pa.array(values, type=EVENT_SCHEMA.field(name).type) for name, values in zip(EVENT_COLUMNS, columns)],
+        schema=EVENT_SCHEMA,
+    )
+
+
+def merge_delta(table, dates):
+    """job_etl.merge_delta 와 같은 규칙: 테이블이 없으면 event_date 로 나눠 쓰고, 있으면 그 날짜들만 id 기준 MERGE."""
+    if not DeltaTable.is_deltatable(DELTA_OUT):
+        write_deltalake(DELTA_OUT, table, mode="append", partition_by=["event_date"])
+        return
+    if not dates:
+        return
+    date_list = ", ".join(f"'{d}'" for d in sorted(dates))
+    (
+        DeltaTable(DELTA_OUT)
+        .merge(
+            source=table,
+            predicate=f"t.event_date IN ({date_list}) AND t.event_date = s.event_date AND t.id = s.id",
+            source_alias="s",
+            target_alias="t",
+        )
+        .when_not_matched_insert_all()
+        .execute()
+    )
+
+
+def delta_day_ids(dates):
+    """``{date: set(id)}`` — 그 날짜 파티션만 읽습니다."""
+    if not dates or not DeltaTable.is_deltatable(DELTA_OUT):
+        return {}
+    dataset = DeltaTable(DELTA_OUT).to_pyarrow_dataset(partitions=[("event_date", "in", [str(d) for d in dates])])
+    out = {}
+    for row in dataset.to_table(columns=["event_date", "id"]).to_pylist():
+        out.setdefault(row["event_date"], set()).add(row["id"])
+    return out
+
+
+def build_checks(events, dates):
+    """job_etl 4) 단계와 같은 날짜별 브론즈/Delta 행 수, id 체크섬, Delta 에 없는 배치 id 수."""
+    batch = {}
+    for event in events:
+        batch.setdefault(event[3], []).append(event[0])
+    delta = delta_day_ids(dates)
+    checks = {}
+    for day, ids in batch.items():
+        in_delta = delta.get(day, set())
+        checks[str(day)] = {
+            "bronze_rows": len(ids),
+            "bronze_checksum": id_checksum(ids),
+            "missing_in_delta": sum(1 for i in ids if i not in in_delta),
+            "delta_rows": len(in_delta),
+            "delta_checksum": id_checksum(in_delta),
+        }
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--partitions", default="", help="쉼표로 구분한 YYYY/MM/DD 날짜 파티션 (logs_etl 센서가 전달)")
+    parser.add_argument("--run-id", default="", help="mart.etl_runs 에 기록할 실행 id (Airflow run_id)")
+    args = parser.parse_args()
+    run_id = args.run_id or f"manual__{datetime.now(timezone.utc).isoformat()}"
+    timer = StageTimer()
+
+    checkpoint = Checkpoint(CHECKPOINT_PATH)
+    if FULL_REFRESH:
+        checkpoint.files = {}
+    partitions = [p for p in args.partitions.split(",") if p] if args.partitions and not FULL_REFRESH else None
+    scan_roots = [BRONZE_BASE.rstrip("/") + "/" + p for p in partitions] if partitions else None
+    listing = list_local(BRONZE_BASE, partitions)
+    work = checkpoint.plan(listing, grace_sec=OPEN_GRACE_SEC)
+    timer.lap("plan")
+
+    items, committed = read_work(work)
+    events, quarantined = transform(items)
+    write_quarantine(quarantined, run_id)
+    dates = sorted({event[3] for event in events})
+    print(
+        f"[logs_etl_light] partitions={args.partitions or 'all'} files listed={len(listing)} to_read={len(work)} "
+        f"lines={len(items)} events={len(events)} quarantined={len(quarantined)}"
+    )
+    timer.lap("read_parse")
+
+    pg = pg_connect()
+    try:
+        if events:
+            merge_delta(events_table(events), dates)
+            timer.lap("delta")
+            # Spark 엔진의 toLocalIterator 와 같이 TIMEZONE 벽시계 시각(naive)으로 적재합니다.
+            rows = [(*e[:2], e[2].replace(tzinfo=None), *e[3:]) for e in events]
+            day_rows = ((d, (r for r in rows if r[3] == d)) for d in dates)
+            for stats in pg_loader.load_days(pg, PG_TABLE, day_rows, replace=FULL_REFRESH):
+                print(f"[logs_etl_light] postgres {stats}")
+            timer.lap("postgres")
+            for stats in pg_rollups.refresh_days(pg, dates, source=PG_TABLE):
+                print(f"[logs_etl_light] rollups {stats}")
+            timer.lap("rollups")
+        checks = build_checks(events, dates)
+        timer.lap("checks")
+
+        # 적재가 모두 끝난 뒤에만 체크포인트를 전진시킵니다.
+        for item, end in committed:
+            checkpoint.commit(item, end)
+        checkpoint.prune(listing, scan_roots)
+        checkpoint.save()
+        timer.lap("checkpoint")
+        record_run(
+            pg,
+            run_id,
+            timer,
+            "loaded" if items else "empty",
+            checks=checks,
+            partitions=args.partitions or None,
+            files_read=len(work),
+            events_in=len(events),
+            quarantined=len(quarantined),
+        )
+    finally:
+        pg.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
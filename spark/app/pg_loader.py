@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""mart.events 를 event_date 기준으로 선언적 파티셔닝하고, 하루치 이벤트를 COPY 로 적재하는 로더.
+
+- 아직 없는 날짜(또는 전체 재처리)는 독립 테이블에 ``COPY FROM STDIN`` 으로 쓰고 PK/CHECK 를 만든 뒤,
+  한 트랜잭션에서 기존 파티션을 DETACH 하고 새 테이블을 ATTACH 합니다. 게시가 DELETE + INSERT 가 아니라
+  메타데이터 작업이 되므로 dead tuple 이 남지 않습니다.
+- 이미 있는 날짜에 증분으로 들어온 이벤트는 임시 테이블에 COPY 한 뒤 그 파티션에 id 기준으로 추가합니다.
+
+Spark 에 의존하지 않고 psycopg2 커넥션만 받으므로 벤치마크에서도 그대로 가져다 씁니다.
+"""
+import csv
+import io
+import time
+from datetime import timedelta
+
+COLUMNS = ("id", "type", "ts", "event_date", "username", "props", "server", "source_file")
+COLUMN_DDL = (
+    "id TEXT NOT NULL, type TEXT, ts TIMESTAMP, event_date DATE NOT NULL, "
+    "username TEXT, props JSONB, server JSONB, source_file TEXT"
+)
+_COLS = ", ".join(COLUMNS)
+# web 조회 API(web/events_query.py)가 쓰는 보조 인덱스: (이름 접미어, 정의).
+# 사용자별 최신순 keyset 페이지 (username, ts, id) 와 props 포함(@>) 필터용 GIN 입니다.
+EVENT_INDEXES = (
+    ("username_ts", "(username, ts DESC, id DESC)"),
+    ("props", "USING gin (props jsonb_path_ops)"),
+)
+
+
+class CsvRowStream:
+    """행 iterator 를 ``COPY ... FROM STDIN WITH (FORMAT csv)`` 가 읽는 파일 객체로 감쌉니다.
+
+    ``chunk_rows`` 행씩만 CSV 로 직렬화하므로 하루치 전체를 메모리에 올리지 않습니다.
+    None 은 따옴표 없는 빈 값으로 쓰여 NULL 로 적재됩니다.
+    """
+
+    def __init__(self, rows, chunk_rows=5000):
+        self._rows = iter(rows)
+        self._chunk_rows = chunk_rows
+        self._buf = b""
+        self._pos = 0
+        self._done = False
+        self.rows = 0
+
+    def _fill(self):
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        count = 0
+        for row in self._rows:
+            writer.writerow(row)
+            count += 1
+            if count >= self._chunk_rows:
+                break
+        if count == 0:
+            self._done = True
+        self.rows += count
+        return out.getvalue().encode("utf-8")
+
+    def read(self, size=-1):
+        # 남은 버퍼를 매번 잘라 복사하지 않도록 읽은 위치만 옮깁니다.
+        while not self._done and (size < 0 or len(self._buf) - self._pos < size):
+            self._buf = self._buf[self._pos :] + self._fill()
+            self._pos = 0
+        end = len(self._buf) if size < 0 else self._pos + size
+        data = self._buf[self._pos : end]
+        self._pos += len(data)
+        return data
+
+
+def split_name(table):
+    schema, _, name = table.rpartition(".")
+    return schema or "public", name
+
+
+def partition_name(table, day):
+    return f"{table}_p{day:%Y%m%d}"
+
+
+def _relkind(cur, table):
+    schema, name = split_name(table)
+    cur.execute(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = %s AND c.relname = %s",
+        (schema, name),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def existing_days(cur, table):
+    """부모 테이블에 붙어 있는 ``<table>_pYYYYMMDD`` 파티션 이름 집합."""
+    cur.execute(
+        "SELECT n.nspname || '.' || c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE i.inhparent = %s::regclass",
+        (table,),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def create_partition(cur, table, day):
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, day)} PARTITION OF {table} "
+        f"FOR VALUES FROM (DATE '{day}') TO (DATE '{day + timedelta(days=1)}')"
+    )
+
+
+def ensure_events_table(conn, table):
+    """파티션 부모 테이블을 만듭니다. 파티셔닝 이전의 일반 테이블이 있으면 날짜별 파티션으로 한 번 옮깁니다.
+
+    파티션 키는 PK 에 포함되어야 하므로 PK 는 (event_date, id) 입니다. id 는 ts 로부터 만든 해시라
+    같은 id 는 항상 같은 event_date 에 속하므로 id 단독 유일성과 같습니다.
+    """
+    schema, name = split_name(table)
+    with conn.cursor() as cur:
+        kind = _relkind(cur, table)
+        if kind != "p":
+            legacy = None
+            if kind is not None:
+                legacy = f"{schema}.{name}_legacy"
+                cur.execute(f"ALTER TABLE {table} RENAME TO {name}_legacy")
+                cur.execute(f"ALTER INDEX IF EXISTS {schema}.{name}_pkey RENAME TO {name}_legacy_pkey")
+            cur.execute(f"CREATE TABLE {table} ({COLUMN_DDL}, PRIMARY KEY (event_date, id)) PARTITION BY RANGE (event_date)")
+            if legacy:
+                cur.execute(f"SELECT DISTINCT event_date FROM {legacy} WHERE event_date IS NOT NULL")
+                for (day,) in cur.fetchall():
+                    create_partition(cur, table, day)
+                cur.execute(
+                    f"INSERT INTO {table} ({_COLS}) SELECT {_COLS} FROM {legacy} "
+                    "WHERE event_date IS NOT NULL ON CONFLICT DO NOTHING"
+                )
+                cur.execute(f"DROP TABLE {legacy}")
+        ensure_event_indexes(cur, table)
+    conn.commit()
+
+
+def ensure_event_indexes(cur, table):
+    """부모 테이블에 EVENT_INDEXES 를 만듭니다. 이미 붙어 있는 파티션에는 이때 한 번 만들어지고, 이후 ATTACH 되는
+    파티션은 swap_day 가 같은 정의로 미리 만들어 둔 인덱스가 그대로 연결됩니다."""
+    name = split_name(table)[1]
+    for suffix, definition in EVENT_INDEXES:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name}_{suffix}_idx ON {table} {definition}")
+
+
+def swap_day(conn, table, day, rows):
+    """하루치 전체 이벤트로 새 파티션을 만들어 기존 파티션과 교체합니다. ``rows`` 는 id 로 중복이 제거되어 있어야 합니다."""
+    part = partition_name(table, day)
+    load = part + "_load"
+    load_name = split_name(load)[1]
+    stats = {"day": str(day), "mode": "swap"}
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        cur.execute(f"DROP TABLE IF EXISTS {load}")
+        cur.execute(f"CREATE TABLE {load} ({COLUMN_DDL})")
+        stream = CsvRowStream(rows)
+        cur.copy_expert(f"COPY {load} ({_COLS}) FROM STDIN WITH (FORMAT csv)", stream)
+        stats["copy_sec"] = round(time.perf_counter() - started, 3)
+
+        # 인덱스와 CHECK 는 적재 후 한 번에 만드는 편이 빠르고, 범위 CHECK 가 있으면 ATTACH 가 전체 검사를 건너뜁니다.
+        started = time.perf_counter()
+        cur.execute(f"ALTER TABLE {load} ADD PRIMARY KEY (event_date, id)")
+        for _suffix, definition in EVENT_INDEXES:
+            # 이름은 Postgres 가 고르게 둡니다 (같은 날짜를 다시 교체할 때 기존 파티션의 인덱스 이름과 겹치지 않도록).
+            cur.execute(f"CREATE INDEX ON {load} {definition}")
+        cur.execute(
+            f"ALTER TABLE {load} ADD CONSTRAINT {load_name}_day "
+            f"CHECK (event_date >= DATE '{day}' AND event_date < DATE '{day + timedelta(days=1)}')"
+        )
+        cur.execute(f"ANALYZE {load}")
+        conn.commit()
+        stats["index_sec"] = round(time.perf_counter() - started, 3)
+
+        # 교체 자체는 카탈로그만 바꾸므로 부모 테이블 잠금은 짧게 끝납니다.
+        started = time.perf_counter()
+        if part in existing_days(cur, table):
+            cur.execute(f"ALTER TABLE {table} DETACH PARTITION {part}")
+            cur.execute(f"DROP TABLE {part}")
+        cur.execute(f"ALTER TABLE {load} RENAME TO {split_name(part)[1]}")
+        cur.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {part} "
+            f"FOR VALUES FROM (DATE '{day}') TO (DATE '{day + timedelta(days=1)}')"
+        )
+        cur.execute(f"ALTER TABLE {part} DROP CONSTRAINT {load_name}_day")
+        conn.commit()
+        stats["publish_sec"] = round(time.perf_counter() - started, 3)
+    stats["rows"] = stats["inserted"] = stream.rows
+    return stats
+
+
+def append_day(conn, table, day, rows):
+    """이미 있는 날짜 파티션에 새 이벤트만 추가합니다 (임시 테이블로 COPY 후 ON CONFLICT DO NOTHING)."""
+    part = partition_name(table, day)
+    stats = {"day": str(day), "mode": "append"}
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        cur.execute(f"CREATE TEMP TABLE events_incoming ({COLUMN_DDL}) ON COMMIT DROP")
+        stream = CsvRowStream(rows)
+        cur.copy_expert(f"COPY events_incoming ({_COLS}) FROM STDIN WITH (FORMAT csv)", stream)
+        stats["copy_sec"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        cur.execute(f"INSERT INTO {part} ({_COLS}) SELECT {_COLS} FROM events_incoming ON CONFLICT DO NOTHING")
+        stats["inserted"] = cur.rowcount
+        conn.commit()
+        stats["publish_sec"] = round(time.perf_counter() - started, 3)
+    stats["rows"] = stream.rows
+    return stats
+
+
+def load_days(conn, table, day_rows, replace=False):
+    """``day_rows`` 의 (날짜, 행 iterator) 마다 파티션이 없거나 ``replace`` 면 교체, 아니면 추가합니다."""
+    ensure_events_table(conn, table)
+    with conn.cursor() as cur:
+        present = existing_days(cur, table)
+    conn.commit()
+    out = []
+    for day, rows in day_rows:
+        if replace or partition_name(table, day) not in present:
+            out.append(swap_day(conn, table, day, rows))
+        else:
+            out.append(append_day(conn, table, day, rows))
+    return out
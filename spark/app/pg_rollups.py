@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""대시보드용 사전 집계(rollup) 테이블을 mart.events 에서 날짜 단위로 갱신합니다.
+
+job_etl.py 는 Postgres 적재가 끝난 뒤 이번 배치가 건드린 event_date 만 ``refresh_days`` 로 넘깁니다.
+각 날짜는 mart.events 의 그 날짜 파티션 하나만 읽어 Postgres 안에서 GROUP BY 하고(행을 가져오지 않음),
+한 트랜잭션에서 모든 rollup 에
+  - 새 집계를 ``INSERT ... ON CONFLICT DO UPDATE`` (값이 바뀐 행만 갱신해 dead tuple 을 줄임)
+  - 그 날짜에서 더 이상 나오지 않는 키(전체 재처리로 이벤트가 사라진 경우)는 DELETE
+합니다. 대시보드는 30일 범위도 날짜 x 키 수만큼의 작은 행만 읽습니다.
+
+``users`` 는 그 날(그 시간)의 고유 사용자 수이므로 여러 날에 걸쳐 더하면 안 됩니다.
+Spark 에 의존하지 않고 psycopg2 커넥션만 받습니다.
+"""
+import time
+
+# props 에서 카테고리를 가리키는 키 (추천 요청은 category, UI 이벤트는 categoryId, 트래픽 생성기는 category_id)
+CATEGORY_KEYS = ("category", "categoryId", "category_id")
+CATEGORY_EXPR = "COALESCE(" + ", ".join(f"props ->> '{key}'" for key in CATEGORY_KEYS) + ")"
+
+# (테이블 이름(스키마 제외), 열 DDL, (키 열, 원본 식) = PK, (값 열, 집계식), 원본 조건, 보조 인덱스)
+ROLLUPS = (
+    (
+        "daily_events",
+        "event_date DATE NOT NULL, user_id TEXT NOT NULL, cnt BIGINT NOT NULL",
+        (("event_date", "event_date"), ("user_id", "username")),
+        (("cnt", "count(*)"),),
+        "username IS NOT NULL",
+        # 사용자별 최근 N일 조회
+        (("user_id", "event_date"),),
+    ),
+    (
+        "daily_event_types",
+        "event_date DATE NOT NULL, type TEXT NOT NULL, events BIGINT NOT NULL, users BIGINT NOT NULL",
+        (("event_date", "event_date"), ("type", "type")),
+        (("events", "count(*)"), ("users", "count(DISTINCT username)")),
+        "type IS NOT NULL",
+        # 특정 이벤트 종류의 추이
+        (("type", "event_date"),),
+    ),
+    (
+        "hourly_event_types",
+        "event_hour TIMESTAMP NOT NULL, type TEXT NOT NULL, event_date DATE NOT NULL, "
+        "events BIGINT NOT NULL, users BIGINT NOT NULL",
+        (("event_hour", "date_trunc('hour', ts)"), ("type", "type")),
+        # event_date 는 한 파티션 안에서 상수라 키가 아니라 값으로 둡니다 (날짜 단위 삭제/범위 조회용).
+        (("event_date", "min(event_date)"), ("events", "count(*)"), ("users", "count(DISTINCT username)")),
+        "type IS NOT NULL AND ts IS NOT NULL",
+        (("event_date",), ("type", "event_hour")),
+    ),
+    (
+        "daily_category_events",
+        "event_date DATE NOT NULL, category TEXT NOT NULL, type TEXT NOT NULL, "
+        "events BIGINT NOT NULL, users BIGINT NOT NULL",
+        (("event_date", "event_date"), ("category", CATEGORY_EXPR), ("type", "type")),
+        (("events", "count(*)"), ("users", "count(DISTINCT username)")),
+        f"type IS NOT NULL AND {CATEGORY_EXPR} IS NOT NULL",
+        (("category", "event_date"),),
+    ),
+)
+
+
+def ensure_rollup_tables(conn, schema="mart"):
+    """rollup 테이블과 대시보드 조회용 인덱스를 만듭니다 (이미 있으면 그대로)."""
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        for name, ddl, keys, _measures, _where, indexes in ROLLUPS:
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {schema}.{name} ({ddl}, PRIMARY KEY ({', '.join(col for col, _expr in keys)}))"
+            )
+            for columns in indexes:
+                cur.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name}_{'_'.join(columns)}_idx ON {schema}.{name} ({', '.join(columns)})"
+                )
+    conn.commit()
+
+
+def refresh_sql(table, keys, measures, where, source):
+    """``%(day)s`` 하루치를 다시 집계해 upsert 하고 사라진 키를 지우는 문장 하나. (갱신 행 수, 삭제 행 수) 를 돌려줍니다."""
+    key_cols = [name for name, _expr in keys]
+    measure_cols = [name for name, _expr in measures]
+    select = ", ".join(f"{expr} AS {name}" for name, expr in (*keys, *measures))
+    changed = " OR ".join(f"t.{name} IS DISTINCT FROM EXCLUDED.{name}" for name in measure_cols)
+    return f"""
+        WITH agg AS (
+            SELECT {select}
+            FROM {source}
+            WHERE event_date = %(day)s AND {where}
+            GROUP BY {', '.join(expr for _name, expr in keys)}
+        ), upserted AS (
+            INSERT INTO {table} AS t ({', '.join(key_cols + measure_cols)})
+            SELECT {', '.join(key_cols + measure_cols)} FROM agg
+            ON CONFLICT ({', '.join(key_cols)}) DO UPDATE SET
+                {', '.join(f'{name} = EXCLUDED.{name}' for name in measure_cols)}
+            WHERE {changed}
+            RETURNING 1
+        ), deleted AS (
+            DELETE FROM {table} t
+            WHERE t.event_date = %(day)s
+              AND NOT EXISTS (SELECT 1 FROM agg a WHERE {' AND '.join(f'a.{name} = t.{name}' for name in key_cols)})
+            RETURNING 1
+        )
+        SELECT (SELECT count(*) FROM upserted), (SELECT count(*) FROM deleted)
+    """
+
+
+def refresh_days(conn, days, source="mart.events", schema="mart"):
+    """날짜마다 모든 rollup 을 한 트랜잭션으로 갱신하고 ``{day, 테이블: (갱신, 삭제), sec}`` 를 내놓습니다."""
+    ensure_rollup_tables(conn, schema)
+    statements = [
+        (name, refresh_sql(f"{schema}.{name}", keys, measures, where, source))
+        for name, _ddl, keys, measures, where, _idx in ROLLUPS
+    ]
+    for day in sorted(days):
+        started = time.perf_counter()
+        stats = {"day": str(day)}
+        with conn.cursor() as cur:
+            for name, sql in statements:
+                cur.execute(sql, {"day": day})
+                stats[name] = cur.fetchone()
+        conn.commit()
+        stats["sec"] = round(time.perf_counter() - started, 3)
+        yield stats
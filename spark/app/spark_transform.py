@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""event_transform 의 변환 규칙을 Spark DataFrame 으로 구현합니다 (job_etl.py 의 배치/스트리밍 모드가 사용).
+
+세션의 ``spark.sql.session.timeZone`` 을 ``event_transform.TIMEZONE`` 으로 맞춰야 ts 해석과 event_date 가
+경량 엔진과 같아집니다.
+"""
+from pyspark.sql.functions import (
+    coalesce,
+    col,
+    concat_ws,
+    from_json,
+    input_file_name,
+    lit,
+    sha2,
+    struct,
+    to_date,
+    to_json,
+    to_timestamp,
+    when,
+)
+
+from bronze_schema import CORRUPT_COLUMN, FIELDS, SCHEMA_VERSION, spark_schema
+from event_transform import EVENT_COLUMNS, ID_FIELDS, ID_SEPARATOR, RENAMES
+
+
+def parse_lines(raw):
+    """(value, source_file) 줄을 선언된 스키마로 파싱합니다. JSON 이 아닌 줄은 CORRUPT_COLUMN 에 원문이 남습니다."""
+    return (
+        raw.where(col("value") != "")
+        .select(
+            from_json(
+                col("value"),
+                spark_schema(),
+                {"mode": "PERMISSIVE", "columnNameOfCorruptRecord": CORRUPT_COLUMN},
+            ).alias("e"),
+            col("value"),
+            col("source_file"),
+        )
+        .select("e.*", "value", "source_file")
+    )
+
+
+def segment_columns(segments):
+    """Parquet 세그먼트는 같은 열을 이미 타입이 있는 상태로 담고 있어 JSON 파싱 없이 parse_lines 결과와 열만 맞춥니다."""
+    return (
+        segments.withColumn(CORRUPT_COLUMN, lit(None).cast("string"))
+        .withColumn("value", lit(None).cast("string"))
+        .withColumn("source_file", input_file_name())
+    )
+
+
+def with_quarantine_reason(parsed):
+    reason = (
+        when(col(CORRUPT_COLUMN).isNotNull(), lit("malformed_json"))
+        # schema_version 이 없는 이전 레코드는 v1 과 같은 모양이므로 그대로 받습니다.
+        .when(col("schema_version") > SCHEMA_VERSION, lit("unsupported_schema_version"))
+        .when(col("type").isNull() | col("ts").isNull() | col("user_id").isNull(), lit("missing_required"))
+        .when(col("ts_parsed").isNull(), lit("bad_ts"))
+    )
+    return parsed.withColumn("ts_parsed", to_timestamp(col("ts"))).withColumn("quarantine_reason", reason)
+
+
+def quarantine_raw():
+    """격리 행의 원문. Parquet 세그먼트 행은 원문 줄이 없으므로 열을 다시 JSON 으로 묶습니다."""
+    return coalesce(col("value"), to_json(struct(*[col(name) for name, _kind in FIELDS])))
+
+
+def to_events(parsed):
+    """검증을 통과한 행을 EVENT_COLUMNS 로 바꾸고 배치 안의 같은 id 를 하나로 줄입니다."""
+    columns = {
+        # concat_ws 는 null 을 건너뛰므로 event_transform.event_id 와 같은 값입니다.
+        "id": sha2(concat_ws(ID_SEPARATOR, *[col(name).cast("string") for name in ID_FIELDS]), 256),
+        "ts": col("ts_parsed"),
+        "event_date": to_date(col("ts_parsed")),
+        "source_file": col("source_file"),
+        # props/_server 는 원본 JSON 문자열 그대로 (COPY 로 jsonb 에 적재)
+        **{out: col(field) for out, field in RENAMES},
+    }
+    return (
+        parsed.where(col("quarantine_reason").isNull())
+        .select(*[columns[name].alias(name) for name in EVENT_COLUMNS])
+        .dropDuplicates(["id"])
+    )
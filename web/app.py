@@ -1,29 +1,88 @@
+import asyncio
 import json
 import os
-import random
+import signal
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timezone
+import zlib
+from functools import lru_cache
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import boto3
 from botocore.config import Config
 import pendulum
-import requests
-from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from filelock import FileLock
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
+
+from bronze_writer import BronzeWriter, ParquetBronzeWriter, SegmentFiles, bronze_partition_path, record_bronze_write, writer_id
+from dataset_notifier import DatasetNotifier
+import db
+import events_query
+import fast_json
+from fast_json import FastJSONResponse
+import metrics
+from load_generator import PROFILES, LoadRun, planned_requests
+from minio_shipper import MinioShipper
+from ranking import RankingEngine
+from response_cache import PrecomputedResponse, TTLCache
+from user_store import build_user_store
 
 USE_MINIO = os.getenv('USE_MINIO', 'false').lower() == 'true'
 MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'http://minio:9000')
 MINIO_ACCESS = os.getenv('MINIO_ACCESS_KEY', 'admin')
 MINIO_SECRET = os.getenv('MINIO_SECRET_KEY', 'admin12345')
 MINIO_BUCKET = os.getenv('MINIO_BUCKET', 'logs')
+MINIO_SEGMENT_MAX_BYTES = int(os.getenv('MINIO_SEGMENT_MAX_BYTES', str(8 * 1024 * 1024)))
+MINIO_SEGMENT_MAX_AGE_SEC = float(os.getenv('MINIO_SEGMENT_MAX_AGE_SEC', '60'))
+# 세그먼트 배치(segments/parquet)에서는 워커마다 <이름>-<host>-<pid>.json 으로 따로 둡니다.
+MINIO_MANIFEST_PATH = Path(os.getenv('MINIO_MANIFEST_PATH', '/data/state/minio_manifest.json'))
+BRONZE_WRITE_MODE = os.getenv('BRONZE_WRITE_MODE', 'buffered').lower()  # buffered | direct
+# jsonl(기본) | parquet — parquet 은 buffered 모드에서만 쓰이며, direct 기록/대체 기록은 항상 JSONL 입니다.
+BRONZE_FORMAT = os.getenv('BRONZE_FORMAT', 'jsonl').lower()
+# segments(기본): 워커 프로세스마다 자기 JSONL 세그먼트에 잠금 없이 쓰고 봉인 시 rename | hourly: 모든 워커가 시간 파일 하나를 FileLock 으로 공유
+BRONZE_JSONL_LAYOUT = os.getenv('BRONZE_JSONL_LAYOUT', 'segments').lower()
+BRONZE_SEGMENT_MAX_BYTES = int(os.getenv('BRONZE_SEGMENT_MAX_BYTES', str(64 * 1024 * 1024)))
+BRONZE_SEGMENT_MAX_AGE_SEC = float(os.getenv('BRONZE_SEGMENT_MAX_AGE_SEC', '60'))
+BRONZE_PARQUET_SEGMENT_ROWS = int(os.getenv('BRONZE_PARQUET_SEGMENT_ROWS', '50000'))
+BRONZE_PARQUET_SEGMENT_AGE_SEC = float(os.getenv('BRONZE_PARQUET_SEGMENT_AGE_SEC', '60'))
+BRONZE_QUEUE_MAX = int(os.getenv('BRONZE_QUEUE_MAX', '10000'))
+BRONZE_FLUSH_EVERY_N = int(os.getenv('BRONZE_FLUSH_EVERY_N', '500'))
+BRONZE_FLUSH_INTERVAL_SEC = float(os.getenv('BRONZE_FLUSH_INTERVAL_SEC', '0.2'))
+BRONZE_FSYNC = os.getenv('BRONZE_FSYNC', 'false').lower() == 'true'
+BRONZE_BACKPRESSURE = os.getenv('BRONZE_BACKPRESSURE', 'wait').lower()  # wait | reject
+BRONZE_ENQUEUE_WAIT_SEC = float(os.getenv('BRONZE_ENQUEUE_WAIT_SEC', '0.5'))
+BRONZE_SYNC_TIMEOUT_SEC = float(os.getenv('BRONZE_SYNC_TIMEOUT_SEC', '5'))
+EVENT_BATCH_MAX_EVENTS = int(os.getenv('EVENT_BATCH_MAX_EVENTS', '1000'))
+EVENT_BATCH_MAX_BYTES = int(os.getenv('EVENT_BATCH_MAX_BYTES', str(5 * 1024 * 1024)))
+AIRFLOW_API_URL = os.getenv('AIRFLOW_API_URL', '')
+AIRFLOW_API_USER = os.getenv('AIRFLOW_API_USER', '')
+AIRFLOW_API_PASSWORD = os.getenv('AIRFLOW_API_PASSWORD', '')
+AIRFLOW_BRONZE_DATASET = os.getenv('AIRFLOW_BRONZE_DATASET', 'file:///data/bronze/app')
+AIRFLOW_DATASET_MIN_INTERVAL_SEC = float(os.getenv('AIRFLOW_DATASET_MIN_INTERVAL_SEC', '300'))
+CATALOG_MAX_AGE_SEC = int(os.getenv('CATALOG_MAX_AGE_SEC', '300'))
+RANKING_ENABLED = os.getenv('RANKING_ENABLED', 'true').lower() == 'true'
+RANKING_REFRESH_SEC = float(os.getenv('RANKING_REFRESH_SEC', '900'))
+RANKING_HALF_LIFE_HOURS = float(os.getenv('RANKING_HALF_LIFE_HOURS', '72'))
+EVENTS_TABLE = os.getenv('PG_EVENTS_TABLE', 'mart.events')
+EVENTS_API_MAX_LIMIT = int(os.getenv('EVENTS_API_MAX_LIMIT', '500'))
+EVENTS_STATS_MAX_DAYS = int(os.getenv('EVENTS_STATS_MAX_DAYS', '90'))
+EVENTS_STATS_TTL_SEC = float(os.getenv('EVENTS_STATS_TTL_SEC', '30'))
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+
+# hourly 배치에서는 모든 워커가 같은 시간 파일을 쓰므로, 워커마다 shipper 가 돌면 같은 구간을 서로 다른 manifest 로
+# 중복 업로드합니다. 세그먼트 배치를 쓰거나 워커를 하나로 두어야 합니다.
+# (parquet 형식이어도 direct/대체 기록은 JSONL 배치를 따릅니다.)
+BRONZE_SHARED_FILES = BRONZE_JSONL_LAYOUT != 'segments'
+if USE_MINIO and WEB_WORKERS > 1 and BRONZE_SHARED_FILES:
+    raise RuntimeError('USE_MINIO 는 BRONZE_JSONL_LAYOUT=hourly 에서 WEB_WORKERS=1 일 때만 쓸 수 있습니다.')
 
 BASE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BASE_DIR.parent
@@ -31,7 +90,44 @@ CANDIDATE_FRONTEND_DIST = PROJECT_ROOT / 'growit' / 'dist'
 FRONTEND_DIST = CANDIDATE_FRONTEND_DIST if CANDIDATE_FRONTEND_DIST.exists() else None
 FRONTEND_ASSETS = FRONTEND_DIST / 'assets' if FRONTEND_DIST and (FRONTEND_DIST / 'assets').exists() else None
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await user_store.start()
+    if hasattr(signal, 'SIGHUP'):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, user_store.request_reload)
+        except (NotImplementedError, RuntimeError):
+            pass
+    if bronze_segments:
+        # 이전 실행(또는 종료된 다른 워커)이 봉인하지 못한 세그먼트를 정리합니다.
+        await asyncio.to_thread(bronze_segments.recover)
+    if BRONZE_WRITE_MODE == 'buffered':
+        bronze_writer.start()
+    seal_task = asyncio.create_task(_segment_seal_loop()) if bronze_segments and BRONZE_WRITE_MODE != 'buffered' else None
+    if USE_MINIO:
+        minio_shipper.start()
+    if dataset_notifier:
+        dataset_notifier.start()
+    ranking_task = asyncio.create_task(_ranking_refresh_loop()) if RANKING_ENABLED else None
+    try:
+        yield
+    finally:
+        if ranking_task:
+            ranking_task.cancel()
+        if seal_task:
+            seal_task.cancel()
+        bronze_writer.stop()
+        if bronze_segments:
+            bronze_segments.seal_all()
+        minio_shipper.stop()
+        if dataset_notifier:
+            dataset_notifier.stop()
+        await user_store.close()
+        await db.close_pool()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 default_origins = [
     'http://localhost:5173',
     'http://127.0.0.1:5173',
@@ -47,18 +143,23 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*'],
 )
+app.add_middleware(metrics.RouteMetricsMiddleware)
 STATIC_DIR = BASE_DIR / 'static'
 if STATIC_DIR.exists():
     app.mount('/static', StaticFiles(directory=STATIC_DIR), name='static')
 if FRONTEND_ASSETS:
     app.mount('/assets', StaticFiles(directory=FRONTEND_ASSETS), name='frontend-assets')
 
-BRONZE_ROOT = Path('/data/bronze/app')
+BRONZE_ROOT = Path(os.getenv('BRONZE_ROOT', '/data/bronze/app'))
 BRONZE_ROOT.mkdir(parents=True, exist_ok=True)
-USERS_PATH = Path(__file__).with_name('users.json')
+USERS_PATH = Path(os.getenv('USERS_PATH', str(Path(__file__).with_name('users.json'))))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
 TRAFFIC_DEFAULT_TARGET = os.getenv('TRAFFIC_TARGET_URL', 'http://web:3000/api/events')
-TRAFFIC_MAX_REQUESTS = 20000
-TRAFFIC_MAX_CONCURRENCY = 200
+TRAFFIC_MAX_REQUESTS = int(os.getenv('TRAFFIC_MAX_REQUESTS', '1000000'))
+TRAFFIC_MAX_CONCURRENCY = int(os.getenv('TRAFFIC_MAX_CONCURRENCY', '2000'))
+TRAFFIC_MAX_RPS = float(os.getenv('TRAFFIC_MAX_RPS', '20000'))
+TRAFFIC_MAX_DURATION_SEC = float(os.getenv('TRAFFIC_MAX_DURATION_SEC', '3600'))
+TRAFFIC_MAX_PROCESSES = int(os.getenv('TRAFFIC_MAX_PROCESSES', str(os.cpu_count() or 1)))
 traffic_state: dict[str, Any] = {
     'status': 'idle',
     'message': 'ready',
@@ -67,15 +168,9 @@ traffic_state: dict[str, Any] = {
     'summary': {},
 }
 traffic_lock = threading.Lock()
-TRAFFIC_ACTIONS = ['login', 'view_home', 'search', 'view_product', 'cart', 'checkout', 'logout']
-TRAFFIC_PATHS = ['/', '/feed', '/product/1', '/product/2', '/cart', '/checkout']
-TRAFFIC_UA = [
-    'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)',
-    'Mozilla/5.0 (Linux; x86_64)',
-    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X)',
-    'Mozilla/5.0 (Android 14; Mobile)',
-]
+traffic_run: LoadRun | None = None
+# 마지막으로 끝난 실행의 전체 리포트 (히스토그램 버킷, 초당 처리량 포함) — /api/traffic/report 로 내려받습니다.
+traffic_last_report: dict[str, Any] | None = None
 
 
 def _build_courses(slug: str, theme: str, providers: list[str], levels: list[str], durations: list[str], total: int = 100):
@@ -222,79 +317,420 @@ for blueprint in CATEGORY_BLUEPRINTS:
         ),
     }
 
+# 카탈로그는 기동 후 바뀌지 않으므로 응답 본문(및 gzip/br 변형)을 미리 만들어 둡니다.
+CATEGORIES_RESPONSE = PrecomputedResponse(
+    {
+        'items': [
+            {
+                'id': key,
+                'name': info['name'],
+                'description': info['description'],
+                'courseCount': len(info['courses']),
+                'icon': info.get('icon'),
+                'accent': info.get('accent'),
+                'sampleUrl': info['courses'][0]['url'] if info['courses'] else None,
+            }
+            for key, info in COURSE_CATALOG.items()
+        ]
+    },
+    cache_control=f'public, max-age={CATALOG_MAX_AGE_SEC}',
+)
+
+
+@lru_cache(maxsize=256)
+def _recommendation_response(category_id: str, offset: int, limit: int) -> PrecomputedResponse:
+    category = COURSE_CATALOG[category_id]
+    courses = category['courses']
+    return PrecomputedResponse(
+        {
+            'category': {
+                'id': category_id,
+                'name': category['name'],
+                'description': category.get('description'),
+                'icon': category.get('icon'),
+                'accent': category.get('accent'),
+            },
+            'courses': courses[offset : offset + limit],
+            'pagination': {'offset': offset, 'limit': limit, 'total': len(courses)},
+        },
+        cache_control='private, no-cache',
+    )
+
+
+for _category_id, _category in COURSE_CATALOG.items():
+    _recommendation_response(_category_id, 0, len(_category['courses']))
+
+# 개인화 순서로 응답을 조립할 때 강의별 JSON 조각을 재사용합니다.
+CATEGORY_HEADERS: dict[str, bytes] = {}
+COURSE_FRAGMENTS: dict[str, list[bytes]] = {}
+for _category_id, _category in COURSE_CATALOG.items():
+    CATEGORY_HEADERS[_category_id] = json.dumps(
+        {
+            'id': _category_id,
+            'name': _category['name'],
+            'description': _category.get('description'),
+            'icon': _category.get('icon'),
+            'accent': _category.get('accent'),
+        },
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode('utf-8')
+    COURSE_FRAGMENTS[_category_id] = [
+        json.dumps(course, ensure_ascii=False, separators=(',', ':')).encode('utf-8') for course in _category['courses']
+    ]
+
+
+def _ranked_recommendation_response(category_id: str, order, offset: int, limit: int) -> PrecomputedResponse:
+    fragments = COURSE_FRAGMENTS[category_id]
+    pagination = {'offset': offset, 'limit': limit, 'total': len(fragments)}
+    body = b''.join(
+        [
+            b'{"category":',
+            CATEGORY_HEADERS[category_id],
+            b',"courses":[',
+            b','.join(fragments[idx] for idx in order[offset : offset + limit]),
+            b'],"pagination":',
+            fast_json.dumps(pagination),
+            b'}',
+        ]
+    )
+    return PrecomputedResponse(body=body, cache_control='private, no-cache', fast=True)
+
+
+ranking_engine = RankingEngine(COURSE_CATALOG, half_life_hours=RANKING_HALF_LIFE_HOURS)
+# /api/events/stats 응답 (rollup 은 ETL 때만 바뀌므로 짧은 TTL 로 재사용하고 ETL 직후 비웁니다)
+stats_cache = TTLCache(ttl=EVENTS_STATS_TTL_SEC)
+
 
 def _ensure_dir(p: Path):
     p.parent.mkdir(parents=True, exist_ok=True)
 
 
 def _local_bronze_path(now: datetime) -> Path:
-    y, m, d, hh = now.strftime('%Y'), now.strftime('%m'), now.strftime('%d'), now.strftime('%H')
-    folder = BRONZE_ROOT / y / m / d
-    _ensure_dir(folder)
-    return folder / f'part-{y}{m}{d}-{hh}.jsonl'
+    dest = bronze_partition_path(BRONZE_ROOT, now)
+    _ensure_dir(dest)
+    return dest
 
 
-def _append_jsonl_line(dest: Path, line: str):
+def _append_jsonl_line(dest: Path, line: str, lines: int = 1):
+    if not line.endswith('\n'):
+        line += '\n'
+    data = line.encode('utf-8')
     lock = FileLock(str(dest) + '.lock')
+    started = time.perf_counter()
     with lock:
-        with dest.open('a', encoding='utf-8') as f:
-            if not line.endswith('\n'):
-                line += '\n'
-            f.write(line)
+        locked = time.perf_counter()
+        with dest.open('ab') as f:
+            f.write(data)
+    record_bronze_write('direct', locked - started, time.perf_counter() - locked, len(data), lines)
 
 
-def _minio_upload_whole_file(dest: Path, now: datetime):
-    key = f"bronze/app/{now.strftime('%Y/%m/%d')}/{dest.name}"
-    s3 = boto3.client(
+def _minio_client():
+    return boto3.client(
         's3',
         endpoint_url=MINIO_ENDPOINT,
         aws_access_key_id=MINIO_ACCESS,
         aws_secret_access_key=MINIO_SECRET,
-        config=Config(s3={'addressing_style': 'path'}, retries={'max_attempts': 3}),
+        config=Config(
+            s3={'addressing_style': 'path'},
+            retries={'max_attempts': 3, 'mode': 'standard'},
+            max_pool_connections=4,
+            tcp_keepalive=True,
+        ),
         region_name='us-east-1',
     )
-    s3.upload_file(str(dest), MINIO_BUCKET, key)
-    return key
 
 
-def _load_users() -> list[dict[str, Any]]:
-    if not USERS_PATH.exists():
-        return []
-    with USERS_PATH.open(encoding='utf-8') as f:
-        return json.load(f)
+minio_shipper = MinioShipper(
+    BRONZE_ROOT,
+    MINIO_BUCKET,
+    _minio_client,
+    manifest_path=MINIO_MANIFEST_PATH,
+    max_segment_bytes=MINIO_SEGMENT_MAX_BYTES,
+    max_segment_age=MINIO_SEGMENT_MAX_AGE_SEC,
+    writer=None if BRONZE_SHARED_FILES else writer_id(),
+)
 
 
-def _get_user(username: str) -> dict[str, Any] | None:
-    for user in _load_users():
-        if user['username'] == username:
-            return user
-    return None
+# AIRFLOW_API_URL 을 주면 브론즈에 새 데이터가 기록될 때 logs_etl 의 Dataset 이벤트를 보냅니다.
+dataset_notifier = (
+    DatasetNotifier(
+        AIRFLOW_API_URL,
+        AIRFLOW_BRONZE_DATASET,
+        auth=(AIRFLOW_API_USER, AIRFLOW_API_PASSWORD) if AIRFLOW_API_USER else None,
+        min_interval=AIRFLOW_DATASET_MIN_INTERVAL_SEC,
+    )
+    if AIRFLOW_API_URL
+    else None
+)
+
+
+def _on_bronze_flush(dest: Path, now: datetime):
+    if USE_MINIO:
+        minio_shipper.notify(dest, now)
+    if dataset_notifier:
+        dataset_notifier.notify()
+
+
+bronze_segments = (
+    SegmentFiles(
+        BRONZE_ROOT,
+        max_bytes=BRONZE_SEGMENT_MAX_BYTES,
+        max_age=BRONZE_SEGMENT_MAX_AGE_SEC,
+        fsync=BRONZE_FSYNC,
+        on_seal=_on_bronze_flush,
+    )
+    if BRONZE_JSONL_LAYOUT == 'segments'
+    else None
+)
+
+if BRONZE_FORMAT == 'parquet':
+    bronze_writer = ParquetBronzeWriter(
+        BRONZE_ROOT,
+        segment_rows=BRONZE_PARQUET_SEGMENT_ROWS,
+        segment_age=BRONZE_PARQUET_SEGMENT_AGE_SEC,
+        on_flush=_on_bronze_flush,
+        max_queue=BRONZE_QUEUE_MAX,
+        flush_every_n=BRONZE_FLUSH_EVERY_N,
+        flush_interval=BRONZE_FLUSH_INTERVAL_SEC,
+        fsync=BRONZE_FSYNC,
+    )
+else:
+    bronze_writer = BronzeWriter(
+        BRONZE_ROOT,
+        max_queue=BRONZE_QUEUE_MAX,
+        flush_every_n=BRONZE_FLUSH_EVERY_N,
+        flush_interval=BRONZE_FLUSH_INTERVAL_SEC,
+        fsync=BRONZE_FSYNC,
+        on_flush=_on_bronze_flush,
+        segments=bronze_segments,
+    )
 
 
-def _verify_credentials(username: str, password: str) -> dict[str, Any]:
-    user = _get_user(username)
+async def _segment_seal_loop():
+    """direct 모드에는 writer 스레드가 없으므로 세그먼트 나이 봉인을 여기서 합니다."""
+    while True:
+        await asyncio.sleep(min(1.0, BRONZE_SEGMENT_MAX_AGE_SEC))
+        try:
+            await asyncio.to_thread(bronze_segments.seal_expired)
+        except Exception:  # noqa: BLE001
+            bronze_segments.stats['errors'] += 1
+
+
+EVENTS_RECEIVED = metrics.counter('growit_events_received_total', 'event_type 별 수신 이벤트 수', ('event_type',), max_series=200)
+metrics.gauge(
+    'growit_bronze_queue_depth',
+    'buffered 모드 브론즈 writer 큐에 쌓인 이벤트 수',
+    collect=lambda: [((), bronze_writer.queue_depth())],
+)
+metrics.gauge(
+    'growit_bronze_writer_stats',
+    '브론즈 writer 누적 통계 (enqueued, written, flushes, queue_full, errors)',
+    ('stat',),
+    collect=lambda: [((key,), value) for key, value in bronze_writer.stats.items()],
+)
+metrics.gauge(
+    'growit_bronze_segment_stats',
+    '프로세스별 JSONL 세그먼트 누적 통계 (segments, recovered, errors)',
+    ('stat',),
+    collect=lambda: [((key,), value) for key, value in bronze_segments.stats.items()] if bronze_segments else [],
+)
+metrics.gauge(
+    'growit_dataset_notifier_stats',
+    'Airflow Dataset 이벤트 전송 누적 통계 (notified, sent, failures)',
+    ('stat',),
+    collect=lambda: [((key,), value) for key, value in dataset_notifier.stats.items()] if dataset_notifier else [],
+)
+metrics.gauge(
+    'growit_minio_shipper_stats',
+    'MinIO 세그먼트 전송 누적 통계 (segments, bytes_uploaded, failures)',
+    ('stat',),
+    collect=lambda: [((key,), value) for key, value in minio_shipper.stats.items()] if USE_MINIO else [],
+)
+metrics.gauge(
+    'growit_json_codec',
+    '사용 중인 JSON 백엔드 (record_struct/typed_events 는 msgspec Struct 사용 여부)',
+    ('backend', 'record_struct', 'typed_events'),
+    collect=lambda: [((fast_json.codec.backend, str(fast_json.codec.status()['record_struct']).lower(), str(fast_json.codec.typed_events).lower()), 1.0)],
+)
+
+
+user_store = build_user_store(USERS_PATH)
+
+
+async def _get_user(username: str) -> dict[str, Any] | None:
+    return await user_store.get(username)
+
+
+async def _interests_of(username: str) -> list[str]:
+    user = await _get_user(username)
+    return user.get('interests', []) if user else []
+
+
+async def _refresh_ranking() -> int:
+    try:
+        rows = await ranking_engine.refresh(await db.get_pool(), _interests_of)
+    except Exception as exc:  # noqa: BLE001
+        ranking_engine.last_error = str(exc)
+        raise
+    ranking_engine.last_error = None
+    return rows
+
+
+async def _ranking_refresh_loop():
+    while True:
+        try:
+            await _refresh_ranking()
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            pass  # mart 가 아직 없거나 DB 가 내려가 있으면 카탈로그 순서로 응답합니다.
+        await asyncio.sleep(RANKING_REFRESH_SEC)
+
+
+async def _verify_credentials(username: str, password: str) -> dict[str, Any]:
+    user = await _get_user(username)
     if not user or user['password'] != password:
         raise HTTPException(status_code=401, detail='아이디 혹은 비밀번호가 올바르지 않습니다.')
     return user
 
 
-def _log_event(event_type: str, username: str, payload: dict[str, Any], req: Request):
-    now = datetime.now(timezone.utc)
-    rec = {
-        'type': event_type,
-        'ts': now.isoformat(),
-        'user_id': username,
-        'props': payload,
-        '_server': {
-            'received_ts': now.isoformat(),
-            'ip': req.client.host if req.client else None,
-            'ua': req.headers.get('user-agent'),
-        },
-    }
+def _write_event_direct(now: datetime, lines: list[str]):
+    if bronze_segments:
+        data = ''.join(line if line.endswith('\n') else line + '\n' for line in lines).encode('utf-8')
+        bronze_segments.append(bronze_partition_path(BRONZE_ROOT, now), now, data, len(lines), 'direct')
+        return
     dest = _local_bronze_path(now)
-    _append_jsonl_line(dest, json.dumps(rec, ensure_ascii=False))
-    if USE_MINIO:
-        _minio_upload_whole_file(dest, now)
+    _append_jsonl_line(dest, '\n'.join(lines), len(lines))
+    _on_bronze_flush(dest, now)
+
+
+def _resolve_ack(fut: asyncio.Future, ok: bool):
+    if not fut.done():
+        fut.set_result(ok)
+
+
+def _server_info(ts: str, req: Request) -> dict[str, Any]:
+    return {
+        'received_ts': ts,
+        'ip': req.client.host if req.client else None,
+        'ua': req.headers.get('user-agent'),
+    }
+
+
+def _event_line(
+    event_type: str, username: str, payload: dict[str, Any], ts: str, server: dict[str, Any], seq: int | None = None
+) -> str:
+    EVENTS_RECEIVED.inc((event_type,))
+    return fast_json.codec.event_line(event_type, username, payload, ts, server, seq)
+
+
+def _validate_event(item: dict[str, Any]) -> tuple[str, str, dict[str, Any]]:
+    """이벤트 항목 하나를 ``CustomEventRequest`` 규칙으로 검증해 (event_type, username, metadata) 로 돌려줍니다. 실패하면 ValueError."""
+    if fast_json.codec.typed_events:
+        event = fast_json.codec.convert_event(item)
+    else:
+        try:
+            event = CustomEventRequest(**item)
+        except ValidationError as exc:
+            raise ValueError('; '.join(err.get('msg', '') for err in exc.errors())) from exc
+    return event.event_type, event.username or 'anonymous', event.metadata or {}
+
+
+async def _ingest_lines(now: datetime, lines: list[str], sync: bool = False, reject_when_full: bool = True):
+    if BRONZE_WRITE_MODE != 'buffered':
+        await run_in_threadpool(_write_event_direct, now, lines)
+        return
+
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future() if sync else None
+    ack = (lambda ok: loop.call_soon_threadsafe(_resolve_ack, fut, ok)) if fut else None
+    accepted = bronze_writer.submit_many(now, lines, ack, timeout=0)
+    if not accepted and BRONZE_BACKPRESSURE == 'wait':
+        # 큐가 가득 차면 이벤트 루프를 막지 않도록 스레드풀에서 제한 시간만큼만 기다립니다.
+        accepted = await run_in_threadpool(bronze_writer.submit_many, now, lines, ack, BRONZE_ENQUEUE_WAIT_SEC)
+    if not accepted:
+        if reject_when_full:
+            raise HTTPException(
+                status_code=429,
+                detail='이벤트 수집 대기열이 가득 찼습니다. 잠시 후 다시 시도해 주세요.',
+                headers={'Retry-After': '1'},
+            )
+        # 로그인/추천처럼 사용자 흐름을 막으면 안 되는 요청은 직접 기록으로 대체합니다.
+        await run_in_threadpool(_write_event_direct, now, lines)
+        return
+    if fut:
+        try:
+            ok = await asyncio.wait_for(fut, BRONZE_SYNC_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            ok = False
+        if not ok:
+            raise HTTPException(status_code=503, detail='이벤트 기록을 확인하지 못했습니다.')
+
+
+async def _log_event(
+    event_type: str,
+    username: str,
+    payload: dict[str, Any],
+    req: Request,
+    sync: bool = False,
+    reject_when_full: bool = True,
+):
+    now = datetime.now(timezone.utc)
+    ts = now.isoformat()
+    line = _event_line(event_type, username, payload, ts, _server_info(ts, req))
+    await _ingest_lines(now, [line], sync=sync, reject_when_full=reject_when_full)
+
+
+def _decompress_body(body: bytes, encoding: str) -> bytes:
+    if encoding in {'', 'identity'}:
+        data = body
+    elif encoding in {'gzip', 'x-gzip'}:
+        # 압축 폭탄을 막기 위해 해제 크기를 제한합니다.
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            data = inflater.decompress(body, EVENT_BATCH_MAX_BYTES + 1)
+        except zlib.error as exc:
+            raise HTTPException(status_code=400, detail=f'gzip 본문을 해제할 수 없습니다: {exc}') from exc
+    elif encoding == 'zstd':
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise HTTPException(status_code=415, detail='zstd 압축은 지원되지 않습니다. (zstandard 미설치)') from exc
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+                data = reader.read(EVENT_BATCH_MAX_BYTES + 1)
+        except zstandard.ZstdError as exc:
+            raise HTTPException(status_code=400, detail=f'zstd 본문을 해제할 수 없습니다: {exc}') from exc
+    else:
+        raise HTTPException(status_code=415, detail=f'지원하지 않는 Content-Encoding: {encoding}')
+    if len(data) > EVENT_BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f'배치 본문은 {EVENT_BATCH_MAX_BYTES}바이트 이하만 허용됩니다.')
+    return data
+
+
+def _parse_event_batch(data: bytes, content_type: str) -> list[tuple[int, Any]]:
+    """JSON 배열 또는 NDJSON 본문을 (index, item) 목록으로 바꿉니다. 줄 단위 파싱 오류는 item 에 예외로 남깁니다."""
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f'배치 본문이 UTF-8 이 아닙니다: {exc}') from exc
+    stripped = text.lstrip()
+    if 'ndjson' not in content_type and 'jsonlines' not in content_type and stripped.startswith('['):
+        try:
+            items = fast_json.loads(stripped)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'JSON 배열을 파싱할 수 없습니다: {exc}') from exc
+        return list(enumerate(items))
+    parsed: list[tuple[int, Any]] = []
+    # NDJSON 의 줄 구분은 '\n' 뿐입니다. splitlines() 는 JSON 문자열 안의 U+2028, \x85 등에서도 잘라 버립니다.
+    lines = (line.removesuffix('\r') for line in text.split('\n'))
+    for idx, raw in enumerate(line for line in lines if line.strip()):
+        try:
+            parsed.append((idx, fast_json.loads(raw)))
+        except ValueError as exc:
+            parsed.append((idx, exc))
+    return parsed
 
 
 class LoginRequest(BaseModel):
@@ -305,6 +741,8 @@ class LoginRequest(BaseModel):
 class RecommendationRequest(BaseModel):
     username: str
     category: str
+    offset: int = Field(default=0, ge=0)
+    limit: int | None = Field(default=None, ge=1, le=100)
 
 
 class CustomEventRequest(BaseModel):
@@ -315,8 +753,15 @@ class CustomEventRequest(BaseModel):
 
 class TrafficTrigger(BaseModel):
     target_url: str | None = None
-    total_requests: int = 1000
+    # count: total_requests 개를 concurrency 개의 커넥션으로 최대한 빨리 전송
+    # constant: duration_sec 동안 초당 rps 로 전송, ramp: start_rps 에서 rps 까지 선형 증가
+    profile: str = 'count'
+    total_requests: int | None = 1000
+    duration_sec: float | None = None
+    rps: float | None = None
+    start_rps: float = 0.0
     concurrency: int = 50
+    processes: int = 1
     user_pool: int = 2000
     method: str = 'POST'
     timeout_seconds: float = 5.0
@@ -330,82 +775,121 @@ def _update_traffic_state(status: str, message: str, summary: dict[str, Any] | N
         now = pendulum.now('Asia/Seoul').isoformat()
         if status == 'running':
             traffic_state['last_started'] = now
-        elif status in {'ok', 'error'}:
+        elif status in {'ok', 'error', 'stopped'}:
             traffic_state['last_finished'] = now
 
 
-def _run_traffic_spike(conf: TrafficTrigger):
+def _set_traffic_progress(summary: dict[str, Any]):
+    with traffic_lock:
+        traffic_state['summary'] = {**traffic_state['summary'], **summary}
+
+
+def _traffic_metrics() -> list[tuple[tuple, float]]:
+    with traffic_lock:
+        status = traffic_state['status']
+        summary = dict(traffic_state['summary'])
+    samples = [(('state', status), 1.0)]
+    for key in ('sent', 'success', 'failed', 'dropped', 'approx_rps'):
+        if key in summary:
+            samples.append((('requests' if key != 'approx_rps' else 'rps', key), float(summary[key])))
+    for quantile, value in (summary.get('latency_ms') or {}).items():
+        if quantile.startswith('p') or quantile == 'max':
+            samples.append((('latency_ms', quantile), float(value)))
+    return samples
+
+
+metrics.gauge(
+    'growit_traffic_generator',
+    '트래픽 스파이크 상태 (kind=state 는 현재 상태, requests/rps/latency_ms 는 진행 중이거나 마지막 실행의 값)',
+    ('kind', 'name'),
+    collect=_traffic_metrics,
+)
+
+
+def _traffic_spec(conf: TrafficTrigger) -> tuple[dict[str, Any] | None, str | None]:
     target = conf.target_url or TRAFFIC_DEFAULT_TARGET
     if not target:
-        _update_traffic_state('error', 'target_url 혹은 TRAFFIC_TARGET_URL이 필요합니다.')
-        return
-    if conf.total_requests > TRAFFIC_MAX_REQUESTS or conf.concurrency > TRAFFIC_MAX_CONCURRENCY:
-        _update_traffic_state('error', f'요청 제한 초과 (<= {TRAFFIC_MAX_REQUESTS}건, 동시 {TRAFFIC_MAX_CONCURRENCY} 이하)')
-        return
-
+        return None, 'target_url 혹은 TRAFFIC_TARGET_URL이 필요합니다.'
     method = conf.method.upper()
     if method not in {'GET', 'POST'}:
-        _update_traffic_state('error', 'method는 GET 또는 POST만 허용됩니다.')
-        return
-
+        return None, 'method는 GET 또는 POST만 허용됩니다.'
+    if conf.profile not in PROFILES:
+        return None, f'profile은 {", ".join(PROFILES)} 중 하나여야 합니다.'
+    if conf.profile == 'count':
+        if not conf.total_requests or conf.total_requests < 1:
+            return None, 'count 프로파일에는 total_requests가 필요합니다.'
+    elif not conf.duration_sec or not conf.rps or conf.duration_sec <= 0 or conf.rps <= 0:
+        return None, f'{conf.profile} 프로파일에는 duration_sec와 rps가 필요합니다.'
+    if conf.concurrency < 1 or conf.processes < 1 or conf.user_pool < 1 or conf.start_rps < 0:
+        return None, 'concurrency, processes, user_pool은 1 이상이어야 합니다.'
+    spec = {
+        'target': target,
+        'method': method,
+        'profile': conf.profile,
+        'total_requests': conf.total_requests if conf.profile == 'count' else None,
+        'duration_sec': conf.duration_sec or 0.0,
+        'rps': conf.rps or 0.0,
+        'start_rps': conf.start_rps,
+        'concurrency': conf.concurrency,
+        'processes': conf.processes,
+        'user_pool': conf.user_pool,
+        'timeout_seconds': conf.timeout_seconds,
+    }
+    if (
+        planned_requests(spec) > TRAFFIC_MAX_REQUESTS
+        or conf.concurrency > TRAFFIC_MAX_CONCURRENCY
+        or max(spec['rps'], spec['start_rps']) > TRAFFIC_MAX_RPS
+        or spec['duration_sec'] > TRAFFIC_MAX_DURATION_SEC
+        or conf.processes > TRAFFIC_MAX_PROCESSES
+    ):
+        return None, (
+            f'요청 제한 초과 (<= {TRAFFIC_MAX_REQUESTS}건, 동시 {TRAFFIC_MAX_CONCURRENCY} 이하, '
+            f'{TRAFFIC_MAX_RPS:g} rps 이하, {TRAFFIC_MAX_DURATION_SEC:g}초 이하, 프로세스 {TRAFFIC_MAX_PROCESSES}개 이하)'
+        )
+    return spec, None
+
+
+def _run_traffic_spike(run: LoadRun):
+    global traffic_run, traffic_last_report
+    spec = run.spec
+    if spec['profile'] == 'count':
+        plan = f'총 {spec["total_requests"]}건, 동시 {spec["concurrency"]}개'
+    elif spec['profile'] == 'ramp':
+        plan = f'{spec["duration_sec"]:g}초 동안 {spec["start_rps"]:g} → {spec["rps"]:g} rps'
+    else:
+        plan = f'{spec["duration_sec"]:g}초 동안 {spec["rps"]:g} rps'
     _update_traffic_state(
         'running',
-        f'{target} 로 총 {conf.total_requests}건, 동시 {conf.concurrency}개 전송 중',
-        {'target': target, 'total': conf.total_requests, 'concurrency': conf.concurrency},
+        f'{spec["target"]} 로 {plan} 전송 중 (프로세스 {spec["processes"]}개)',
+        {**spec, 'planned': planned_requests(spec)},
     )
+    try:
+        result = run.run()
+    except Exception as exc:  # noqa: BLE001
+        _update_traffic_state('error', f'부하 생성 실패: {exc}')
+        traffic_run = None
+        return
 
-    def _fire_once(idx: int):
-        user_id = f'user-{idx % conf.user_pool:05d}'
-        event_type = random.choice(TRAFFIC_ACTIONS)
-        payload = {
-            'event_type': event_type,
-            'metadata': {
-                'path': random.choice(TRAFFIC_PATHS),
-                'ts': pendulum.now('Asia/Seoul').to_iso8601_string(),
-            },
-            'username': user_id,
-        }
-        headers = {
-            'X-User-Id': user_id,
-            'User-Agent': random.choice(TRAFFIC_UA),
-            'X-Load-Test': 'traffic_button',
-        }
-        try:
-            if method == 'GET':
-                resp = requests.get(target, params=payload, headers=headers, timeout=conf.timeout_seconds)
-            else:
-                resp = requests.post(target, json=payload, headers=headers, timeout=conf.timeout_seconds)
-            resp.raise_for_status()
-            return True, resp.status_code
-        except Exception as exc:  # noqa: BLE001
-            return False, str(exc)
-
-    start = time.time()
-    successes = 0
-    failures: list[str] = []
-    with ThreadPoolExecutor(max_workers=conf.concurrency) as pool:
-        futures = [pool.submit(_fire_once, idx) for idx in range(conf.total_requests)]
-        for fut in as_completed(futures):
-            ok, detail = fut.result()
-            if ok:
-                successes += 1
-            else:
-                failures.append(detail)
-
-    elapsed = time.time() - start
-    rps = successes / elapsed if elapsed else successes
-    summary = {
-        'target': target,
-        'sent': conf.total_requests,
-        'success': successes,
-        'failed': len(failures),
-        'duration_sec': round(elapsed, 2),
-        'approx_rps': round(rps, 1),
-        'sample_failures': failures[:5],
-    }
-    status = 'ok' if successes else 'error'
-    message = '모든 요청 실패' if successes == 0 else f'완료 ({successes}/{conf.total_requests}, {round(rps,1)} rps)'
+    _set_traffic_progress(run.report())
+    with traffic_lock:
+        summary = dict(traffic_state['summary'])
+        started = traffic_state['last_started']
+    successes, sent = result['success'], result['sent']
+    if run.stopped:
+        status, message = 'stopped', f'중지됨 ({successes}/{sent}, {result["approx_rps"]} rps)'
+    elif successes == 0:
+        status, message = 'error', '모든 요청 실패'
+    else:
+        status, message = 'ok', f'완료 ({successes}/{sent}, {result["approx_rps"]} rps)'
     _update_traffic_state(status, message, summary)
+    traffic_last_report = {
+        'spec': spec,
+        'status': status,
+        'started_at': started,
+        'finished_at': traffic_state['last_finished'],
+        **result,
+    }
+    traffic_run = None
 
 
 def _frontend_index_path() -> Path | None:
@@ -442,21 +926,72 @@ api_router = APIRouter(prefix='/api')
 
 @api_router.post('/traffic/trigger')
 async def trigger_traffic(payload: TrafficTrigger, background: BackgroundTasks):
-    _update_traffic_state('queued', '버튼 트리거 수신, 전송 준비 중', payload.dict())
-    background.add_task(_run_traffic_spike, payload)
+    global traffic_run
+    with traffic_lock:
+        if traffic_run is not None:
+            raise HTTPException(status_code=409, detail='이미 트래픽 스파이크가 실행 중입니다.')
+    spec, error = _traffic_spec(payload)
+    if error:
+        _update_traffic_state('error', error)
+        raise HTTPException(status_code=400, detail=error)
+    with traffic_lock:
+        if traffic_run is not None:
+            raise HTTPException(status_code=409, detail='이미 트래픽 스파이크가 실행 중입니다.')
+        traffic_run = LoadRun(spec, _set_traffic_progress)
+    _update_traffic_state('queued', '버튼 트리거 수신, 전송 준비 중', spec)
+    background.add_task(_run_traffic_spike, traffic_run)
     return {'ok': True, 'state': traffic_state}
 
 
+@api_router.post('/traffic/stop')
+async def stop_traffic():
+    run = traffic_run
+    if run is None:
+        return {'ok': False, 'state': traffic_state}
+    run.stop()
+    return {'ok': True, 'state': traffic_state}
+
+
+@app.get('/metrics')
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @api_router.get('/traffic/status')
 def traffic_status():
     with traffic_lock:
         return traffic_state.copy()
 
 
+@api_router.get('/traffic/report')
+def traffic_report():
+    """실행 중이면 현재까지의, 아니면 마지막 실행의 전체 리포트를 JSON 파일로 내려줍니다 (실행 간 비교용)."""
+    run = traffic_run
+    if run is not None:
+        report = {'spec': run.spec, 'status': 'running', **run.report(full=True)}
+    elif traffic_last_report is not None:
+        report = traffic_last_report
+    else:
+        raise HTTPException(status_code=404, detail='아직 실행한 트래픽 스파이크가 없습니다.')
+    filename = f'traffic-report-{pendulum.now("Asia/Seoul").format("YYYYMMDD-HHmmss")}.json'
+    return Response(
+        content=json.dumps(report, ensure_ascii=False, indent=2),
+        media_type='application/json',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
 @api_router.post('/login')
-async def api_login(payload: LoginRequest, req: Request):
-    user = _verify_credentials(payload.username, payload.password)
-    _log_event('login', user['username'], {'interests': user.get('interests', [])}, req)
+async def api_login(payload: LoginRequest, req: Request, sync: bool = False):
+    user = await _verify_credentials(payload.username, payload.password)
+    await _log_event(
+        'login',
+        user['username'],
+        {'interests': user.get('interests', [])},
+        req,
+        sync=sync,
+        reject_when_full=False,
+    )
     return {
         'ok': True,
         'username': user['username'],
@@ -466,57 +1001,164 @@ async def api_login(payload: LoginRequest, req: Request):
 
 
 @api_router.get('/categories')
-def list_categories():
-    items = [
-        {
-            'id': key,
-            'name': info['name'],
-            'description': info['description'],
-            'courseCount': len(info['courses']),
-            'icon': info.get('icon'),
-            'accent': info.get('accent'),
-            'sampleUrl': info['courses'][0]['url'] if info['courses'] else None,
-        }
-        for key, info in COURSE_CATALOG.items()
-    ]
-    return {'items': items}
+def list_categories(req: Request):
+    return CATEGORIES_RESPONSE.respond(req)
 
 
 @api_router.post('/recommendations')
-async def recommend(payload: RecommendationRequest, req: Request):
-    user = _get_user(payload.username)
+async def recommend(payload: RecommendationRequest, req: Request, sync: bool = False):
+    user = await _get_user(payload.username)
     if not user:
         raise HTTPException(status_code=404, detail='사용자를 찾을 수 없습니다.')
     if payload.category not in COURSE_CATALOG:
         raise HTTPException(status_code=404, detail='카테고리를 찾을 수 없습니다.')
 
-    category = COURSE_CATALOG[payload.category]
-    courses = category['courses']
-    _log_event(
+    courses = COURSE_CATALOG[payload.category]['courses']
+    limit = payload.limit or len(courses)
+    offset = min(payload.offset, len(courses))
+    await _log_event(
         'category_recommendation',
         user['username'],
         {'category': payload.category, 'course_count': len(courses)},
         req,
+        sync=sync,
+        reject_when_full=False,
     )
-    return {
-        'category': {
-            'id': payload.category,
-            'name': category['name'],
-            'description': category.get('description'),
-            'icon': category.get('icon'),
-            'accent': category.get('accent'),
-        },
-        'courses': courses,
-    }
+    order = ranking_engine.rank(payload.category, user['username'], user.get('interests', [])) if RANKING_ENABLED else None
+    if order is None:
+        return _recommendation_response(payload.category, offset, limit).respond(req)
+    return _ranked_recommendation_response(payload.category, order, offset, limit).respond(req)
 
 
-@api_router.post('/events')
-async def record_event(payload: CustomEventRequest, req: Request):
-    username = payload.username or 'anonymous'
-    _log_event(payload.event_type, username, payload.metadata or {}, req)
+@api_router.post(
+    '/events',
+    openapi_extra={'requestBody': {'required': True, 'content': {'application/json': {'schema': CustomEventRequest.model_json_schema()}}}},
+)
+async def record_event(req: Request, sync: bool = False):
+    # 본문을 직접 읽어 fast_json 으로 디코딩·검증합니다 (스키마 문서는 CustomEventRequest 그대로).
+    try:
+        item = fast_json.loads(await req.body())
+        if not isinstance(item, dict):
+            raise ValueError('이벤트는 JSON 객체여야 합니다.')
+        event_type, username, metadata = _validate_event(item)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    await _log_event(event_type, username, metadata, req, sync=sync)
     return {'ok': True}
 
 
+@api_router.post('/admin/users/reload')
+async def reload_users(req: Request):
+    if not ADMIN_TOKEN or req.headers.get('x-admin-token') != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail='관리자 토큰이 올바르지 않습니다.')
+    count = await asyncio.to_thread(user_store.reload)
+    return {'ok': True, 'users': count}
+
+
+@api_router.post('/admin/ranking/refresh')
+async def refresh_ranking(req: Request):
+    if not ADMIN_TOKEN or req.headers.get('x-admin-token') != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail='관리자 토큰이 올바르지 않습니다.')
+    # Airflow 가 ETL 직후 호출하므로 새로 적재된 rollup 이 바로 보이도록 집계 캐시도 비웁니다.
+    stats_cache.clear()
+    try:
+        rows = await _refresh_ranking()
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=503, detail=f'랭킹 갱신 실패: {exc}') from exc
+    return {'ok': True, 'rows': rows, 'ranking': ranking_engine.status()}
+
+
+@api_router.get('/users/{username}/events')
+async def user_events(
+    username: str,
+    req: Request,
+    limit: int = Query(50, ge=1, le=EVENTS_API_MAX_LIMIT),
+    cursor: str | None = None,
+    event_type: str | None = Query(None, alias='type'),
+    props: str | None = Query(None, description='props 포함 조건 JSON 객체 (예: {"category":"data"})'),
+    since: date | None = None,
+):
+    """사용자의 이벤트를 최신순으로 돌려줍니다. 다음 페이지는 응답의 ``next_cursor`` 를 ``cursor`` 로 넘깁니다."""
+    try:
+        filters = {
+            'cursor': events_query.decode_cursor(cursor) if cursor else None,
+            'event_type': event_type,
+            'props': events_query.parse_props_filter(props) if props else None,
+            'since': since,
+        }
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    try:
+        events, next_cursor = await events_query.user_events(await db.get_pool(), EVENTS_TABLE, username, limit, **filters)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=503, detail=f'이벤트 조회 실패: {exc}') from exc
+    body = b''.join(
+        [
+            b'{"username":',
+            fast_json.dumps(username),
+            b',"events":',
+            events,
+            b',"next_cursor":',
+            fast_json.dumps(next_cursor),
+            b'}',
+        ]
+    )
+    return PrecomputedResponse(body=body, cache_control='private, no-cache', fast=True).respond(req)
+
+
+@api_router.get('/events/stats')
+async def events_stats(
+    req: Request,
+    days: int = Query(7, ge=1, le=EVENTS_STATS_MAX_DAYS),
+    event_type: str | None = Query(None, alias='type'),
+):
+    today = date.today()
+
+    async def build() -> PrecomputedResponse:
+        stats = await events_query.event_stats(await db.get_pool(), days, event_type, today=today)
+        stats['generated_at'] = datetime.now(timezone.utc).isoformat()
+        return PrecomputedResponse(stats, cache_control=f'private, max-age={int(EVENTS_STATS_TTL_SEC)}', fast=True)
+
+    try:
+        response = await stats_cache.get((today, days, event_type), build)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=503, detail=f'이벤트 통계 조회 실패: {exc}') from exc
+    return response.respond(req)
+
+
+@api_router.post('/events/batch')
+async def record_event_batch(req: Request, sync: bool = False):
+    body = await req.body()
+    data = _decompress_body(body, req.headers.get('content-encoding', '').strip().lower())
+    items = _parse_event_batch(data, req.headers.get('content-type', '').lower())
+    if len(items) > EVENT_BATCH_MAX_EVENTS:
+        raise HTTPException(status_code=413, detail=f'배치는 최대 {EVENT_BATCH_MAX_EVENTS}건까지 허용됩니다.')
+
+    now = datetime.now(timezone.utc)
+    ts = now.isoformat()
+    server = _server_info(ts, req)
+    lines: list[str] = []
+    errors: list[dict[str, Any]] = []
+    for idx, item in items:
+        if isinstance(item, Exception):
+            errors.append({'index': idx, 'error': f'JSON 파싱 실패: {item}'})
+            continue
+        if not isinstance(item, dict):
+            errors.append({'index': idx, 'error': '이벤트는 JSON 객체여야 합니다.'})
+            continue
+        try:
+            event_type, username, metadata = _validate_event(item)
+        except ValueError as exc:
+            errors.append({'index': idx, 'error': str(exc)})
+            continue
+        # 배치 항목은 모두 같은 ts 이므로, 같은 이벤트가 하나의 id 로 합쳐지지 않게 순번(seq)을 id 에 넣습니다.
+        lines.append(_event_line(event_type, username, metadata, ts, server, seq=idx))
+
+    if lines:
+        await _ingest_lines(now, lines, sync=sync)
+    return {'ok': not errors, 'accepted': len(lines), 'rejected': len(errors), 'errors': errors}
+
+
 app.include_router(api_router)
 
 
@@ -526,8 +1168,8 @@ async def legacy_login(payload: LoginRequest, req: Request):
 
 
 @app.get('/categories')
-def legacy_categories():
-    return list_categories()
+def legacy_categories(req: Request):
+    return list_categories(req)
 
 
 @app.post('/recommendations')
@@ -0,0 +1,63 @@
+"""브론즈 이벤트 레코드(JSONL 한 줄)의 스키마. web 이 기록하고 Spark ETL 이 같은 정의로 읽습니다.
+
+Spark 쪽은 이 파일을 py_files 로 받아 ``spark_schema()`` 로 StructType 을 만들므로, 스키마 추론을 위한
+추가 전체 스캔이 없고 이벤트 종류가 늘어도 스키마가 바뀌지 않습니다. ``props`` / ``_server`` 는 이벤트마다
+키가 달라 구조체로 풀지 않고 원본 JSON 문자열로 읽습니다.
+
+레코드 모양을 바꿀 때는 ``SCHEMA_VERSION`` 을 올리고 ``FIELDS`` 에 필드를 추가만 합니다
+(ETL 은 자신이 아는 버전보다 높은 레코드를 격리합니다).
+"""
+from typing import Any
+
+# 2: 배치(/api/events/batch) 항목의 순번 seq 추가
+SCHEMA_VERSION = 2
+
+# (필드 이름, 타입) — 타입은 'int' | 'string' | 'json'(원본 JSON 텍스트로 읽음)
+FIELDS: tuple[tuple[str, str], ...] = (
+    ('schema_version', 'int'),
+    ('type', 'string'),
+    ('ts', 'string'),
+    ('user_id', 'string'),
+    ('props', 'json'),
+    ('_server', 'json'),
+    # 배치 안에서의 항목 순번. 같은 배치의 같은 이벤트(같은 user_id/ts/type)가 서로 다른 id 를 갖게 합니다.
+    ('seq', 'int'),
+)
+REQUIRED = ('type', 'ts', 'user_id')
+# JSON 으로 파싱되지 않은 줄이 원문 그대로 담기는 열 (Spark PERMISSIVE 모드)
+CORRUPT_COLUMN = '_corrupt_record'
+
+
+def build_record(
+    event_type: str, username: str, props: dict[str, Any], ts: str, server: dict[str, Any], seq: int | None = None
+) -> dict[str, Any]:
+    record = {
+        'schema_version': SCHEMA_VERSION,
+        'type': event_type,
+        'ts': ts,
+        'user_id': username,
+        'props': props,
+        '_server': server,
+    }
+    if seq is not None:
+        record['seq'] = seq
+    return record
+
+
+def spark_schema(with_corrupt: bool = True):
+    """``from_json`` / ``spark.read.schema`` 에 넘길 StructType. pyspark 는 Spark 쪽에서만 import 합니다."""
+    from pyspark.sql.types import IntegerType, StringType, StructField, StructType
+
+    types = {'int': IntegerType(), 'string': StringType(), 'json': StringType()}
+    fields = [StructField(name, types[kind], True) for name, kind in FIELDS]
+    if with_corrupt:
+        fields.append(StructField(CORRUPT_COLUMN, StringType(), True))
+    return StructType(fields)
+
+
+def arrow_schema():
+    """Parquet 브론즈 세그먼트의 Arrow 스키마 ('json' 필드는 원본 JSON 텍스트 문자열)."""
+    import pyarrow as pa
+
+    types = {'int': pa.int32(), 'string': pa.string(), 'json': pa.string()}
+    return pa.schema([pa.field(name, types[kind]) for name, kind in FIELDS])
@@ -0,0 +1,607 @@
+import fcntl
+import json
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+from filelock import FileLock
+
+import metrics
+from bronze_schema import FIELDS, arrow_schema
+
+BRONZE_LOCK_WAIT = metrics.histogram(
+    'growit_bronze_lock_wait_seconds', '브론즈 파일 잠금(FileLock) 획득 대기 시간', ('mode',), metrics.FAST_BUCKETS
+)
+BRONZE_WRITE_TIME = metrics.histogram(
+    'growit_bronze_write_seconds', '잠금을 잡은 뒤 브론즈 파일에 쓰고 flush(fsync)하는 데 걸린 시간', ('mode',), metrics.FAST_BUCKETS
+)
+BRONZE_BYTES = metrics.counter('growit_bronze_bytes_written_total', '브론즈에 기록한 바이트', ('mode',))
+BRONZE_LINES = metrics.counter('growit_bronze_lines_written_total', '브론즈에 기록한 이벤트 줄 수', ('mode',))
+
+
+def bronze_partition_path(root: Path, now: datetime) -> Path:
+    y, m, d, hh = now.strftime('%Y'), now.strftime('%m'), now.strftime('%d'), now.strftime('%H')
+    return root / y / m / d / f'part-{y}{m}{d}-{hh}.jsonl'
+
+
+# 봉인된 프로세스별 JSONL 세그먼트 이름 (SegmentFiles). 나타난 뒤 다시 바뀌지 않습니다.
+SEGMENT_NAME = re.compile(r'^part-\d{8}-\d{2}-[A-Za-z0-9]+-\d+-\d+\.jsonl$')
+
+
+def is_sealed_segment(path: Path) -> bool:
+    """다시 바뀌지 않는 브론즈 파일인지 (Parquet 세그먼트 또는 봉인된 JSONL 세그먼트)."""
+    return path.suffix == '.parquet' or bool(SEGMENT_NAME.match(path.name))
+
+
+def writer_id() -> str:
+    """세그먼트 이름에 들어가는 ``<host>-<pid>`` (호스트 이름은 영숫자만 남겨 이름의 ``-`` 구분과 겹치지 않게 합니다)."""
+    host = re.sub(r'[^A-Za-z0-9]', '', socket.gethostname()) or 'host'
+    return f'{host}-{os.getpid()}'
+
+
+def record_bronze_write(mode: str, lock_wait: float, write_time: float, nbytes: int, lines: int):
+    BRONZE_LOCK_WAIT.observe(lock_wait, (mode,))
+    BRONZE_WRITE_TIME.observe(write_time, (mode,))
+    BRONZE_BYTES.inc((mode,), nbytes)
+    BRONZE_LINES.inc((mode,), lines)
+
+
+class SegmentFiles:
+    """프로세스 전용 JSONL 세그먼트. 파일을 다른 프로세스와 공유하지 않으므로 프로세스 간 잠금이 없습니다.
+
+    - 시간 파티션마다 숨김 파일 ``.part-YYYYMMDD-HH-<host>-<pid>-<seq>.jsonl.open`` 에 이어 쓰다가, ``max_bytes`` 를
+      넘거나 ``max_age`` 초가 지나거나 시간이 바뀌면 같은 디렉터리의 ``part-...jsonl`` 로 rename 해 봉인합니다.
+      ETL 은 ``part-`` 로 시작하는 봉인된 세그먼트만 보므로 쓰는 중인 줄을 읽지 않고, 세그먼트는 다시 바뀌지 않습니다.
+    - 같은 프로세스의 스레드(writer 스레드, 직접 기록 스레드풀)끼리는 ``threading.Lock`` 으로 순서를 맞춥니다.
+    - 쓰는 동안 ``.open`` 파일에 advisory lock(flock)을 잡아 두고 rename 한 뒤에 놓습니다. 비정상 종료로 남은
+      ``.open`` 파일은 잠금이 풀려 있으므로 ``recover`` 가 잠금을 잡은 뒤 마지막 완결된 줄까지 잘라 봉인합니다.
+    - ``on_seal`` 은 봉인된 세그먼트 경로로 호출됩니다 (MinIO 업로드, Airflow Dataset 알림).
+    """
+
+    OPEN_SUFFIX = '.open'
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 60.0,
+        fsync: bool = False,
+        on_seal: Callable[[Path, datetime], None] | None = None,
+    ):
+        self.root = root
+        self.max_bytes = max(1, max_bytes)
+        self.max_age = max(0.1, max_age)
+        self.fsync = fsync
+        self.on_seal = on_seal
+        self.writer = writer_id()
+        self._seq = 0
+        self._open: dict[Path, dict] = {}
+        self._mutex = threading.Lock()
+        self._recovered_at = 0.0
+        self.stats = {'segments': 0, 'recovered': 0, 'errors': 0}
+
+    def append(self, dest: Path, now: datetime, data: bytes, lines: int, mode: str):
+        """``dest``(시간 파티션 경로)의 열린 세그먼트에 완결된 줄들(``data``)을 이어 씁니다."""
+        sealed = []
+        started = time.perf_counter()
+        with self._mutex:
+            locked = time.perf_counter()
+            # 시간이 넘어가면 이전 파티션의 세그먼트를 먼저 봉인합니다.
+            for other in [p for p in self._open if p != dest]:
+                sealed.append(self._seal(other))
+            segment = self._open.get(dest) or self._start(dest, now)
+            segment['fh'].write(data)
+            segment['fh'].flush()
+            if self.fsync:
+                os.fsync(segment['fh'].fileno())
+            segment['size'] += len(data)
+            if segment['size'] >= self.max_bytes:
+                sealed.append(self._seal(dest))
+        record_bronze_write(mode, locked - started, time.perf_counter() - locked, len(data), lines)
+        self._notify(sealed)
+
+    def next_deadline(self) -> float | None:
+        """가장 먼저 나이로 봉인할 세그먼트의 시각 (time.monotonic 기준). 열린 세그먼트가 없으면 None."""
+        opened = [segment['opened'] for segment in list(self._open.values())]
+        return min(opened) + self.max_age if opened else None
+
+    def seal_expired(self):
+        """``max_age`` 가 지난 세그먼트를 봉인하고, ``max_age`` 마다 다른 프로세스가 남긴 세그먼트도 확인합니다."""
+        now = time.monotonic()
+        with self._mutex:
+            sealed = [self._seal(dest) for dest, seg in list(self._open.items()) if now - seg['opened'] >= self.max_age]
+        self._notify(sealed)
+        if now - self._recovered_at >= self.max_age:
+            self._recovered_at = now
+            self.recover(recent_only=True)
+
+    def seal_all(self):
+        with self._mutex:
+            sealed = [self._seal(dest) for dest in list(self._open)]
+        self._notify(sealed)
+
+    def recover(self, recent_only: bool = False) -> int:
+        """종료된 프로세스가 남긴 ``.open`` 파일을 봉인합니다.
+
+        ``max_age`` 의 두 배가 넘도록 바뀌지 않은 파일 중, 주인이 잡아 둔 flock 을 얻을 수 있는(주인 프로세스가 없는)
+        파일만 대상입니다. 멈추거나 한가한 살아 있는 프로세스의 세그먼트는 잠금이 잡혀 있어 건너뜁니다.
+        ``recent_only`` 면 지금과 직전 시간의 날짜 디렉터리만 훑습니다. 여러 프로세스가 같은 파일을 복구하려 해도
+        잠금을 잡은 한 프로세스만 자르고, rename 뒤에는 파일이 없으므로 안전합니다.
+        """
+        if recent_only:
+            now = datetime.now(timezone.utc)
+            days = {bronze_partition_path(self.root, ts).parent for ts in (now, now - timedelta(hours=1))}
+            candidates = [p for d in days if d.is_dir() for p in d.glob(f'.part-*{self.OPEN_SUFFIX}')]
+        else:
+            candidates = list(self.root.rglob(f'.part-*{self.OPEN_SUFFIX}'))
+        with self._mutex:
+            mine = {segment['tmp'] for segment in self._open.values()}
+        recovered = []
+        for tmp in candidates:
+            if tmp in mine:
+                continue
+            try:
+                if time.time() - tmp.stat().st_mtime < 2 * self.max_age:
+                    continue
+                path = tmp.with_name(tmp.name[1 : -len(self.OPEN_SUFFIX)])
+                with tmp.open('r+b') as f:
+                    try:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # 주인 프로세스(또는 먼저 복구 중인 프로세스)가 살아 있습니다.
+                    if not os.path.exists(tmp):
+                        continue  # 잠금을 기다리는 사이 주인이 봉인했거나 다른 프로세스가 복구했습니다.
+                    f.truncate(_last_line_end(f))
+                    size = f.tell()
+                    # rename/unlink 까지 잠금을 잡고 있어야 다른 프로세스가 같은 파일을 다시 건드리지 않습니다.
+                    if size:
+                        os.replace(tmp, path)
+                        recovered.append((path, datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)))
+                    else:
+                        tmp.unlink()
+            except FileNotFoundError:
+                continue  # 다른 프로세스가 먼저 복구했습니다.
+            except OSError:
+                self.stats['errors'] += 1
+        self.stats['recovered'] += len(recovered)
+        self._notify(recovered)
+        return len(recovered)
+
+    def _start(self, dest: Path, now: datetime) -> dict:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            # pid 는 재시작 뒤 다시 쓰일 수 있으므로 이미 있는 이름은 건너뜁니다.
+            self._seq += 1
+            path = dest.with_name(f'{dest.stem}-{self.writer}-{self._seq:06d}.jsonl')
+            tmp = path.with_name(f'.{path.name}{self.OPEN_SUFFIX}')
+            if path.exists():
+                continue
+            try:
+                fh = tmp.open('xb')
+            except FileExistsError:
+                continue
+            # 살아 있는 동안 다른 프로세스의 recover 가 이 세그먼트를 봉인하지 못하게 합니다 (프로세스가 죽으면 풀림).
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        segment = {'path': path, 'tmp': tmp, 'fh': fh, 'size': 0, 'opened': time.monotonic(), 'ts': now}
+        self._open[dest] = segment
+        return segment
+
+    def _seal(self, dest: Path) -> tuple[Path, datetime] | None:
+        segment = self._open.pop(dest)
+        fh = segment['fh']
+        try:
+            if self.fsync:
+                os.fsync(fh.fileno())
+            # 닫으면 잠금이 풀리므로 rename/unlink 뒤에 닫습니다.
+            if not segment['size']:
+                segment['tmp'].unlink()
+                fh.close()
+                return None
+            # 같은 디렉터리 안의 rename 이라 읽는 쪽은 완성된 세그먼트만 보게 됩니다.
+            os.replace(segment['tmp'], segment['path'])
+            fh.close()
+        except OSError:
+            self.stats['errors'] += 1
+            # 잠금을 풀어 남은 .open 파일을 recover 가 봉인할 수 있게 합니다.
+            if not fh.closed:
+                try:
+                    fh.close()
+                except OSError:
+                    pass
+            return None
+        self.stats['segments'] += 1
+        return segment['path'], segment['ts']
+
+    def _notify(self, sealed: list[tuple[Path, datetime] | None]):
+        if not self.on_seal:
+            return
+        for item in sealed:
+            if item is None:
+                continue
+            try:
+                self.on_seal(*item)
+            except Exception:  # noqa: BLE001
+                self.stats['errors'] += 1
+
+
+def _last_line_end(f, chunk: int = 64 * 1024) -> int:
+    """파일에서 마지막 개행 바로 뒤의 오프셋 (개행이 없으면 0)."""
+    end = f.seek(0, os.SEEK_END)
+    while end > 0:
+        start = max(0, end - chunk)
+        f.seek(start)
+        cut = f.read(end - start).rfind(b'\n')
+        if cut >= 0:
+            return start + cut + 1
+        end = start
+    return 0
+
+
+class BronzeWriter:
+    """요청 핸들러가 넣은 이벤트를 워커당 하나의 백그라운드 스레드가 모아서 시간 파티션 파일에 기록합니다.
+
+    - 큐는 ``max_queue`` 로 제한되며, 가득 차면 ``submit`` 이 최대 ``timeout`` 초 대기 후 False 를 돌려줍니다.
+    - ``ack`` 콜백을 넘기면 해당 이벤트가 파일에 기록된 뒤(실패 시 False) writer 스레드에서 호출됩니다.
+    - 대기 중인 이벤트가 ``flush_every_n`` 건에 도달하거나 가장 오래된 이벤트가 ``flush_interval`` 초를 넘기면
+      한 번의 write 로 디스크에 내립니다. (``flush_every_n=1`` 이면 기존처럼 건별 기록)
+      ack 를 기다리는 이벤트가 있으면 큐가 빌 때 바로 내립니다.
+    - ``segments`` 를 주면 프로세스 전용 세그먼트(SegmentFiles)에 잠금 없이 쓰고, 봉인과 ``on_flush`` 알림은
+      세그먼트가 맡습니다 (writer 스레드가 세그먼트 나이를 보고 봉인).
+    - 없으면 모든 프로세스가 같은 시간 파일에 씁니다. 파일 핸들은 flush 사이에 열어 두고, 시간(파티션)이 바뀌면
+      이전 파일을 닫고 새 파일로 전환하며, 줄 섞임을 막기 위해 flush 1회당 ``.lock`` 을 한 번만 잡습니다.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_queue: int = 10000,
+        flush_every_n: int = 500,
+        flush_interval: float = 0.2,
+        fsync: bool = False,
+        put_timeout: float = 0.05,
+        on_flush: Callable[[Path, datetime], None] | None = None,
+        segments: SegmentFiles | None = None,
+    ):
+        self.root = root
+        self.segments = segments
+        self.flush_every_n = max(1, flush_every_n)
+        self.flush_interval = max(0.001, flush_interval)
+        self.fsync = fsync
+        self.put_timeout = put_timeout
+        self.on_flush = on_flush
+        self._queue: queue.Queue[tuple[datetime, str, int, Callable[[bool], None] | None] | None] = queue.Queue(
+            maxsize=max_queue
+        )
+        self._thread: threading.Thread | None = None
+        self._pending: dict[Path, list[str]] = {}
+        self._pending_lines: dict[Path, int] = {}
+        self._acks: dict[Path, list[Callable[[bool], None]]] = {}
+        self._pending_count = 0
+        self._pending_since: float | None = None
+        self._partition_ts: dict[Path, datetime] = {}
+        self._current: Path | None = None
+        self._fh = None
+        self._lock: FileLock | None = None
+        self.stats = {'enqueued': 0, 'written': 0, 'flushes': 0, 'queue_full': 0, 'errors': 0}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='bronze-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if not self._thread:
+            return
+        started = time.monotonic()
+        try:
+            # 큐가 가득 찬 채로 기록 스레드가 멈춰 있으면 종료 신호를 넣지 못하므로 기다리는 시간을 제한합니다.
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            self.stats['errors'] += 1
+            self._thread = None
+            return
+        self._thread.join(max(0.0, timeout - (time.monotonic() - started)))
+        self._thread = None
+
+    def submit(
+        self,
+        now: datetime,
+        line: str,
+        ack: Callable[[bool], None] | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        if not line.endswith('\n'):
+            line += '\n'
+        return self._put((now, line, 1, ack), timeout)
+
+    def submit_many(
+        self,
+        now: datetime,
+        lines: list[str],
+        ack: Callable[[bool], None] | None = None,
+        timeout: float | None = None,
+    ) -> bool:
+        """여러 줄을 큐 항목 하나로 넣어 같은 flush 에서 한 번에 기록되도록 합니다."""
+        if not lines:
+            return True
+        blob = ''.join(line if line.endswith('\n') else line + '\n' for line in lines)
+        return self._put((now, blob, len(lines), ack), timeout)
+
+    def _put(self, item: tuple[datetime, str, int, Callable[[bool], None] | None], timeout: float | None) -> bool:
+        timeout = self.put_timeout if timeout is None else timeout
+        try:
+            if timeout <= 0:
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=timeout)
+        except queue.Full:
+            self.stats['queue_full'] += 1
+            return False
+        self.stats['enqueued'] += item[2]
+        return True
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _wait_timeout(self) -> float | None:
+        deadlines = [self._pending_since + self.flush_interval] if self._pending_since is not None else []
+        if self.segments and self.segments.next_deadline() is not None:
+            deadlines.append(self.segments.next_deadline())
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _tick(self):
+        """flush 판단 뒤 매 루프마다 호출됩니다 (세그먼트/하위 클래스의 시간 기반 봉인용)."""
+        if self.segments:
+            self.segments.seal_expired()
+
+    def _run(self):
+        while True:
+            timeout = self._wait_timeout()
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                self._add(*item)
+                # 큐에 이미 쌓여 있는 이벤트는 깨우지 않고 한 번에 가져옵니다.
+                while self._pending_count < self.flush_every_n:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._flush()
+                        self._close()
+                        return
+                    self._add(*item)
+            # 기록 확인(ack)을 기다리는 이벤트가 있으면 큐를 비운 즉시 내립니다.
+            if (
+                self._pending_count >= self.flush_every_n
+                or (self._acks and self._queue.empty())
+                or (self._pending_since is not None and time.monotonic() - self._pending_since >= self.flush_interval)
+            ):
+                self._flush()
+            self._tick()
+        self._flush()
+        self._close()
+
+    def _add(self, now: datetime, blob: str, count: int, ack: Callable[[bool], None] | None):
+        dest = bronze_partition_path(self.root, now)
+        self._pending.setdefault(dest, []).append(blob)
+        self._pending_lines[dest] = self._pending_lines.get(dest, 0) + count
+        if ack:
+            self._acks.setdefault(dest, []).append(ack)
+        self._partition_ts.setdefault(dest, now)
+        self._pending_count += count
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        partition_ts, self._partition_ts = self._partition_ts, {}
+        acks, self._acks = self._acks, {}
+        line_counts, self._pending_lines = self._pending_lines, {}
+        self._pending_count = 0
+        self._pending_since = None
+        for dest, blobs in pending.items():
+            try:
+                self._write(dest, ''.join(blobs), line_counts[dest], partition_ts[dest])
+                self.stats['written'] += line_counts[dest]
+                self.stats['flushes'] += 1
+            except Exception:  # noqa: BLE001
+                self.stats['errors'] += 1
+                self._notify(acks.get(dest), False)
+                continue
+            self._notify(acks.get(dest), True)
+            if self.on_flush and not self.segments:
+                try:
+                    self.on_flush(dest, partition_ts[dest])
+                except Exception:  # noqa: BLE001
+                    self.stats['errors'] += 1
+
+    def _notify(self, acks: list[Callable[[bool], None]] | None, ok: bool):
+        for ack in acks or ():
+            try:
+                ack(ok)
+            except Exception:  # noqa: BLE001
+                self.stats['errors'] += 1
+
+    def _write(self, dest: Path, blob: str, lines: int, now: datetime):
+        if self.segments:
+            self.segments.append(dest, now, blob.encode('utf-8'), lines, 'buffered')
+            return
+        if dest != self._current:
+            self._close()
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = dest.open('ab')
+            self._lock = FileLock(str(dest) + '.lock')
+            self._current = dest
+        data = blob.encode('utf-8')
+        started = time.perf_counter()
+        with self._lock:
+            locked = time.perf_counter()
+            self._fh.write(data)
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+        record_bronze_write('buffered', locked - started, time.perf_counter() - locked, len(data), lines)
+
+    def _close(self):
+        if self._fh:
+            self._fh.close()
+        self._fh = None
+        self._lock = None
+        self._current = None
+        if self.segments:
+            self.segments.seal_all()
+
+
+class ParquetBronzeWriter(BronzeWriter):
+    """BronzeWriter 와 같은 큐/배치 규칙으로 이벤트를 받되, 시간 파티션마다 행을 모아 zstd 압축 Parquet
+    세그먼트(``part-YYYYMMDD-HH-<host>-<pid>-<seq>.parquet``)로 기록합니다. 열은 bronze_schema 의 FIELDS 와 같습니다.
+
+    - 세그먼트는 ``segment_rows`` 행이 모이거나 ``segment_age`` 초가 지나거나 시간이 바뀌면 봉인합니다.
+    - Parquet 은 이어 쓸 수 없으므로 숨김 임시 파일에 다 쓴 뒤 rename 하며, 읽는 쪽은 완성된 파일만 봅니다.
+    - 기록 확인(ack)을 기다리는 이벤트가 있으면 나이와 관계없이 그 flush 에서 바로 봉인합니다. 이 봉인이 실패하면
+      그 flush 의 행은 버립니다 (실패로 알린 이벤트를 클라이언트가 다시 보내므로 남겨 두면 두 번 기록됩니다).
+    - ``on_flush`` 는 봉인된 세그먼트 경로로 호출됩니다 (MinIO 업로드 대상).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_rows: int = 50000,
+        segment_age: float = 60.0,
+        compression: str = 'zstd',
+        on_flush: Callable[[Path, datetime], None] | None = None,
+        **kwargs,
+    ):
+        # 선택 의존성: BRONZE_FORMAT=parquet 일 때만 필요
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(root, **kwargs)
+        self._pa = pa
+        self._pq = pq
+        self._schema = arrow_schema()
+        self.segment_rows = max(1, segment_rows)
+        self.segment_age = max(0.1, segment_age)
+        self.compression = compression
+        self.on_segment = on_flush
+        self._columns: dict[Path, dict[str, list]] = {}
+        self._segment_ts: dict[Path, datetime] = {}
+        self._segment_since: float | None = None
+        self.writer = writer_id()
+        self._seq = 0
+        # 이번 flush 에서 ack 를 기다리는 시간 파티션
+        self._ack_dests: set[Path] = set()
+        self.stats['segments'] = 0
+
+    def _flush(self):
+        self._ack_dests = set(self._acks)
+        super()._flush()
+
+    def _write(self, dest: Path, blob: str, lines: int, now: datetime):
+        # 줄 구분은 '\n' 만 씁니다 (JSON 문자열 안의 U+2028 등은 줄바꿈이 아닙니다).
+        # 전부 읽힌 뒤에만 열에 넣어, 실패로 알린(ack False) flush 의 행이 세그먼트에 남지 않게 합니다.
+        records = [json.loads(line) for line in blob.split('\n') if line.strip()]
+        # 시간이 넘어가면 이전 파티션의 세그먼트를 먼저 봉인합니다.
+        for other in [p for p in self._columns if p != dest]:
+            self._seal(other)
+        columns = self._columns.get(dest)
+        if columns is None:
+            columns = self._columns[dest] = {name: [] for name, _kind in FIELDS}
+            self._segment_ts[dest] = now
+            if self._segment_since is None:
+                self._segment_since = time.monotonic()
+        before = len(columns['type'])
+        for rec in records:
+            for name, kind in FIELDS:
+                value = rec.get(name)
+                if kind == 'json' and value is not None:
+                    value = json.dumps(value, ensure_ascii=False)
+                columns[name].append(value)
+        waiting = dest in self._ack_dests
+        try:
+            if waiting or len(columns['type']) >= self.segment_rows:
+                self._seal(dest)
+        except Exception:
+            if waiting:
+                # _seal 이 되돌려 둔 행 중 이번 flush 의 행(ack False 로 알릴 행)은 다음 봉인에 넣지 않습니다.
+                for values in columns.values():
+                    del values[before:]
+            raise
+
+    def _wait_timeout(self) -> float | None:
+        timeout = super()._wait_timeout()
+        if self._segment_since is None:
+            return timeout
+        left = max(0.0, self._segment_since + self.segment_age - time.monotonic())
+        return left if timeout is None else min(timeout, left)
+
+    def _tick(self):
+        if self._segment_since is not None and time.monotonic() - self._segment_since >= self.segment_age:
+            self._seal_all()
+
+    def _seal_all(self):
+        for dest in list(self._columns):
+            try:
+                self._seal(dest)
+            except Exception:  # noqa: BLE001
+                self.stats['errors'] += 1
+
+    def _seal(self, dest: Path):
+        columns = self._columns.pop(dest, None)
+        partition_ts = self._segment_ts.pop(dest, None)
+        if not self._columns:
+            self._segment_since = None
+        if not columns or not columns['type']:
+            return
+        rows = len(columns['type'])
+        while True:
+            # 봉인 시각이 같아도 이름이 겹치지 않게 순번을 쓰고, pid 가 재시작 뒤 다시 쓰인 경우 이미 있는 이름은 건너뜁니다.
+            self._seq += 1
+            path = dest.with_name(f'{dest.stem}-{self.writer}-{self._seq:06d}.parquet')
+            if not path.exists():
+                break
+        tmp = path.with_name(f'.{path.name}.tmp')
+        started = time.perf_counter()
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            table = self._pa.Table.from_pydict(columns, schema=self._schema)
+            self._pq.write_table(table, tmp, compression=self.compression)
+            if self.fsync:
+                with tmp.open('rb') as f:
+                    os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except Exception:
+            # 다음 봉인에서 다시 시도하도록 행을 되돌려 둡니다.
+            self._columns[dest] = columns
+            self._segment_ts[dest] = partition_ts
+            if self._segment_since is None:
+                self._segment_since = time.monotonic()
+            raise
+        nbytes = path.stat().st_size
+        record_bronze_write('parquet', 0.0, time.perf_counter() - started, nbytes, rows)
+        self.stats['segments'] += 1
+        if self.on_segment:
+            try:
+                self.on_segment(path, partition_ts)
+            except Exception:  # noqa: BLE001
+                self.stats['errors'] += 1
+
+    def _close(self):
+        self._seal_all()
+        super()._close()
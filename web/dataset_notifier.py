@@ -0,0 +1,79 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+class DatasetNotifier:
+    """브론즈에 새 데이터가 기록되면 Airflow REST API 로 Dataset 이벤트를 보내 logs_etl 을 깨웁니다.
+
+    - ``notify`` 는 플래그만 세우므로 writer 스레드에서 불러도 비용이 거의 없습니다.
+    - 백그라운드 스레드가 ``min_interval`` 초에 한 번만 ``POST /api/v1/datasets/events`` 를 보내므로
+      flush 가 아무리 잦아도 DAG 실행은 그 간격 이하로 몰리지 않습니다.
+    - 전송 실패는 세어 두기만 하고, 다음 notify 때 다시 보냅니다 (DAG 의 cron 스케줄이 안전망).
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        dataset_uri: str,
+        auth: tuple[str, str] | None = None,
+        min_interval: float = 300.0,
+        timeout: float = 5.0,
+    ):
+        self.api_url = api_url.rstrip('/')
+        self.dataset_uri = dataset_uri
+        self.auth = auth
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_sent = 0.0
+        self.stats = {'notified': 0, 'sent': 0, 'failures': 0}
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='dataset-notifier', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self, *_args):
+        self.stats['notified'] += 1
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait()
+            if self._stopping.is_set():
+                break
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0 and self._stopping.wait(wait):
+                break
+            self._wake.clear()
+            self._last_sent = time.monotonic()
+            try:
+                resp = requests.post(
+                    f'{self.api_url}/api/v1/datasets/events',
+                    json={
+                        'dataset_uri': self.dataset_uri,
+                        'extra': {'source': 'web', 'sent_at': datetime.now(timezone.utc).isoformat()},
+                    },
+                    auth=self.auth,
+                    timeout=self.timeout,
+                )
+                resp.raise_for_status()
+                self.stats['sent'] += 1
+            except requests.RequestException:
+                self.stats['failures'] += 1
+                self._wake.set()
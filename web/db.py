@@ -0,0 +1,36 @@
+import asyncio
+import os
+
+_pool = None
+# 첫 요청들이 동시에 풀을 만들지 않도록 (진 쪽 풀은 닫히지 않은 채 남습니다)
+_pool_lock = asyncio.Lock()
+
+
+def pg_dsn() -> str:
+    return os.getenv('PG_DSN') or (
+        f"postgresql://{os.getenv('POSTGRES_USER', 'analytics')}:{os.getenv('POSTGRES_PASSWORD', 'secret')}"
+        f"@{os.getenv('POSTGRES_HOST', 'postgres')}:{os.getenv('POSTGRES_PORT', '5432')}/{os.getenv('POSTGRES_DB', 'dwh')}"
+    )
+
+
+async def get_pool():
+    """web 전체가 공유하는 asyncpg 커넥션 풀을 처음 필요할 때 만듭니다."""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                import asyncpg
+
+                _pool = await asyncpg.create_pool(
+                    pg_dsn(),
+                    min_size=int(os.getenv('PG_POOL_MIN', '1')),
+                    max_size=int(os.getenv('PG_POOL_MAX', '10')),
+                )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import json
+from datetime import date, datetime, timedelta
+from typing import Any
+
+# 사용자별 최신순 이벤트. ORDER BY 가 ETL 이 만드는 (username, ts DESC, id DESC) 인덱스 순서와 같아
+# 파티션마다 인덱스를 앞에서부터 읽고 LIMIT 에서 멈춥니다 (spark/app/pg_loader.py EVENT_INDEXES).
+USER_EVENTS_SQL = """
+SELECT ts, id,
+       json_build_object('id', id, 'type', type, 'ts', ts, 'event_date', event_date, 'props', props)::text AS doc
+FROM {table}
+WHERE {where}
+ORDER BY ts DESC, id DESC
+LIMIT {limit}
+"""
+
+DAILY_STATS_SQL = """
+SELECT event_date, type, events, users
+FROM {schema}.daily_event_types
+WHERE event_date >= $1::date{type_filter}
+ORDER BY event_date, type
+"""
+
+TOP_CATEGORIES_SQL = """
+SELECT category, sum(events)::bigint AS events
+FROM {schema}.daily_category_events
+WHERE event_date >= $1::date{type_filter}
+GROUP BY category
+ORDER BY events DESC, category
+LIMIT {top}
+"""
+
+
+def encode_cursor(ts: datetime, event_id: str) -> str:
+    raw = json.dumps([ts.isoformat(), event_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """``encode_cursor`` 의 역. 형식이 맞지 않으면 ValueError 입니다."""
+    try:
+        ts_text, event_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        ts = datetime.fromisoformat(ts_text)
+    except (TypeError, ValueError) as exc:
+        raise ValueError('잘못된 cursor 입니다.') from exc
+    if ts.tzinfo is not None or not isinstance(event_id, str):
+        raise ValueError('잘못된 cursor 입니다.')
+    return ts, event_id
+
+
+def parse_props_filter(text: str) -> str:
+    """``props`` 쿼리 파라미터(JSON 객체)를 검증해 jsonb ``@>`` 에 넘길 텍스트로 돌려줍니다."""
+    try:
+        value = json.loads(text)
+    except ValueError as exc:
+        raise ValueError(f'props 는 JSON 객체여야 합니다: {exc}') from exc
+    if not isinstance(value, dict) or not value:
+        raise ValueError('props 는 비어 있지 않은 JSON 객체여야 합니다.')
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def user_events_query(
+    table: str,
+    username: str,
+    limit: int,
+    cursor: tuple[datetime, str] | None = None,
+    event_type: str | None = None,
+    props: str | None = None,
+    since: date | None = None,
+) -> tuple[str, list[Any]]:
+    """주어진 필터만 WHERE 에 넣은 SQL 과 인자. 조합마다 SQL 이 달라 asyncpg 가 조합별로 준비된 계획을 재사용합니다."""
+    args: list[Any] = [username]
+
+    def arg(value: Any) -> str:
+        args.append(value)
+        return f'${len(args)}'
+
+    clauses = ['username = $1']
+    if cursor:
+        ts, event_id = cursor
+        clauses.append(f'(ts, id) < ({arg(ts)}::timestamp, {arg(event_id)}::text)')
+        # ts 보다 늦은 날짜 파티션은 실행 시점에 제외됩니다 (event_date 는 ts 의 날짜).
+        clauses.append(f'event_date <= {arg(ts.date())}::date')
+    if since:
+        clauses.append(f'event_date >= {arg(since)}::date')
+    if event_type:
+        clauses.append(f'type = {arg(event_type)}')
+    if props:
+        clauses.append(f'props @> {arg(props)}::jsonb')
+    sql = USER_EVENTS_SQL.format(table=table, where=' AND '.join(clauses), limit=arg(limit + 1))
+    return sql, args
+
+
+async def user_events(pool, table: str, username: str, limit: int, **filters: Any) -> tuple[bytes, str | None]:
+    """(이벤트 JSON 배열 본문, 다음 페이지 cursor 또는 None). 행은 Postgres 가 JSON 으로 만든 텍스트를 그대로 잇습니다."""
+    sql, args = user_events_query(table, username, limit, **filters)
+    records = await pool.fetch(sql, *args)
+    page = records[:limit]
+    next_cursor = encode_cursor(page[-1]['ts'], page[-1]['id']) if len(records) > limit else None
+    return b'[' + b','.join(r['doc'].encode('utf-8') for r in page) + b']', next_cursor
+
+
+async def event_stats(pool, days: int, event_type: str | None = None, schema: str = 'mart', top: int = 10, today: date | None = None) -> dict[str, Any]:
+    """rollup 테이블(spark/app/pg_rollups.py)에서 최근 ``days`` 일 일자×종류별 이벤트 수와 상위 카테고리를 읽습니다."""
+    today = today or date.today()
+    since = today - timedelta(days=days - 1)
+    args: list[Any] = [since]
+    type_filter = ''
+    if event_type:
+        args.append(event_type)
+        type_filter = ' AND type = $2'
+    daily, categories = await asyncio.gather(
+        pool.fetch(DAILY_STATS_SQL.format(schema=schema, type_filter=type_filter), *args),
+        pool.fetch(TOP_CATEGORIES_SQL.format(schema=schema, type_filter=type_filter, top=int(top)), *args),
+    )
+    by_type: dict[str, int] = {}
+    by_day: dict[str, int] = {}
+    for r in daily:
+        day = r['event_date'].isoformat()
+        by_type[r['type']] = by_type.get(r['type'], 0) + r['events']
+        by_day[day] = by_day.get(day, 0) + r['events']
+    return {
+        'since': since.isoformat(),
+        'until': today.isoformat(),
+        'type': event_type,
+        'total': sum(by_type.values()),
+        'by_day': [{'event_date': day, 'events': events} for day, events in sorted(by_day.items())],
+        'by_type': dict(sorted(by_type.items(), key=lambda item: -item[1])),
+        # users 는 그 날의 고유 사용자 수라 날짜를 넘겨 합하지 않고 일자별로만 내려줍니다.
+        'daily': [
+            {'event_date': r['event_date'].isoformat(), 'type': r['type'], 'events': r['events'], 'users': r['users']}
+            for r in daily
+        ],
+        'top_categories': [{'category': r['category'], 'events': r['events']} for r in categories],
+    }
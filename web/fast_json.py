@@ -0,0 +1,117 @@
+"""이벤트 줄·API 응답의 JSON 직렬화와 이벤트 요청 디코딩.
+
+orjson / msgspec 이 설치되어 있으면 쓰고, 없으면 표준 json 으로 돌아갑니다. ``JSON_BACKEND`` 로
+auto(기본: msgspec > orjson > json) | msgspec | orjson | json 을 고를 수 있습니다.
+
+  - 브론즈 레코드는 msgspec 이 있으면 미리 정의한 Struct 를 Encoder 로 직렬화합니다 (dict 를 만들지 않음).
+  - ``/api/events``, ``/api/events/batch`` 항목은 msgspec 이 있으면 ``EventIn`` 으로 바로 변환·검증합니다.
+  - 빠른 라이브러리가 거부하는 값(NaN 리터럴, orjson 이 쓰지 못하는 64비트 초과 정수 등)은 표준 json 으로 다시
+    처리하므로 받아들이는 입력은 백엔드와 상관없이 같습니다. 단 orjson 은 64비트를 넘는 정수를 오류 없이 float 으로
+    읽으므로, 그런 값을 그대로 보존해야 하면 msgspec(auto 의 첫 번째)이나 json 을 씁니다.
+"""
+import json
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from bronze_schema import SCHEMA_VERSION, build_record
+
+try:
+    import orjson
+except ImportError:  # orjson 은 선택 의존성입니다.
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec 은 선택 의존성입니다.
+    msgspec = None
+
+BACKENDS = tuple(name for name, module in (('msgspec', msgspec), ('orjson', orjson), ('json', json)) if module is not None)
+_FALLBACK_ERRORS = (TypeError, ValueError, OverflowError)
+
+if msgspec is not None:
+
+    class BronzeRecord(msgspec.Struct, rename={'server': '_server'}, omit_defaults=True):
+        """``bronze_schema.build_record`` 와 같은 키·순서의 브론즈 레코드 (seq 는 있을 때만 씁니다)."""
+
+        schema_version: int
+        type: str
+        ts: str
+        user_id: str
+        props: Any
+        server: Any
+        seq: int | None = None
+
+    class EventIn(msgspec.Struct):
+        """``CustomEventRequest`` 와 같은 필드·규칙 (알 수 없는 키는 무시)."""
+
+        event_type: str
+        metadata: dict[str, Any] | None = None
+        username: str | None = None
+
+
+def _std_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class Codec:
+    def __init__(self, backend: str = 'auto'):
+        backend = BACKENDS[0] if backend == 'auto' else backend
+        if backend not in BACKENDS:
+            raise ValueError(f'JSON_BACKEND={backend} 를 쓸 수 없습니다 (사용 가능: {", ".join(BACKENDS)})')
+        self.backend = backend
+        if backend == 'orjson':
+            self._dumps, self._loads = orjson.dumps, orjson.loads
+        elif backend == 'msgspec':
+            self._dumps, self._loads = msgspec.json.Encoder().encode, msgspec.json.Decoder().decode
+        else:
+            self._dumps, self._loads = _std_dumps, json.loads
+        # 레코드 Struct 와 요청 변환은 백엔드가 json 으로 고정되지 않은 한 msgspec 이 있으면 씁니다.
+        use_msgspec = msgspec is not None and backend != 'json'
+        self._record_encoder = msgspec.json.Encoder() if use_msgspec else None
+        self.typed_events = use_msgspec
+
+    def dumps(self, obj: Any) -> bytes:
+        """compact UTF-8 JSON (``ensure_ascii=False``, 구분자 공백 없음)."""
+        try:
+            return self._dumps(obj)
+        except _FALLBACK_ERRORS:
+            return _std_dumps(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        """JSON 이 아니면 json.JSONDecodeError (ValueError) 입니다."""
+        try:
+            return self._loads(data)
+        except _FALLBACK_ERRORS:
+            return json.loads(data)
+
+    def event_line(
+        self, event_type: str, username: str, props: dict[str, Any], ts: str, server: dict[str, Any], seq: int | None = None
+    ) -> str:
+        if self._record_encoder is not None:
+            try:
+                record = BronzeRecord(SCHEMA_VERSION, event_type, ts, username, props, server, seq)
+                return self._record_encoder.encode(record).decode('utf-8')
+            except _FALLBACK_ERRORS:
+                pass
+        return self.dumps(build_record(event_type, username, props, ts, server, seq)).decode('utf-8')
+
+    def convert_event(self, item: dict[str, Any]) -> 'EventIn':
+        """``typed_events`` 일 때만 씁니다. 검증에 실패하면 ValueError (msgspec.ValidationError) 입니다."""
+        return msgspec.convert(item, EventIn)
+
+    def status(self) -> dict[str, Any]:
+        return {'backend': self.backend, 'record_struct': self._record_encoder is not None, 'typed_events': self.typed_events}
+
+
+codec = Codec(os.getenv('JSON_BACKEND', 'auto').lower())
+dumps = codec.dumps
+loads = codec.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """API 라우터의 기본 응답 클래스. JSONResponse 와 같은 compact UTF-8 본문을 ``codec`` 으로 만듭니다."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
@@ -0,0 +1,95 @@
+import math
+from typing import Any, Iterable
+
+
+class LatencyHistogram:
+    """HdrHistogram 과 같은 로그-선형 버킷으로 지연 시간(마이크로초)을 세는 고정 크기 히스토그램입니다.
+
+    값의 크기와 관계없이 상대 오차가 ``10 ** -significant_digits`` 이내이고, 기록 개수가 늘어도
+    메모리는 ``highest_us`` 와 유효 자릿수로 정해지는 버킷 배열 크기를 넘지 않습니다.
+    """
+
+    def __init__(self, highest_us: int = 60_000_000, significant_digits: int = 2):
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+        self._sub_bits = math.ceil(math.log2(2 * 10**significant_digits))
+        self._half = 1 << (self._sub_bits - 1)
+        self.counts = [0] * (self._index(highest_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    def _index(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self._sub_bits)
+        return shift * self._half + (value >> shift)
+
+    def _upper(self, index: int) -> int:
+        if index < 2 * self._half:
+            return index
+        shift = index // self._half - 1
+        sub = index - shift * self._half
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_us: int):
+        value_us = min(max(0, int(value_us)), self.highest_us)
+        self.counts[self._index(value_us)] += 1
+        self.total += 1
+        self.sum_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, pct: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper(index), self.max_us)
+        return self.max_us
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def to_dict(self) -> dict[str, Any]:
+        """프로세스 간 전달/JSON 내보내기용. 비어 있지 않은 버킷만 [버킷 상한(us), 개수] 로 담습니다."""
+        return {
+            'significant_digits': self.significant_digits,
+            'highest_us': self.highest_us,
+            'total': self.total,
+            'sum_us': self.sum_us,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'buckets': [[self._upper(index), count] for index, count in enumerate(self.counts) if count],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'LatencyHistogram':
+        hist = cls(data['highest_us'], data['significant_digits'])
+        for upper, count in data['buckets']:
+            hist.counts[hist._index(upper)] += count
+        hist.total = data['total']
+        hist.sum_us = data['sum_us']
+        hist.min_us = data['min_us']
+        hist.max_us = data['max_us']
+        return hist
+
+    def summary_ms(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> dict[str, Any]:
+        out: dict[str, Any] = {'count': self.total}
+        for pct in percentiles:
+            out[f'p{pct:g}'] = round(self.percentile(pct) / 1000, 3)
+        out['max'] = round(self.max_us / 1000, 3)
+        out['min'] = round((self.min_us or 0) / 1000, 3)
+        out['mean'] = round(self.sum_us / self.total / 1000, 3) if self.total else 0.0
+        return out
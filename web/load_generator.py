@@ -0,0 +1,365 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import aiohttp
+
+from latency_histogram import LatencyHistogram
+
+TRAFFIC_ACTIONS = ['login', 'view_home', 'search', 'view_product', 'cart', 'checkout', 'logout']
+TRAFFIC_PATHS = ['/', '/feed', '/product/1', '/product/2', '/cart', '/checkout']
+TRAFFIC_UA = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)',
+    'Mozilla/5.0 (Linux; x86_64)',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X)',
+    'Mozilla/5.0 (Android 14; Mobile)',
+]
+PROFILES = ('count', 'constant', 'ramp')
+KST = timezone(timedelta(hours=9))
+PROGRESS_INTERVAL_SEC = 0.5
+# 초당 처리량은 최근 TIMELINE_MAX_SEC 초만 보관하고, /api/traffic/status 에는 최근 STATUS_TIMELINE_SEC 초만 싣습니다.
+TIMELINE_MAX_SEC = 3600
+STATUS_TIMELINE_SEC = 60
+
+
+def planned_requests(spec: dict[str, Any]) -> int | None:
+    """프로파일이 끝날 때까지 보낼 요청 수 (open-loop 에서 개수 제한이 없으면 rps × duration)."""
+    if spec['profile'] == 'count':
+        return spec['total_requests']
+    duration = spec['duration_sec']
+    if spec['profile'] == 'ramp':
+        expected = (spec['start_rps'] + spec['rps']) / 2 * duration
+    else:
+        expected = spec['rps'] * duration
+    expected = int(expected)
+    return min(expected, spec['total_requests']) if spec.get('total_requests') else expected
+
+
+def _issued_by(spec: dict[str, Any], elapsed: float) -> float:
+    """open-loop 스케줄에서 ``elapsed`` 초까지 보냈어야 하는 누적 요청 수."""
+    elapsed = min(elapsed, spec['duration_sec'])
+    if spec['profile'] == 'ramp':
+        r0, r1, duration = spec['start_rps'], spec['rps'], spec['duration_sec']
+        return r0 * elapsed + (r1 - r0) * elapsed * elapsed / (2 * duration)
+    return spec['rps'] * elapsed
+
+
+def _share(spec: dict[str, Any], worker: int, workers: int) -> dict[str, Any]:
+    """프로세스별로 속도·동시성·요청 수를 나눈 spec."""
+    part = dict(spec)
+    for key in ('rps', 'start_rps'):
+        part[key] = spec[key] / workers
+    part['concurrency'] = max(1, spec['concurrency'] // workers + (worker < spec['concurrency'] % workers))
+    if spec.get('total_requests'):
+        part['total_requests'] = spec['total_requests'] // workers + (worker < spec['total_requests'] % workers)
+    part['seed'] = worker
+    return part
+
+
+def _error_category(exc: BaseException) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return 'timeout'
+    if isinstance(exc, aiohttp.ClientConnectorError):
+        return 'connect'
+    if isinstance(exc, (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError)):
+        return 'disconnect'
+    if isinstance(exc, aiohttp.ClientError):
+        return 'client'
+    return 'other'
+
+
+class _Counters:
+    """워커 하나의 집계. 요청 수와 무관하게 크기가 고정된 히스토그램/카운터만 들고 있습니다."""
+
+    def __init__(self):
+        self.sent = 0
+        self.success = 0
+        self.failed = 0
+        self.dropped = 0
+        self.status_counts: dict[str, int] = {}
+        # 오류 분류별 {'count', 'sample'} (sample 은 처음 본 메시지 하나)
+        self.errors: dict[str, dict[str, Any]] = {}
+        self.latency = LatencyHistogram()
+        # epoch 초 → [성공, 실패]
+        self.timeline: dict[int, list[int]] = {}
+
+    def record(self, status: int | None, latency_us: int | None, error: tuple[str, str] | None = None):
+        key = str(status) if status is not None else 'error'
+        self.status_counts[key] = self.status_counts.get(key, 0) + 1
+        if latency_us is not None:
+            self.latency.record(latency_us)
+        second = int(time.time())
+        slot = self.timeline.get(second)
+        if slot is None:
+            slot = self.timeline[second] = [0, 0]
+            if len(self.timeline) > TIMELINE_MAX_SEC:
+                del self.timeline[next(iter(self.timeline))]
+        if error is None:
+            self.success += 1
+            slot[0] += 1
+            return
+        self.failed += 1
+        slot[1] += 1
+        category, message = error
+        bucket = self.errors.setdefault(category, {'count': 0, 'sample': message})
+        bucket['count'] += 1
+
+    def snapshot(self, done: bool = False) -> dict[str, Any]:
+        return {
+            'sent': self.sent,
+            'success': self.success,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'status_counts': dict(self.status_counts),
+            'errors': {category: dict(bucket) for category, bucket in self.errors.items()},
+            'latency': self.latency.to_dict(),
+            'timeline': {second: list(slot) for second, slot in self.timeline.items()},
+            'done': done,
+        }
+
+
+class _Worker:
+    """한 프로세스 안에서 keep-alive 커넥션 풀 하나로 부하를 만드는 asyncio 워커입니다."""
+
+    def __init__(self, spec: dict[str, Any], report: Callable[[dict[str, Any]], None], stop: Callable[[], bool]):
+        self.spec = spec
+        self.report = report
+        self.stop = stop
+        self.counters = _Counters()
+        self.rng = random.Random(spec.get('seed'))
+        self.method = spec['method'].upper()
+
+    async def run(self):
+        connector = aiohttp.TCPConnector(limit=self.spec['concurrency'])
+        timeout = aiohttp.ClientTimeout(total=self.spec['timeout_seconds'])
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self.session = session
+            reporter = asyncio.create_task(self._report_loop())
+            try:
+                if self.spec['profile'] == 'count':
+                    await self._closed_loop()
+                else:
+                    await self._open_loop()
+            finally:
+                reporter.cancel()
+        self.report(self.counters.snapshot(done=True))
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL_SEC)
+            self.report(self.counters.snapshot())
+
+    async def _closed_loop(self):
+        # 정해진 개수를 concurrency 개의 커넥션이 쉬지 않고 나눠 보냅니다.
+        total = self.spec['total_requests']
+
+        async def _lane():
+            while self.counters.sent < total and not self.stop():
+                self.counters.sent += 1
+                await self._fire(self.counters.sent)
+
+        await asyncio.gather(*(_lane() for _ in range(min(self.spec['concurrency'], total))))
+
+    async def _open_loop(self):
+        # 응답 속도와 무관하게 스케줄대로 보냅니다. 동시 요청이 concurrency 에 차 있으면 보내지 않고 dropped 로 셉니다.
+        limit = self.spec.get('total_requests') or math.inf
+        duration = self.spec['duration_sec']
+        inflight: set[asyncio.Task] = set()
+        issued = 0
+        start = time.perf_counter()
+        while not self.stop():
+            elapsed = time.perf_counter() - start
+            due = min(int(_issued_by(self.spec, elapsed)), limit)
+            while issued < due:
+                issued += 1
+                if len(inflight) >= self.spec['concurrency']:
+                    self.counters.dropped += 1
+                    continue
+                self.counters.sent += 1
+                task = asyncio.create_task(self._fire(issued))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+            if elapsed >= duration or issued >= limit:
+                break
+            await asyncio.sleep(0.001)
+        if inflight:
+            await asyncio.wait(inflight, timeout=self.spec['timeout_seconds'] + 1)
+
+    async def _fire(self, idx: int):
+        rng = self.rng
+        user_id = f'user-{rng.randrange(self.spec["user_pool"]):05d}'
+        payload = {
+            'event_type': rng.choice(TRAFFIC_ACTIONS),
+            'metadata': {
+                'path': rng.choice(TRAFFIC_PATHS),
+                'ts': datetime.now(KST).isoformat(),
+            },
+            'username': user_id,
+        }
+        headers = {
+            'X-User-Id': user_id,
+            'User-Agent': rng.choice(TRAFFIC_UA),
+            'X-Load-Test': 'traffic_button',
+        }
+        if self.method == 'GET':
+            request = self.session.get(
+                self.spec['target'],
+                params={**payload, 'metadata': json.dumps(payload['metadata'])},
+                headers=headers,
+            )
+        else:
+            headers['Content-Type'] = 'application/json'
+            request = self.session.post(self.spec['target'], data=json.dumps(payload), headers=headers)
+        start = time.perf_counter()
+        try:
+            async with request as resp:
+                await resp.read()
+                status = resp.status
+        except Exception as exc:  # noqa: BLE001
+            self.counters.record(None, None, (_error_category(exc), f'{type(exc).__name__}: {exc}'))
+            return
+        latency_us = int((time.perf_counter() - start) * 1_000_000)
+        if status >= 400:
+            self.counters.record(status, latency_us, (f'http_{status // 100}xx', f'HTTP {status}'))
+        else:
+            self.counters.record(status, latency_us)
+
+
+def _process_main(spec: dict[str, Any], progress: multiprocessing.Queue, stop_event):
+    def _report(snapshot: dict[str, Any]):
+        progress.put((spec['seed'], snapshot))
+
+    asyncio.run(_Worker(spec, _report, stop_event.is_set).run())
+
+
+def _merge(snapshots: dict[int, dict[str, Any]]) -> dict[str, Any]:
+    merged = _Counters().snapshot()
+    latency = LatencyHistogram.from_dict(merged['latency'])
+    for snap in snapshots.values():
+        for key in ('sent', 'success', 'failed', 'dropped'):
+            merged[key] += snap[key]
+        for status, count in snap['status_counts'].items():
+            merged['status_counts'][status] = merged['status_counts'].get(status, 0) + count
+        for category, bucket in snap['errors'].items():
+            merged['errors'].setdefault(category, {'count': 0, 'sample': bucket['sample']})['count'] += bucket['count']
+        for second, (ok, failed) in snap['timeline'].items():
+            slot = merged['timeline'].setdefault(second, [0, 0])
+            slot[0] += ok
+            slot[1] += failed
+        latency.merge(LatencyHistogram.from_dict(snap['latency']))
+    merged['latency'] = latency.to_dict()
+    merged['done'] = all(snap['done'] for snap in snapshots.values())
+    return merged
+
+
+def build_report(snapshot: dict[str, Any], elapsed: float, timeline_tail: int | None = None) -> dict[str, Any]:
+    """워커 집계를 사람이 읽는 요약으로 바꿉니다. ``timeline_tail`` 이 없으면 초당 처리량 전체와 히스토그램 버킷까지 담습니다."""
+    timeline = sorted(snapshot['timeline'].items())
+    first = timeline[0][0] if timeline else 0
+    throughput = [{'second': second - first, 'ok': ok, 'failed': failed} for second, (ok, failed) in timeline]
+    report = {
+        'sent': snapshot['sent'],
+        'success': snapshot['success'],
+        'failed': snapshot['failed'],
+        'dropped': snapshot['dropped'],
+        'done': snapshot['done'],
+        'elapsed_sec': round(elapsed, 2),
+        'approx_rps': round(snapshot['success'] / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': LatencyHistogram.from_dict(snapshot['latency']).summary_ms(),
+        'status_counts': snapshot['status_counts'],
+        'errors': snapshot['errors'],
+        'throughput': throughput[-timeline_tail:] if timeline_tail else throughput,
+    }
+    if timeline_tail is None:
+        report['latency_histogram'] = snapshot['latency']
+    return report
+
+
+class LoadRun:
+    """트래픽 스파이크 한 번의 실행. ``run`` 은 블로킹이며 진행 상황을 ``on_progress`` 로 계속 알려줍니다.
+
+    ``spec['processes']`` 가 2 이상이면 spawn 한 프로세스마다 asyncio 워커를 띄우고 속도/요청 수를 나눠 맡깁니다.
+    """
+
+    def __init__(self, spec: dict[str, Any], on_progress: Callable[[dict[str, Any]], None]):
+        self.spec = spec
+        self.on_progress = on_progress
+        self._stop = threading.Event()
+        self._mp_stop = None
+        self._latest = _Counters().snapshot()
+        self._started: float | None = None
+        self._finished: float | None = None
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self):
+        self._stop.set()
+        if self._mp_stop is not None:
+            self._mp_stop.set()
+
+    def run(self) -> dict[str, Any]:
+        """끝까지 실행하고 전체 리포트(``report(full=True)``)를 돌려줍니다."""
+        self._started = time.perf_counter()
+        workers = max(1, self.spec.get('processes', 1))
+        if workers == 1:
+            self._run_inline()
+        else:
+            self._run_processes(workers)
+        self._finished = time.perf_counter()
+        return self.report(full=True)
+
+    def report(self, full: bool = False) -> dict[str, Any]:
+        if self._started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished or time.perf_counter()) - self._started
+        return build_report(self._latest, elapsed, None if full else STATUS_TIMELINE_SEC)
+
+    def _progress(self, snapshot: dict[str, Any]):
+        self._latest = snapshot
+        self.on_progress(self.report())
+
+    def _run_inline(self):
+        asyncio.run(_Worker(dict(self.spec, seed=0), self._progress, self._stop.is_set).run())
+
+    def _run_processes(self, workers: int):
+        ctx = multiprocessing.get_context('spawn')
+        progress = ctx.Queue()
+        self._mp_stop = ctx.Event()
+        if self._stop.is_set():
+            self._mp_stop.set()
+        procs = [
+            ctx.Process(target=_process_main, args=(_share(self.spec, idx, workers), progress, self._mp_stop), daemon=True)
+            for idx in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        snapshots: dict[int, dict[str, Any]] = {idx: _Counters().snapshot() for idx in range(workers)}
+        finished: set[int] = set()
+        while len(finished) < workers:
+            try:
+                idx, snapshot = progress.get(timeout=PROGRESS_INTERVAL_SEC)
+            except queue.Empty:
+                # 결과를 보내지 못하고 죽은 프로세스는 끝난 것으로 봅니다.
+                for idx, proc in enumerate(procs):
+                    if not proc.is_alive() and idx not in finished and progress.empty():
+                        snapshots[idx]['done'] = True
+                        finished.add(idx)
+                continue
+            snapshots[idx] = snapshot
+            if snapshot['done']:
+                finished.add(idx)
+            self._progress(_merge(snapshots))
+        for proc in procs:
+            proc.join(timeout=5)
+        self._latest = _merge(snapshots)
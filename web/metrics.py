@@ -0,0 +1,225 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+# 요청 처리 시간(초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 파일 잠금 대기/쓰기처럼 짧은 구간(초)
+FAST_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+Sample = tuple[str, dict[str, str], float]
+
+# max_series 를 넘은 라벨 조합이 모이는 라벨 값
+OVERFLOW_LABEL = '__overflow__'
+
+
+class _Metric:
+    """값을 스레드별 dict(shard)에 모아 두는 지표의 공통 부분입니다.
+
+    기록하는 쪽은 자기 스레드의 shard 만 건드리므로 잠금이 필요 없고, ``/metrics`` 를 긁을 때만
+    모든 shard 를 합칩니다. ``max_series`` 를 주면 shard 마다 그 수를 넘는 새 라벨 조합은 모든 라벨 값이
+    ``OVERFLOW_LABEL`` 인 시리즈 하나로 합칩니다. 이미 있는 시리즈를 지우면 카운터가 0 으로 돌아간 것처럼
+    보여(Prometheus 의 reset) ``rate()`` 가 틀어지므로 버리지 않습니다.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), max_series: int | None = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._local = threading.local()
+        self._shards: list[dict[tuple, Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict[tuple, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict[tuple, Any] = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _series_key(self, shard: dict[tuple, Any], labels: tuple) -> tuple:
+        if self.max_series is not None and len(shard) >= self.max_series:
+            return (OVERFLOW_LABEL,) * len(self.labelnames)
+        return labels
+
+    def _label_dict(self, labels: tuple) -> dict[str, str]:
+        return dict(zip(self.labelnames, labels))
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels: tuple = (), amount: float = 1.0):
+        shard = self._shard()
+        value = shard.get(labels)
+        if value is None:
+            labels = self._series_key(shard, labels)
+            value = shard.get(labels, 0.0)
+        shard[labels] = value + amount
+
+    def samples(self) -> list[Sample]:
+        totals: dict[tuple, float] = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        if not totals and not self.labelnames:
+            totals[()] = 0.0
+        return [(self.name, self._label_dict(labels), value) for labels, value in totals.items()]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()):
+        shard = self._shard()
+        slot = shard.get(labels)
+        if slot is None:
+            # [버킷별 개수..., +Inf 개수, 합계]
+            slot = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        slot[bisect.bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def samples(self) -> list[Sample]:
+        totals: dict[tuple, list] = {}
+        for shard in list(self._shards):
+            for labels, slot in list(shard.items()):
+                slot = list(slot)
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = slot
+                else:
+                    for idx, value in enumerate(slot):
+                        total[idx] += value
+        out: list[Sample] = []
+        for labels, slot in totals.items():
+            base = self._label_dict(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), slot):
+                cumulative += count
+                out.append((f'{self.name}_bucket', {**base, 'le': _format_value(bound)}, cumulative))
+            out.append((f'{self.name}_sum', base, slot[-1]))
+            out.append((f'{self.name}_count', base, cumulative))
+        return out
+
+
+class Gauge(_Metric):
+    """긁을 때마다 ``collect`` 콜백이 돌려준 (라벨 값 튜플, 값) 목록을 그대로 내보냅니다."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), collect: Callable[[], Iterable[tuple[tuple, float]]] | None = None):
+        super().__init__(name, help_text, labelnames)
+        self.collect = collect
+
+    def samples(self) -> list[Sample]:
+        if self.collect is None:
+            return []
+        return [(self.name, self._label_dict(labels), value) for labels, value in self.collect()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # 모듈을 다시 import 해도 같은 이름이면 기존 지표를 그대로 씁니다.
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = (), max_series: int | None = None) -> Counter:
+        return self._register(Counter(name, help_text, labelnames, max_series))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = (), collect: Callable | None = None) -> Gauge:
+        gauge = self._register(Gauge(name, help_text, labelnames, collect))
+        if collect is not None:
+            gauge.collect = collect
+        return gauge
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 모든 지표를 직렬화합니다."""
+        lines: list[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception:  # noqa: BLE001
+                continue  # 수집 콜백 하나가 실패해도 나머지 지표는 내보냅니다.
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+histogram = REGISTRY.histogram
+gauge = REGISTRY.gauge
+render = REGISTRY.render
+
+
+HTTP_REQUESTS = counter('growit_http_requests_total', 'API 라우트별 요청 수', ('method', 'route', 'status'))
+HTTP_LATENCY = histogram('growit_http_request_duration_seconds', 'API 라우트별 처리 시간', ('method', 'route'))
+
+
+class RouteMetricsMiddleware:
+    """라우트 템플릿(`/api/users/{username}` 등) 단위로 요청 수와 처리 시간을 기록하는 순수 ASGI 미들웨어입니다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def _send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            HTTP_REQUESTS.inc((scope['method'], path, str(status)))
+            HTTP_LATENCY.observe(time.perf_counter() - started, (scope['method'], path))
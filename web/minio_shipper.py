@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import metrics
+from bronze_writer import is_sealed_segment
+
+S3_UPLOAD_TIME = metrics.histogram('growit_s3_upload_seconds', 'MinIO(S3) 세그먼트 업로드(put_object) 소요 시간')
+S3_UPLOAD_BYTES = metrics.counter('growit_s3_upload_bytes_total', 'MinIO(S3)에 올린 세그먼트 바이트')
+S3_UPLOAD_FAILURES = metrics.counter('growit_s3_upload_failures_total', 'MinIO(S3) 세그먼트 업로드 실패 횟수')
+
+
+class MinioShipper:
+    """로컬 브론즈 파일에 새로 추가된 구간만 잘라서 불변 세그먼트 객체로 MinIO(S3)에 올립니다.
+
+    - 파일별로 업로드한 바이트 오프셋과 세그먼트 번호를 ``manifest_path`` 에 기록해 재시작 후 이어서 보냅니다.
+      manifest 는 업로드마다가 아니라 전송 패스(``ship_once``)가 끝날 때 한 번만 다시 씁니다. 그 사이에 죽으면
+      마지막 패스의 세그먼트를 같은 키로 다시 올리게 되지만, 같은 오프셋에서 자르므로 덮어쓸 뿐입니다.
+    - ``writer`` (``writer_id()``)를 주면 manifest 를 ``<manifest>-<writer>.json`` 으로 따로 두어 워커끼리 서로의
+      manifest 를 덮어쓰지 않습니다. 살아 있는 shipper 는 패스마다 자기 manifest 의 mtime 을 갱신하고, 오래 갱신되지 않은
+      다른 writer 의 manifest(종료된 워커, 예전 공용 manifest)는 rename 으로 한 프로세스만 가져가 이어서 보냅니다.
+    - 미전송 구간이 ``max_segment_bytes`` 를 넘거나 ``max_segment_age`` 초가 지나거나, 시간 파티션이 끝나면 봉인합니다.
+    - 업로드는 백그라운드 스레드에서 하나의 S3 클라이언트로 수행하고, 실패 시 지수 백오프로 재시도합니다.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        bucket: str,
+        client_factory: Callable[[], Any],
+        manifest_path: Path,
+        key_prefix: str = 'bronze/app',
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_segment_age: float = 60.0,
+        poll_interval: float = 1.0,
+        max_backoff: float = 60.0,
+        retention_days: int = 7,
+        writer: str | None = None,
+    ):
+        self.root = root
+        self.bucket = bucket
+        self.client_factory = client_factory
+        self.writer = writer
+        self.base_manifest_path = manifest_path
+        self.manifest_path = manifest_path.with_name(f'{manifest_path.stem}-{writer}{manifest_path.suffix}') if writer else manifest_path
+        self.key_prefix = key_prefix.strip('/')
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.retention_days = retention_days
+        self._client = None
+        self._manifest: dict[str, dict[str, Any]] = self._read_manifest(self.manifest_path)
+        # 패스마다 mtime 을 갱신하므로 이보다 오래 멈춘 manifest 의 주인은 종료된 것으로 봅니다.
+        self._stale_after = 2 * (poll_interval + max_backoff + max_segment_age)
+        self._adopted_at = 0.0
+        self._pending_since: dict[str, float] = {}
+        self._dirty = False
+        self._mutex = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._backoff = 0.0
+        self.stats = {'segments': 0, 'bytes_uploaded': 0, 'failures': 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='minio-shipper', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def notify(self, dest: Path, now: datetime | None = None):
+        rel = str(dest.relative_to(self.root))
+        with self._mutex:
+            if rel not in self._manifest:
+                self._manifest[rel] = {'offset': 0, 'seq': 0, 'sealed': False}
+                self._dirty = True
+            self._pending_since.setdefault(rel, time.monotonic())
+
+    def ship_once(self, force: bool = False) -> int:
+        """봉인 조건을 만족한 세그먼트를 모두 올리고, 올린 세그먼트 수를 반환합니다."""
+        shipped = 0
+        adopted = self._adopt_orphans()
+        with self._mutex:
+            paths = [rel for rel, entry in self._manifest.items() if not entry.get('sealed')]
+        try:
+            for rel in paths:
+                while True:
+                    ok = self._ship_path(rel, force)
+                    if not ok:
+                        break
+                    shipped += 1
+        finally:
+            # 업로드가 중간에 실패해도 그때까지 올린 오프셋은 남깁니다.
+            with self._mutex:
+                if self._dirty:
+                    self._prune()
+                    self._save_manifest()
+                    self._dirty = False
+                elif self.writer:
+                    self._touch_manifest()
+            # 가져온 항목이 자기 manifest 에 저장된 뒤에 원본을 지웁니다.
+            for claimed in adopted:
+                claimed.unlink(missing_ok=True)
+        return shipped
+
+    def _adopt_orphans(self) -> list[Path]:
+        """오래 갱신되지 않은 다른 writer 의 manifest 항목을 가져오고, 가져온(rename 한) 파일 목록을 반환합니다."""
+        now = time.monotonic()
+        if not self.writer or (self._adopted_at and now - self._adopted_at < self.max_segment_age):
+            return []
+        self._adopted_at = now
+        base = self.base_manifest_path
+        candidates = [base, *base.parent.glob(f'{base.stem}-*{base.suffix}')] if base.parent.is_dir() else []
+        claimed = []
+        for path in candidates:
+            if path == self.manifest_path:
+                continue
+            try:
+                if time.time() - path.stat().st_mtime < self._stale_after:
+                    continue
+                # rename 은 한 프로세스만 성공하므로 같은 manifest 를 두 워커가 이어 보내지 않습니다.
+                target = path.with_name(f'.{path.name}.{self.writer}')
+                os.replace(path, target)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                self.stats['failures'] += 1
+                continue
+            entries = self._read_manifest(target)
+            with self._mutex:
+                for rel, entry in entries.items():
+                    self._manifest.setdefault(rel, entry)
+                self._dirty = True
+            claimed.append(target)
+        return claimed
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_interval + self._backoff)
+            self._wake.clear()
+            try:
+                self.ship_once()
+                self._backoff = 0.0
+            except Exception:  # noqa: BLE001
+                self.stats['failures'] += 1
+                self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+        # 종료 시 남은 구간은 크기/시간과 관계없이 봉인해서 올립니다.
+        try:
+            self.ship_once(force=True)
+        except Exception:  # noqa: BLE001
+            self.stats['failures'] += 1
+
+    def _ship_path(self, rel: str, force: bool) -> bool:
+        path = self.root / rel
+        with self._mutex:
+            entry = dict(self._manifest[rel])
+        if not path.exists():
+            with self._mutex:
+                self._manifest[rel]['sealed'] = True
+                self._dirty = True
+            return False
+        size = path.stat().st_size
+        unshipped = size - entry['offset']
+        finished = self._partition_finished(rel)
+        if unshipped <= 0:
+            if finished:
+                with self._mutex:
+                    self._manifest[rel]['sealed'] = True
+                    self._pending_since.pop(rel, None)
+                    self._dirty = True
+            return False
+
+        since = self._pending_since.setdefault(rel, time.monotonic())
+        aged = time.monotonic() - since >= self.max_segment_age
+        sealed = is_sealed_segment(path)
+        if not (force or finished or aged or unshipped >= self.max_segment_bytes or sealed):
+            return False
+
+        if sealed:
+            # Parquet/JSONL 세그먼트는 완성된 뒤에만 나타나는 불변 파일이므로 통째로 한 객체로 올립니다.
+            chunk = path.read_bytes()
+            content_type = 'application/vnd.apache.parquet' if path.suffix == '.parquet' else 'application/x-ndjson'
+        else:
+            with path.open('rb') as f:
+                f.seek(entry['offset'])
+                chunk = f.read(min(unshipped, self.max_segment_bytes))
+            # 줄 중간에서 자르지 않도록 마지막 개행까지만 보냅니다.
+            cut = chunk.rfind(b'\n')
+            if cut < 0:
+                return False
+            chunk = chunk[: cut + 1]
+            content_type = 'application/x-ndjson'
+
+        seq = entry['seq'] + 1
+        key = self._segment_key(rel, seq)
+        started = time.perf_counter()
+        try:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=chunk, ContentType=content_type)
+        except Exception:
+            S3_UPLOAD_FAILURES.inc()
+            raise
+        S3_UPLOAD_TIME.observe(time.perf_counter() - started)
+        S3_UPLOAD_BYTES.inc(amount=len(chunk))
+
+        with self._mutex:
+            current = self._manifest[rel]
+            current['offset'] = entry['offset'] + len(chunk)
+            current['seq'] = seq
+            if current['offset'] >= size:
+                self._pending_since.pop(rel, None)
+                if sealed:
+                    current['sealed'] = True
+            self._dirty = True
+        self.stats['segments'] += 1
+        self.stats['bytes_uploaded'] += len(chunk)
+        return True
+
+    def _segment_key(self, rel: str, seq: int) -> str:
+        rel_path = Path(rel)
+        return f'{self.key_prefix}/{rel_path.parent.as_posix()}/{rel_path.stem}-{seq:05d}{rel_path.suffix}'
+
+    def _partition_finished(self, rel: str) -> bool:
+        # part-YYYYMMDD-HH.jsonl → 해당 시간이 지났으면 더 이상 기록되지 않습니다.
+        stem = Path(rel).stem
+        try:
+            hour = datetime.strptime(stem.split('-', 1)[1][:11], '%Y%m%d-%H').replace(tzinfo=timezone.utc)
+        except (IndexError, ValueError):
+            return False
+        # 늦게 도착한 flush를 고려해 한 번의 폴링 주기만큼 여유를 둡니다.
+        grace = timedelta(seconds=self.poll_interval + self.max_segment_age)
+        return datetime.now(timezone.utc) >= hour + timedelta(hours=1) + grace
+
+    def _prune(self):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        for rel in list(self._manifest):
+            if not self._manifest[rel].get('sealed'):
+                continue
+            try:
+                day = datetime.strptime(Path(rel).parent.as_posix(), '%Y/%m/%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if day < cutoff:
+                del self._manifest[rel]
+
+    @staticmethod
+    def _read_manifest(path: Path) -> dict[str, dict[str, Any]]:
+        if not path.exists():
+            return {}
+        try:
+            with path.open(encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _touch_manifest(self):
+        try:
+            os.utime(self.manifest_path)
+        except FileNotFoundError:
+            self._save_manifest()
+        except OSError:
+            self.stats['failures'] += 1
+
+    def _save_manifest(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix('.tmp')
+        with tmp.open('w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp, self.manifest_path)
@@ -0,0 +1,152 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+
+# props 에서 강의를 가리키는 키 (courseId 는 'slug/course-001' 또는 강의 URL)
+COURSE_REF_KEYS = ('courseId', 'course_id', 'courseUrl', 'url')
+COURSE_URL_PREFIX = 'https://academy.learningpipeline.com/'
+
+RANKING_SQL = """
+SELECT event_date, username, course_ref,
+       sum(exp(GREATEST(extract(epoch FROM (ts - $2::timestamp)) / $3::float8, -700)))::float8 AS weight
+FROM (
+    SELECT event_date, username, ts,
+           COALESCE({course_ref}) AS course_ref
+    FROM {table}
+    WHERE ($1::date IS NULL OR event_date >= $1::date)
+) e
+WHERE course_ref IS NOT NULL
+GROUP BY event_date, username, course_ref
+"""
+
+
+class _Features:
+    def __init__(self, n_courses: int, n_interests: int):
+        self.popularity = np.zeros(n_courses, dtype=np.float64)
+        self.cohort = np.zeros((n_interests, n_courses), dtype=np.float64)
+        self.users: dict[str, dict[int, float]] = {}
+
+    def add(self, col: int, username: str, weight: float, interest_rows: list[int]):
+        self.popularity[col] += weight
+        for row in interest_rows:
+            self.cohort[row, col] += weight
+        user = self.users.setdefault(username, {})
+        user[col] = user.get(col, 0.0) + weight
+
+
+class RankingEngine:
+    """사용자 관심사와 mart 이벤트 집계로 카테고리 내 강의 순서를 매기는 인메모리 랭킹 엔진입니다.
+
+    점수 = 전체 인기도 + 같은 관심사를 가진 사용자 집단의 인기도 + 본인의 최근 클릭 (각각 카테고리 내 최대값으로 정규화).
+    모든 가중치는 ``exp((ts - t0) / tau)`` 로 기준 시각 t0 에 대해 저장하므로, 시간이 흘러도 값 전체에 같은 배율만
+    곱해질 뿐 순위는 바뀌지 않아 주기적인 감쇠 연산이 필요 없습니다. 점수가 같으면 기존 카탈로그 순서를 따릅니다.
+
+    ETL 이후 ``refresh`` 는 아직 접히지 않은 최근 이틀치만 다시 읽어 교체하고(늦게 적재된 이벤트 반영),
+    그보다 오래된 날짜는 기본 테이블로 접어 다시 읽지 않습니다.
+    """
+
+    def __init__(
+        self,
+        catalog: dict[str, dict[str, Any]],
+        half_life_hours: float = 72.0,
+        weights: tuple[float, float, float] = (1.0, 1.0, 3.0),
+        table: str = 'mart.events',
+    ):
+        self.half_life_hours = half_life_hours
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self.w_pop, self.w_cohort, self.w_user = weights
+        self.table = table
+        self._ranges: dict[str, tuple[int, int]] = {}
+        self._col: dict[str, int] = {}
+        self._interest_row = {slug: idx for idx, slug in enumerate(catalog)}
+        col = 0
+        for slug, info in catalog.items():
+            start = col
+            for course in info['courses']:
+                course_id = course['url'].removeprefix(COURSE_URL_PREFIX)
+                self._col[course_id] = col
+                self._col[course['url']] = col
+                col += 1
+            self._ranges[slug] = (start, col)
+        self.n_courses = col
+        self._positions = np.arange(self.n_courses, dtype=np.int32)
+        self._reset()
+
+    def _reset(self):
+        self.t0 = datetime.now(timezone.utc).replace(tzinfo=None)
+        self._base = _Features(self.n_courses, len(self._interest_row))
+        self._recent = _Features(self.n_courses, len(self._interest_row))
+        self._fold_day: date | None = None
+        self.refreshed_at: datetime | None = None
+        self.rows_loaded = 0
+        self.last_error: str | None = None
+
+    def course_col(self, ref: str) -> int | None:
+        return self._col.get(ref)
+
+    def rank(self, category: str, username: str, interests: list[str]) -> np.ndarray | None:
+        """카테고리 내 강의 인덱스(0부터)를 순위대로 돌려줍니다. 반영할 신호가 없으면 None."""
+        lo, hi = self._ranges[category]
+        pop = self._base.popularity[lo:hi] + self._recent.popularity[lo:hi]
+        rows = [self._interest_row[i] for i in interests if i in self._interest_row]
+        if rows:
+            cohort = self._base.cohort[rows, lo:hi].sum(axis=0) + self._recent.cohort[rows, lo:hi].sum(axis=0)
+        else:
+            cohort = np.zeros(hi - lo)
+        personal = np.zeros(hi - lo)
+        for feats in (self._base, self._recent):
+            for col, weight in feats.users.get(username, {}).items():
+                if lo <= col < hi:
+                    personal[col - lo] += weight
+
+        score = np.zeros(hi - lo)
+        for weight, values in ((self.w_pop, pop), (self.w_cohort, cohort), (self.w_user, personal)):
+            peak = values.max(initial=0.0)
+            if peak > 0:
+                score += weight * (values / peak)
+        if not score.any():
+            return None
+        # 점수 내림차순, 같으면 카탈로그 순서
+        return np.lexsort((self._positions[: hi - lo], -score))
+
+    def apply(self, rows: list[tuple[date, str, str, float]], interests_of: dict[str, list[str]], today: date):
+        """(event_date, username, course_ref, weight) 집계를 반영합니다. ``today`` 전날부터는 recent 로 둡니다."""
+        fold_day = today - timedelta(days=1)
+        recent = _Features(self.n_courses, len(self._interest_row))
+        for event_date, username, course_ref, weight in rows:
+            col = self._col.get(course_ref)
+            if col is None:
+                continue
+            interest_rows = [self._interest_row[i] for i in interests_of.get(username, []) if i in self._interest_row]
+            target = recent if event_date >= fold_day else self._base
+            target.add(col, username, weight, interest_rows)
+        self._recent = recent
+        self._fold_day = fold_day
+        self.rows_loaded += len(rows)
+
+    async def refresh(self, pool, interests_lookup: Callable[[str], Awaitable[list[str]]]):
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if (now - self.t0).total_seconds() / self.tau > 300:
+            # exp 값이 너무 커지기 전에 기준 시각을 옮기고 전체를 다시 읽습니다.
+            self._reset()
+        sql = RANKING_SQL.format(table=self.table, course_ref=', '.join(f"props->>'{key}'" for key in COURSE_REF_KEYS))
+        records = await pool.fetch(sql, self._fold_day, self.t0, self.tau)
+        rows = [(r['event_date'], r['username'], r['course_ref'], r['weight']) for r in records]
+        interests_of = {}
+        for username in {row[1] for row in rows}:
+            interests_of[username] = await interests_lookup(username)
+        self.apply(rows, interests_of, now.date())
+        self.refreshed_at = now
+        return len(rows)
+
+    def status(self) -> dict[str, Any]:
+        return {
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'fold_day': self._fold_day.isoformat() if self._fold_day else None,
+            'rows_loaded': self.rows_loaded,
+            'users': len(self._base.users.keys() | self._recent.users.keys()),
+            'half_life_hours': self.half_life_hours,
+            'last_error': self.last_error,
+        }
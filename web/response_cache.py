@@ -0,0 +1,143 @@
+import asyncio
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Request, Response
+
+import fast_json
+
+try:
+    import brotli
+except ImportError:  # requirements.txt 에 있지만, 없는 환경에서는 gzip 만 협상합니다.
+    brotli = None
+
+MIN_COMPRESS_BYTES = 512
+_SUFFIX = {'identity': '', 'gzip': '-gz', 'br': '-br'}
+
+
+class PrecomputedResponse:
+    """정적인 JSON 응답을 미리 직렬화/압축해 두고, 강한 ETag 와 If-None-Match(304)로 내려줍니다.
+
+    이미 직렬화된 ``body`` 를 넘길 수도 있습니다. 요청마다 만드는 응답은 ``fast=True`` 로 두면 미리 압축하지 않고,
+    클라이언트가 협상한 인코딩 하나만 처음 내려줄 때 낮은 압축 수준으로 만듭니다 (304 나 identity 면 압축하지 않음).
+    """
+
+    def __init__(self, payload: Any = None, cache_control: str = 'no-cache', body: bytes | None = None, fast: bool = False):
+        if body is None:
+            body = fast_json.dumps(payload)
+        self.body = body
+        self.cache_control = cache_control
+        self.fast = fast
+        self._tag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.encodings = ('identity',)
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            self.encodings = ('identity', 'gzip', 'br') if brotli is not None else ('identity', 'gzip')
+        self.variants: dict[str, bytes] = {'identity': self.body}
+        if not fast:
+            for encoding in self.encodings:
+                self.variant(encoding)
+
+    def variant(self, encoding: str) -> bytes:
+        body = self.variants.get(encoding)
+        if body is None:
+            # 동시에 처음 요청되면 두 번 압축할 수 있지만 결과는 같습니다.
+            if encoding == 'gzip':
+                body = gzip.compress(self.body, compresslevel=1 if self.fast else 9, mtime=0)
+            else:
+                body = brotli.compress(self.body, quality=1 if self.fast else 11)
+            self.variants[encoding] = body
+        return body
+
+    def etag(self, encoding: str = 'identity') -> str:
+        return f'"{self._tag}{_SUFFIX[encoding]}"'
+
+    def respond(self, req: Request, status_code: int = 200) -> Response:
+        encoding = self._pick_encoding(req.headers.get('accept-encoding', ''))
+        headers = {
+            'ETag': self.etag(encoding),
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if self._matches(req.headers.get('if-none-match')):
+            return Response(status_code=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(
+            content=self.variant(encoding),
+            status_code=status_code,
+            media_type='application/json',
+            headers=headers,
+        )
+
+    def _pick_encoding(self, accept_encoding: str) -> str:
+        accepted = set()
+        for part in accept_encoding.split(','):
+            token, _, params = part.strip().partition(';')
+            if params.replace(' ', '') in {'q=0', 'q=0.0', 'q=0.00', 'q=0.000'}:
+                continue
+            accepted.add(token.strip().lower())
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and (encoding in accepted or '*' in accepted):
+                return encoding
+        return 'identity'
+
+    def _matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        # If-None-Match 는 약한 비교를 쓰므로 W/ 접두어와 인코딩 접미어를 무시합니다.
+        for candidate in if_none_match.split(','):
+            tag = candidate.strip().removeprefix('W/').strip('"')
+            if tag.split('-', 1)[0] == self._tag:
+                return True
+        return False
+
+
+class TTLCache:
+    """자주 조회되는 집계 응답을 키별로 ``ttl`` 초 동안 재사용하는 LRU 캐시입니다.
+
+    만료된 키에 요청이 몰려도 ``factory`` 는 한 번만 실행되고, 나머지 요청은 그 결과를 함께 기다립니다.
+    """
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._pending: dict[Hashable, asyncio.Task] = {}
+
+    async def get(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        hit = self._cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return hit[1]
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fill(key, factory))
+            self._pending[key] = task
+        # 한 요청이 취소되어도 같은 키를 기다리는 다른 요청의 계산은 계속되도록 shield 합니다.
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await factory()
+        finally:
+            self._pending.pop(key, None)
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._cache.clear()
+
+    def status(self) -> dict[str, Any]:
+        return {'entries': len(self._cache), 'ttl_sec': self.ttl, 'hits': self.hits, 'misses': self.misses}
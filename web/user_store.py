@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import db
+
+
+class FileUserStore:
+    """users.json 을 한 번만 읽어 username → user dict 로 들고 있는 저장소입니다.
+
+    파일의 mtime/크기가 바뀌면 (최대 ``check_interval`` 초 간격으로 확인) 다시 읽어 통째로 교체하고,
+    ``request_reload`` 로 다음 조회 때 강제로 다시 읽게 할 수 있습니다.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._users: dict[str, dict[str, Any]] = {}
+        self._signature: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._force = True
+        self._reload_lock = threading.Lock()
+
+    async def start(self):
+        await asyncio.to_thread(self._maybe_reload)
+
+    async def close(self):
+        return None
+
+    async def get(self, username: str) -> dict[str, Any] | None:
+        if self._force or time.monotonic() - self._checked_at >= self.check_interval:
+            # stat/재파싱은 이벤트 루프 밖에서 수행합니다.
+            await asyncio.to_thread(self._maybe_reload)
+        return self._users.get(username)
+
+    def request_reload(self):
+        self._force = True
+
+    def reload(self) -> int:
+        self._force = True
+        self._maybe_reload()
+        return len(self._users)
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if not self._force and now - self._checked_at < self.check_interval:
+            return
+        with self._reload_lock:
+            self._checked_at = now
+            try:
+                st = self.path.stat()
+            except FileNotFoundError:
+                self._users, self._signature, self._force = {}, None, False
+                return
+            signature = (st.st_mtime_ns, st.st_size)
+            if not self._force and signature == self._signature:
+                return
+            with self.path.open(encoding='utf-8') as f:
+                users = json.load(f)
+            # 새 dict 를 만든 뒤 참조만 바꾸므로 조회 중인 요청은 잠금 없이 이전/새 dict 중 하나를 봅니다.
+            self._users = {user['username']: user for user in users}
+            self._signature = signature
+            self._force = False
+
+
+class PostgresUserStore:
+    """Postgres 의 사용자 테이블을 조회하고 결과를 TTL 이 있는 LRU 캐시에 보관합니다."""
+
+    def __init__(self, table: str = 'app.users', ttl: float = 60.0, maxsize: int = 100000):
+        self.table = table
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.pool = None
+        self._cache: OrderedDict[str, tuple[float, dict[str, Any] | None]] = OrderedDict()
+
+    async def start(self):
+        if self.pool is None:
+            self.pool = await db.get_pool()
+
+    async def close(self):
+        self.pool = None
+
+    async def get(self, username: str) -> dict[str, Any] | None:
+        now = time.monotonic()
+        hit = self._cache.get(username)
+        if hit and hit[0] > now:
+            self._cache.move_to_end(username)
+            return hit[1]
+        if self.pool is None:
+            await self.start()
+        row = await self.pool.fetchrow(
+            f'SELECT username, password, full_name, interests FROM {self.table} WHERE username = $1',
+            username,
+        )
+        user = None
+        if row:
+            user = dict(row)
+            user['interests'] = list(user.get('interests') or [])
+        self._cache[username] = (now + self.ttl, user)
+        self._cache.move_to_end(username)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return user
+
+    def request_reload(self):
+        self._cache.clear()
+
+    def reload(self) -> int:
+        self._cache.clear()
+        return 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+def build_user_store(users_path: Path):
+    backend = os.getenv('USER_STORE', 'file').lower()
+    if backend == 'postgres':
+        return PostgresUserStore(
+            table=os.getenv('USER_STORE_TABLE', 'app.users'),
+            ttl=float(os.getenv('USER_STORE_TTL_SEC', '60')),
+            maxsize=int(os.getenv('USER_STORE_CACHE_SIZE', '100000')),
+        )
+    return FileUserStore(users_path, check_interval=float(os.getenv('USER_STORE_CHECK_SEC', '1')))